@@ -0,0 +1,202 @@
+"""Benchmarks for the ingestion, computation and rendering hot paths.
+
+    python benchmarks/run.py                       # compare with baseline.json
+    python benchmarks/run.py --sizes 1e2 1e7 --datasets qfl
+    python benchmarks/run.py --save                # record a new baseline
+
+Every dataset runs as parse -> compute -> render -> encode. Each stage is
+timed on its own (best of --repeat runs), and one extra run under
+tracemalloc records each stage's peak memory. A stage that is slower or
+larger than the baseline by more than the tolerance fails the run
+(exit status 1).
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from synthetic import GENERATORS, csv_bytes  # noqa: E402
+from lithora.cia import OPTIONAL_OXIDES, REQUIRED_OXIDES, compute_cia  # noqa: E402
+from lithora.export import figure_to_png  # noqa: E402
+from lithora.formats import read_table  # noqa: E402
+from lithora.ingest import QFL_COLUMNS  # noqa: E402
+from lithora.plots import plot_provenance_ternary, plot_rainfall, plot_ternary  # noqa: E402
+from lithora.qfl import compute_qfl  # noqa: E402
+from lithora.rainfall import RainfallAccumulator, iter_rainfall_chunks  # noqa: E402
+from lithora.templates import get_template  # noqa: E402
+
+BASELINE = Path(__file__).with_name('baseline.json')
+SIZES = [100, 10_000, 100_000, 1_000_000]
+STAGES = ['parse', 'compute', 'render', 'encode']
+# Differences below these are timer / allocator noise, never regressions
+MIN_SECONDS = 0.01
+MIN_MB = 2.0
+
+
+# --- Pipelines: stage name -> function of the previous stage's result ---
+def _rainfall_compute(chunks):
+    acc = RainfallAccumulator()
+    for minutes, depth in chunks:
+        acc.update(minutes, depth)
+    return acc.finish()
+
+
+PIPELINES = {
+    'qfl': [
+        ('parse', lambda data: read_table(io.BytesIO(data), 'qfl.csv', required=QFL_COLUMNS)),
+        ('compute', lambda df: compute_qfl(df['Quartz'], df['Feldspar'], df['Lithics'])),
+        ('render', plot_provenance_ternary),
+        ('encode', figure_to_png),
+    ],
+    'cia': [
+        ('parse', lambda data: read_table(io.BytesIO(data), 'cia.csv', required=REQUIRED_OXIDES,
+                                          optional=OPTIONAL_OXIDES + ['Label'])),
+        ('compute', compute_cia),
+        ('render', lambda df: plot_ternary(list(zip(df['Label'], df['A'], df['CN'], df['K'])), values=df['CIA'])),
+        ('encode', figure_to_png),
+    ],
+    'rainfall': [
+        ('parse', lambda data: list(iter_rainfall_chunks(io.BytesIO(data)))),
+        ('compute', _rainfall_compute),
+        ('render', lambda acc: plot_rainfall(acc.hourly, acc.monthly)),
+        ('encode', figure_to_png),
+    ],
+}
+
+
+# --- Measurement ---
+def time_stages(pipeline, data):
+    seconds = {}
+    value = data
+    for stage, fn in pipeline:
+        gc.collect()
+        start = time.perf_counter()
+        value = fn(value)
+        seconds[stage] = time.perf_counter() - start
+    return seconds
+
+
+def peak_stages(pipeline, data):
+    # Peak bytes allocated while the stage runs, above what was live before it
+    peaks = {}
+    value = data
+    tracemalloc.start()
+    try:
+        for stage, fn in pipeline:
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            value = fn(value)
+            peaks[stage] = (tracemalloc.get_traced_memory()[1] - before) / 2**20
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run(datasets, sizes, repeat):
+    # Template rasterization is a one-off per process; keep it out of the timings
+    for name in ('qfl', 'qfl_provenance', 'cia'):
+        get_template(name)
+    results = {}
+    for dataset in datasets:
+        for rows in sizes:
+            data = csv_bytes(dataset, rows)
+            pipeline = PIPELINES[dataset]
+            runs = [time_stages(pipeline, data) for _ in range(repeat)]
+            peaks = peak_stages(pipeline, data)
+            for stage in STAGES:
+                key = f"{dataset}/{rows}/{stage}"
+                results[key] = {'seconds': round(min(r[stage] for r in runs), 5),
+                                'peak_mb': round(peaks[stage], 2)}
+                print(f"{key:<28} {results[key]['seconds']:>10.4f} s {results[key]['peak_mb']:>10.1f} MB",
+                      flush=True)
+    return results
+
+
+# --- Baseline comparison ---
+def environment():
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slow = result['seconds'] > base['seconds'] * (1 + time_tolerance) + MIN_SECONDS
+        large = result['peak_mb'] > base['peak_mb'] * (1 + memory_tolerance) + MIN_MB
+        if slow or large:
+            regressions.append(f"{key}: {result['seconds']:.4f} s / {result['peak_mb']:.1f} MB "
+                               f"(baseline {base['seconds']:.4f} s / {base['peak_mb']:.1f} MB)")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lithora hot-path benchmarks.")
+    parser.add_argument('--datasets', nargs='+', choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=lambda s: int(float(s)), default=SIZES,
+                        help="row counts, e.g. 1e2 1e5 1e7 (default: 1e2 1e4 1e5 1e6)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per size; the best is kept")
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--output', type=Path, help="also write the results to this JSON file")
+    parser.add_argument('--time-tolerance', type=float, default=0.5,
+                        help="allowed slowdown as a fraction of the baseline (default: %(default)s)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.2,
+                        help="allowed peak-memory growth as a fraction (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.datasets, args.sizes, max(1, args.repeat))
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.save:
+        # Merge, so a partial run only replaces the entries it measured
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {'results': {}}
+        stored['environment'] = report['environment']
+        stored['results'].update(results)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + '\n')
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save to record one")
+        return 0
+    stored = json.loads(args.baseline.read_text())
+    if stored.get('environment') != report['environment']:
+        print("note: baseline was recorded in a different environment:", stored.get('environment'))
+    regressions = compare(results, stored['results'], args.time_tolerance, args.memory_tolerance)
+    for line in regressions:
+        print("REGRESSION", line)
+    print(f"{len(results)} measurements, {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Cold-start latency of a fresh process, as a new server replica sees it.
+
+    python benchmarks/startup.py            # best of 3 fresh processes per case
+
+home      importing what the home page needs (lithora.instrument / warmup)
+cold      first QFL figure (imports + template + render + encode), no warm-up
+warmed    first QFL figure after lithora.warmup has run
+steady    a further figure in the same process
+
+With the warm-up in place, `warmed` should match `steady`.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+_RENDER = """
+from lithora.export import figure_to_png
+from lithora.plots import plot_provenance_ternary
+from lithora.qfl import compute_qfl
+import numpy as np, pandas as pd
+counts = pd.DataFrame(np.random.default_rng(0).integers(1, 100, (200, 3)), columns=list('QFL'))
+figure_to_png(plot_provenance_ternary(compute_qfl(counts['Q'], counts['F'], counts['L'])))
+"""
+
+# case -> (setup, timed statement), each run in a fresh interpreter
+CASES = {
+    'home': ("", "import lithora.instrument, lithora.warmup"),
+    'cold': ("", _RENDER),
+    'warmed': ("import lithora.warmup; lithora.warmup.warm_up()", _RENDER),
+    'steady': (_RENDER, _RENDER),
+}
+
+_PROBE = """
+import json, sys, time, warnings
+warnings.simplefilter('ignore')
+import matplotlib; matplotlib.use('Agg')
+{setup}
+start = time.perf_counter()
+exec(compile({stmt!r}, 'case', 'exec'))
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'mpl_loaded': 'matplotlib.figure' in sys.modules}}))
+"""
+
+
+def measure(case, repeat):
+    setup, stmt = CASES[case]
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(setup=setup, stmt=stmt)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lithora cold-start latency.")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3, help="fresh processes per case; the best is kept")
+    args = parser.parse_args(argv)
+    for case in args.cases:
+        result = measure(case, max(1, args.repeat))
+        note = "  (matplotlib not loaded)" if not result['mpl_loaded'] else ""
+        print(f"{case:<8} {result['seconds'] * 1000:>9.1f} ms{note}", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
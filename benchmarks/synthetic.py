@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# Reproducible synthetic inputs in the layout users upload. Every generator
+# returns CSV bytes, so the parse stage reads exactly what production reads.
+
+
+# --- QFL point counts: a few provenance clusters plus zeros and noise ---
+def qfl_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = np.array([[60, 25, 15], [25, 45, 30], [15, 20, 65], [85, 10, 5]], dtype=float)
+    base = centres[rng.integers(0, len(centres), rows)]
+    counts = np.rint(base * rng.lognormal(0, 0.35, (rows, 3)) * 3).astype(np.int64)
+    counts[rng.random((rows, 3)) < 0.01] = 0
+    return pd.DataFrame(counts, columns=['Quartz', 'Feldspar', 'Lithics'])
+
+
+# --- Oxide wt% tables for the CIA module ---
+def oxide_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Label': np.char.add('S', np.arange(1, rows + 1).astype(str)),
+        'Al2O3': rng.normal(15, 2.5, rows).clip(5),
+        'CaO': rng.gamma(2, 1.5, rows),
+        'Na2O': rng.normal(3, 0.8, rows).clip(0.1),
+        'K2O': rng.normal(3, 1, rows).clip(0.1),
+        'P2O5': rng.gamma(2, 0.08, rows),
+        'CO2': rng.gamma(1, 0.3, rows),
+    })
+    return df.round(3)
+
+
+# --- 1-minute rain-gauge record: dry spells and gamma-distributed storms ---
+def rainfall_series(rows, seed=0, start='2000-01-01'):
+    rng = np.random.default_rng(seed)
+    wet = rng.random(rows) < 0.04
+    wet |= np.convolve(wet, np.ones(30), mode='same') > 0.5 * rng.random(rows)
+    depth = np.where(wet, rng.gamma(0.6, 0.25, rows), 0.0).round(2)
+    stamps = pd.date_range(start, periods=rows, freq='min')
+    return pd.DataFrame({'timestamp': stamps.strftime('%Y-%m-%d %H:%M'), 'rainfall': depth})
+
+
+GENERATORS = {'qfl': qfl_table, 'cia': oxide_table, 'rainfall': rainfall_series}
+
+
+def csv_bytes(dataset, rows, seed=0):
+    return GENERATORS[dataset](rows, seed).to_csv(index=False).encode('utf-8')
@@ -1,8 +1,165 @@
+import functools
+import os
+import threading
+import time
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from lithora import instrument, jobs, warmup
+from lithora.cache import CACHE_MAX_ENTRIES, CACHE_TTL
+from lithora.store import stored
 
 # --- Page config ---
 st.set_page_config(page_title="Lithora Geoscience Tools", layout="wide")
 
+# --- Instrumentation ---
+# The debug panel shows the spans of this run only. LITHORA_METRICS=1 logs
+# every span as a JSON line; LITHORA_METRICS_PORT also serves their totals
+# at http://host:port/metrics.
+debug = st.sidebar.checkbox("🐞 Debug timings", key="debug")
+run_start = time.perf_counter()
+records = instrument.start() if debug else instrument.stop()
+if os.environ.get("LITHORA_METRICS_PORT"):
+    instrument.serve_metrics(os.environ["LITHORA_METRICS_PORT"])
+
+# --- Cold start: import matplotlib/mpltern and build the diagram templates in
+# a background thread while the (import-light) home page is shown ---
+warmup.start()
+
+
+def stage_cache(store=False, **cache_kwargs):
+    # st.cache_data plus a span around every call, so cache hits show up
+    # in the timings too (the library spans inside only run on a miss).
+    # With `store`, a miss in memory then tries the on-disk artifact store
+    # (LITHORA_STORE), shared with other replicas and kept across restarts.
+    def wrap(fn):
+        cached_fn = st.cache_data(**cache_kwargs)(stored(fn) if store else fn)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with instrument.span(fn.__name__):
+                return cached_fn(*args, **kwargs)
+        return call
+    return wrap
+
+
+# --- Table downloads, shared by the pages ---
+# One cached function for all of them, so `key` names the kind of table as
+# well as its data, e.g. content_key('qfl', data_key).
+@stage_cache(store=True, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def table_file(key, fmt, _df):
+    from lithora.formats import table_bytes
+    return table_bytes(_df, fmt)
+
+
+# --- Background jobs: heavy stages of large uploads leave the script thread ---
+def run_job(slot, key, heavy, fn, *args, **kwargs):
+    # Inline unless `heavy`. Otherwise fn(*args) becomes a job on the shared
+    # worker pool (one per key, whichever session asked first) and, until it
+    # finishes, this shows its progress and returns None. `fn` is a cached
+    # stage, so the call after the job is done is a cache hit. A slot holds
+    # one job per session: asking it for another key, or not asking for it
+    # at all during a run, cancels the old one.
+    st.session_state.setdefault("jobs_seen", set()).add(slot)
+    if not heavy:
+        return fn(*args, **kwargs)
+    key = f"{fn.__name__}/{key}"
+    held = st.session_state.setdefault("jobs", {})
+    entry = held.get(slot)
+    if entry is not None and entry_key(entry) != key:
+        drop_job(slot)
+        entry = None
+    if entry == (jobs.DONE, key):
+        return fn(*args, **kwargs)
+    if entry == (jobs.CANCELLED, key):
+        st.info("Cancelled.")
+        st.button("↻ Run again", key=f"{slot}_retry", on_click=drop_job, args=(slot,))
+        return None
+    if entry is None:
+        try:
+            entry = held[slot] = jobs.get_queue().submit(key, with_script_context(fn), *args, **kwargs)
+        except jobs.Busy as e:
+            st.warning(f"The server is busy: {e}")
+            return None
+    if not entry.done():
+        job_progress(slot)
+        return None
+    jobs.get_queue().release(entry)
+    if entry.state == jobs.DONE:
+        held[slot] = (jobs.DONE, key)
+        return fn(*args, **kwargs)
+    del held[slot]
+    return entry.result()  # re-raises the job's error for the page to report
+
+
+def entry_key(entry):
+    return entry.key if isinstance(entry, jobs.Job) else entry[1]
+
+
+def drop_job(slot):
+    entry = st.session_state.get("jobs", {}).pop(slot, None)
+    if isinstance(entry, jobs.Job):
+        jobs.get_queue().release(entry)
+
+
+def cancel_job(slot):
+    # The job may have finished (or been dropped) since the button was drawn
+    entry = st.session_state.get("jobs", {}).get(slot)
+    if not isinstance(entry, jobs.Job) or entry.done():
+        return
+    drop_job(slot)
+    st.session_state["jobs"][slot] = (jobs.CANCELLED, entry_key(entry))
+
+
+def with_script_context(fn):
+    # Cached stages look up the session's script context; pool threads have none
+    ctx = get_script_run_ctx()
+
+    @functools.wraps(fn)
+    def work(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    return work
+
+
+@st.fragment(run_every=0.5)
+def job_progress(slot):
+    # Polls the job without rerunning the page; a full rerun picks up the result
+    job = st.session_state.get("jobs", {}).get(slot)
+    if not isinstance(job, jobs.Job):
+        return
+    if job.done():
+        st.rerun()
+    st.progress(job.progress, text=f"{job.message} · {job.progress:.0%}")
+    st.button("✖ Cancel", key=f"{slot}_cancel", on_click=cancel_job, args=(slot,))
+
+
+RENDERERS = ["Static", "Interactive (WebGL)"]
+
+
+def interactive_chart(name, figure):
+    # figure(box) -> (plotly figure, points shown, samples in the box).
+    # Box-selecting zooms in: the rerun asks the server for that box only,
+    # at full resolution once it holds few enough samples. "Reset zoom"
+    # swaps in a fresh chart, dropping the selection.
+    zoom = st.session_state.setdefault(f"{name}_zoom", 0)
+    key = f"{name}_chart_{zoom}"
+    event = st.session_state.get(key)
+    boxes = event["selection"]["box"] if event and event.get("selection") else []
+    box = None
+    if boxes and boxes[-1].get("x") and boxes[-1].get("y"):
+        xs, ys = boxes[-1]["x"], boxes[-1]["y"]
+        box = (min(xs), max(xs), min(ys), max(ys))
+    fig, shown, total = figure(box)
+    st.plotly_chart(fig, key=key, on_select="rerun", selection_mode="box")
+    where = " in the zoomed box" if box else ""
+    detail = f"every sample{where}" if shown == total else f"{shown:,} of {total:,} samples{where}, one per grid cell"
+    st.caption(f"Showing {detail}. Drag a box to zoom in.")
+    if box is not None:
+        st.button("🔍 Reset zoom", key=f"{name}_reset",
+                  on_click=lambda: st.session_state.update({f"{name}_zoom": zoom + 1}))
+
 # --- Page state manager ---
 if "page" not in st.session_state:
     st.session_state.page = "home"
@@ -20,6 +177,9 @@ def go_cia():
 def go_rainfall():
     st.session_state.page = "rainfall"
 
+def go_diagrams():
+    st.session_state.page = "diagrams"
+
 # --- Page: Home Interface ---
 if st.session_state.page == "home":
     st.title("🌍 Lithora Geoscience Toolkit")
@@ -30,6 +190,7 @@ if st.session_state.page == "home":
     st.button("📌 QFL Ternary Plot", on_click=go_qfl)
     st.button("🧪 Chemical Index of Alteration (CIA)", on_click=go_cia)
     st.button("☔ Rainfall Intensity Plot", on_click=go_rainfall)
+    st.button("🔺 Ternary Discrimination Diagrams", on_click=go_diagrams)
 
 # --- Page: QFL Ternary ---
 elif st.session_state.page == "qfl":
@@ -37,9 +198,17 @@ elif st.session_state.page == "qfl":
     st.button("⬅️ Back to Home", on_click=go_home)
 
     import pandas as pd
-    import matplotlib.pyplot as plt
-    import mpltern
     import io
+    from lithora.qfl import compute_qfl, provenance_summary
+    from lithora.parsing import describe_problems, parse_columns
+    from lithora.plots import GrowingPlot, plot_basic_ternary, plot_provenance_ternary
+    from lithora.project import QFLProject
+    from lithora.density import DENSITY_THRESHOLD
+    from lithora.ingest import QFL_COLUMNS, STREAM_ABOVE_MB, stream_qfl
+    from lithora.formats import OUTPUT_FORMATS, UPLOAD_TYPES, TableWriter, read_table, table_bytes, table_columns
+    from lithora.cache import content_key
+    from lithora.compositional import CONFIDENCE, REGIONS, GroupSummary
+    from lithora.export import EXPORT_DPI, EXPORT_FORMATS, figure_to_bytes, figure_to_png, release
     
     
     # --- UI Header ---
@@ -47,150 +216,269 @@ elif st.session_state.page == "qfl":
     st.markdown("Upload or enter **Quartz, Feldspar, Lithics** data to generate ternary diagrams and CSVs.")
     
     # --- Sidebar for input mode ---
-    mode = st.sidebar.radio("Select Input Mode", ["📝 Manual Entry", "📁 Upload CSV"])
-    
-    # ---Pre-prossessing ---
-    def parse_input_list(data_str):
-        return [float(i.strip()) for i in data_str.split(",") if i.strip() != ""]
-    
-    # --- Calculate and return QFL DataFrame ---
-    def compute_qfl(quartz, feldspar, lithics):
-        df = pd.DataFrame({'Quartz': quartz, 'Feldspar': feldspar, 'Lithics': lithics})
-        df['Total'] = df['Quartz'] + df['Feldspar'] + df['Lithics']
-        df['%Q'] = df['Quartz'] / df['Total'] * 100
-        df['%F'] = df['Feldspar'] / df['Total'] * 100
-        df['%L'] = df['Lithics'] / df['Total'] * 100
-        df = df.round(2)
+    mode = st.sidebar.radio("Select Input Mode", ["📝 Manual Entry", "📁 Upload File"])
+    project_mode = st.sidebar.checkbox("📂 Project mode (append samples)", key="qfl_project_mode",
+                                       help="Every generated entry or upload is added to one growing dataset")
+    density_threshold = st.sidebar.number_input("Density plot above (rows)", min_value=0, value=DENSITY_THRESHOLD, step=1000)
+    table_format = st.sidebar.selectbox("Table download format", list(OUTPUT_FORMATS), format_func=str.upper)
+    table_suffix, table_mime = OUTPUT_FORMATS[table_format]
+    export_format = st.sidebar.selectbox("Figure download format", list(EXPORT_FORMATS), format_func=str.upper)
+    export_dpi = st.sidebar.number_input("Figure download DPI", min_value=72, max_value=1200, value=EXPORT_DPI, step=50)
+    with st.sidebar.expander("📐 Compositional statistics"):
+        regions = tuple(st.multiselect("Regions around centroids", REGIONS, default=['confidence']))
+        level = st.slider("Region level", 0.50, 0.99, CONFIDENCE, 0.01)
+        overall = st.checkbox("Without groups: centroid of all samples")
+
+    # --- Cached stages, keyed by the content hash of the input ---
+    # Arguments starting with "_" are not hashed by Streamlit; `key` stands in for them.
+    cached = stage_cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+    # Tables and encoded figures also go to the on-disk store
+    stored_stage = stage_cache(store=True, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+
+    @stored_stage
+    def load_qfl_table(key, _data, name, group=None):
+        # Only the three count columns (and the grouping column) are parsed,
+        # whatever else the file holds
+        df_uploaded = read_table(io.BytesIO(_data), name, required=QFL_COLUMNS + ([group] if group else []))
+        jobs.checkpoint(0.6, "Computing percentages and provenance")
+        df = compute_qfl(df_uploaded['Quartz'], df_uploaded['Feldspar'], df_uploaded['Lithics'])
+        if group:
+            df.insert(0, group, df_uploaded[group].to_numpy())
         return df
+
+    @stored_stage
+    def group_table(key, group, _df):
+        groups = _df[group] if group else None
+        return GroupSummary(_df[['%Q', '%F', '%L']].to_numpy(), groups, ['Q', 'F', 'L']).table()
+
+    @cached
+    def manual_qfl(key, _d1, _d2, _d3):
+        return compute_qfl(_d1, _d2, _d3)
+
+    @cached
+    def stream_qfl_table(key, _data, name):
+        return stream_qfl(io.BytesIO(_data), name=name)
+
+    def streamed_table(data, name, fmt):
+        # Deferred download for streamed uploads: re-stream and write on click
+        buf = io.BytesIO()
+        with TableWriter(buf, fmt) as out:
+            stream_qfl(io.BytesIO(data), out=out, name=name)
+        return buf.getvalue()
+
+    # fmt None: the on-screen PNG on the raster template. Otherwise a download
+    # drawn on the vector diagram, only encoded when the button is clicked.
+    @stored_stage
+    def plot_png(kind, key, _df, density_threshold, _counts=None, _rows=None, group=None, regions=None,
+                 level=CONFIDENCE, fmt=None, dpi=None):
+        plot = plot_basic_ternary if kind == 'basic' else plot_provenance_ternary
+        fig = plot(_df, counts=_counts, rows=_rows, density_threshold=density_threshold, vector=fmt is not None,
+                   groups=_df[group] if group else None, group_title=group, regions=regions, level=level)
+        jobs.checkpoint(0.8, "Encoding")
+        return figure_to_png(fig) if fmt is None else figure_to_bytes(fig, fmt, dpi=dpi)
     
-    # --- Ternary Plot: Basic ---
-    def plot_basic_ternary(df):
-        fig = plt.figure()
-        ax = fig.add_subplot(projection='ternary')
-    
-        ax.set_tlabel("Quartz")
-        ax.set_llabel("Feldspar")
-        ax.set_rlabel("Lithics")
-    
-        tick_vals = [0, 20, 40, 60, 80, 100]
-        ax.taxis.set_ticklabels(tick_vals)
-        ax.laxis.set_ticklabels(tick_vals)
-        ax.raxis.set_ticklabels(tick_vals)
-    
-        ax.plot(df['%Q'], df['%F'], df['%L'], 'ko', label='Data Points')
-        ax.legend(fontsize='small')
-        ax.grid(True, linestyle='--', linewidth=0.5)
-    
-        return fig
-    
-    # --- Ternary Plot: Provenance Fields ---
-    def plot_provenance_ternary(df):
-        fig = plt.figure()
-        ax = fig.add_subplot(projection='ternary')
-    
-        ax.set_tlabel("Quartz")
-        ax.set_llabel("Feldspar")
-        ax.set_rlabel("Lithics")
-    
-        tick_vals = [0, 20, 40, 60, 80, 100]
-        ax.taxis.set_ticklabels(tick_vals)
-        ax.laxis.set_ticklabels(tick_vals)
-        ax.raxis.set_ticklabels(tick_vals)
-    
-        fields = {
-            'Basement Uplift': [(100,0,0),(0,100,0),(0,85,15),(96,0,4)],
-            'Recycled Orogen': [(25,0,75),(51,40,9),(96,0,4)],
-            'Undissected Arc': [(0,50,50),(25,0,75),(0,0,100)],
-            'Transitional Arc': [(0,50,50),(25,0,75),(33,12,55),(17,70,13),(0,85,15)],
-            'Dissected Arc': [(51,40,9),(17,70,13),(33,12,55)]
-        }
-        colors = {
-            'Basement Uplift': 'lightyellow',
-            'Recycled Orogen': 'skyblue',
-            'Undissected Arc': 'cyan',
-            'Transitional Arc': 'lightgreen',
-            'Dissected Arc': 'lightblue'
-        }
-    
-        for label, vertices in fields.items():
-            scaled = [(q/100, f/100, l/100) for q, f, l in vertices]
-            ax.fill(*zip(*scaled), label=label, alpha=0.3, color=colors[label])
-    
-        ax.plot(df['%Q'], df['%F'], df['%L'], 'ko', label='Data Points')
-        ax.legend(fontsize='small', loc='upper left', bbox_to_anchor=(0.8, 1))
-        ax.grid(True, linestyle='--', linewidth=0.5)
-    
-        return fig
-    
-    # --- CSV Download ---
-    def to_csv(df):
-        return df.to_csv(index=False).encode('utf-8')
-    
+    @cached
+    def qfl_figure(key, box, _df):
+        from lithora.interactive import qfl_view
+        return qfl_view(_df).figure(box)
+
+    # --- Project mode: one growing dataset per session ---
+    # Appends compute only the new rows and draw only the new points; the
+    # figures are rebuilt from the whole project when the density threshold changes.
+    def qfl_project():
+        if "qfl_project" not in st.session_state:
+            st.session_state.qfl_project = QFLProject()
+        project = st.session_state.qfl_project
+        plots = st.session_state.get("qfl_project_plots")
+        if plots is None or plots[0] != density_threshold:
+            clear_plots()
+            plots = (density_threshold, GrowingPlot('qfl', density_threshold=density_threshold),
+                     GrowingPlot('qfl_provenance', 0.6, density_threshold))
+            if project.rows:
+                for plot in plots[1:]:
+                    plot.add(project.table, project.stats)
+            st.session_state.qfl_project_plots = plots
+        return project, plots[1], plots[2]
+
+    def append_to_project(quartz, feldspar, lithics, source=None):
+        project, basic, provenance = qfl_project()
+        new = project.append(quartz, feldspar, lithics, source=source)
+        if new is not None:
+            basic.add(new, project.stats)
+            provenance.add(new, project.stats)
+        return new
+
+    def clear_plots():
+        plots = st.session_state.pop("qfl_project_plots", None)
+        if plots is not None:
+            for plot in plots[1:]:
+                release(plot.fig)
+
+    def clear_project():
+        clear_plots()
+        st.session_state.pop("qfl_project", None)
+
     # --- Input Handling ---
     df_result = None
+    stream_result = None
+    data_key = None
+    group = None
+    renderer = RENDERERS[0]
+    heavy = False
     
     if mode == "📝 Manual Entry":
         st.subheader("Manual Input")
-        q_input = st.text_area("Quartz Values (comma-separated)", placeholder="e.g., 30, 40, 35")
-        f_input = st.text_area("Feldspar Values (comma-separated)", placeholder="e.g., 50, 40, 45")
-        l_input = st.text_area("Lithics Values (comma-separated)", placeholder="e.g., 20, 20, 20")
+        decimal = st.sidebar.radio("Decimal separator", ["auto", ".", ","], horizontal=True)
+        q_input = st.text_area("Quartz Values (comma, tab or line separated)", placeholder="e.g., 30, 40, 35")
+        f_input = st.text_area("Feldspar Values (comma, tab or line separated)", placeholder="e.g., 50, 40, 45")
+        l_input = st.text_area("Lithics Values (comma, tab or line separated)", placeholder="e.g., 20, 20, 20")
     
         if st.button("Generate Ternary Plot"):
             try:
-                d1 = parse_input_list(q_input)
-                d2 = parse_input_list(f_input)
-                d3 = parse_input_list(l_input)
-    
-                if len(d1) != len(d2) or len(d1) != len(d3):
-                    st.error("Missing Data!! All input lists must be the same length.")
-                else:
-                    df_result = compute_qfl(d1, d2, d3)
+                values, rows, problems = parse_columns([q_input, f_input, l_input],
+                                                       ["Quartz", "Feldspar", "Lithics"], decimal)
+                if problems:
+                    st.warning(describe_problems(problems))
+                if len(values) and project_mode:
+                    append_to_project(values[:, 0], values[:, 1], values[:, 2])
+                elif len(values):
+                    data_key = content_key(q_input, f_input, l_input, decimal)
+                    df_result = manual_qfl(data_key, values[:, 0], values[:, 1], values[:, 2])
+                elif not problems:
+                    st.error("Enter at least one value in each box.")
+            except ValueError as e:
+                st.error(f"Missing Data!! {e}")
             except Exception as e:
                 st.error(f"Error parsing input: {e}")
     
     else:
-        st.subheader("Upload CSV")
-        uploaded_file = st.file_uploader("Upload CSV with columns: Quartz, Feldspar, Lithics", type="csv")
+        st.subheader("Upload Data File")
+        uploaded_file = st.file_uploader("Upload CSV, Parquet or Feather with columns: Quartz, Feldspar, Lithics",
+                                         type=UPLOAD_TYPES)
+        if not project_mode:
+            streaming = st.sidebar.checkbox("Streaming ingestion (bounded memory)",
+                                            help=f"Always on for files over {STREAM_ABOVE_MB} MB")
+            renderer = st.sidebar.radio("Diagram renderer", RENDERERS, horizontal=True)
     
         if uploaded_file:
             try:
-                df_uploaded = pd.read_csv(uploaded_file)
-                if all(col in df_uploaded.columns for col in ['Quartz', 'Feldspar', 'Lithics']):
-                    df_result = compute_qfl(df_uploaded['Quartz'], df_uploaded['Feldspar'], df_uploaded['Lithics'])
+                data, name = uploaded_file.getvalue(), uploaded_file.name
+                data_key = content_key(data, name)
+                heavy = len(data) > jobs.BACKGROUND_ABOVE_MB * 2**20
+                if project_mode:
+                    # Each file is added once, however often the page reruns
+                    if data_key not in qfl_project()[0]:
+                        counts_df = read_table(io.BytesIO(data), name, required=QFL_COLUMNS)
+                        append_to_project(counts_df['Quartz'], counts_df['Feldspar'], counts_df['Lithics'],
+                                          source=data_key)
+                elif streaming or len(data) > STREAM_ABOVE_MB * 2**20:
+                    stream_result = run_job('qfl_table', content_key(data_key, 'stream'), heavy,
+                                            stream_qfl_table, data_key, data, name)
                 else:
-                    st.error("CSV must contain columns: Quartz, Feldspar, Lithics")
+                    # Any other column (e.g. Formation, Well) can split the samples into groups
+                    extra = [col for col in table_columns(io.BytesIO(data), name) if col not in QFL_COLUMNS]
+                    group = st.sidebar.selectbox("Group by column", [None] + extra,
+                                                 format_func=lambda col: col or "(none)")
+                    df_result = run_job('qfl_table', content_key(data_key, group), heavy,
+                                        load_qfl_table, data_key, data, name, group)
             except Exception as e:
-                st.error(f"Error reading CSV: {e}")
+                st.error(f"Error reading {uploaded_file.name}: {e}")
     
     # --- Output Results ---
-    if df_result is not None:
+    if project_mode:
+        project, basic, provenance = qfl_project()
+        if project.rows:
+            st.subheader("📊 Project Samples")
+            st.caption(f"{project.rows:,} samples from {project.version} addition(s); the latest rows are shown.")
+            st.dataframe(project.table.tail(100))
+            st.download_button(f"📥 Download {table_format.upper()}", lambda: table_bytes(project.table, table_format),
+                               f"QFL_project{table_suffix}", table_mime)
+            st.button("🗑️ Clear project", on_click=clear_project)
+
+            st.subheader("🧭 Provenance Summary")
+            st.dataframe(provenance_summary(counts=project.stats.field_counts), hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Ternary Diagram")
+                st.image(basic.png())
+            with col2:
+                st.subheader("Provenance Fields")
+                st.image(provenance.png())
+        else:
+            st.info("The project is empty: generate an entry or upload a file to add samples.")
+
+    elif df_result is not None:
         st.subheader("📊 Computed QFL Table")
         st.dataframe(df_result)
-        st.download_button("📥 Download CSV", to_csv(df_result), "QFL_data.csv", "text/csv")
-    
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Ternary Diagram")
-            fig = plot_basic_ternary(df_result)
-            st.pyplot(fig)
-
-            buf1 = io.BytesIO()
-            fig.savefig(buf1, format='png', bbox_inches='tight')
-            buf1.seek(0)
-            
-            st.download_button("📥 Download Plot", buf1, "RAWplot.png", "image/png")
-    
-        with col2:
-            st.subheader("Provenance Fields")
-            fig2 = plot_provenance_ternary(df_result)
-            st.pyplot(fig2)
-
-            buf2 = io.BytesIO()
-            fig.savefig(buf2, format='png', bbox_inches='tight')
-            buf2.seek(0)
-            st.download_button("📥 Download Plot", buf2, "Prov_plot.png", "image/png")
-    
-        
+        st.download_button(f"📥 Download {table_format.upper()}",
+                           table_file(content_key('qfl', data_key, group), table_format, df_result), f"QFL_data{table_suffix}", table_mime)
+
+        st.subheader("🧭 Provenance Summary")
+        st.dataframe(provenance_summary(df_result['Provenance']), hide_index=True)
+
+        if group or overall:
+            st.subheader(f"🗂️ Groups by {group}" if group else "🗂️ Compositional Statistics")
+            st.caption("Arithmetic means and compositional centroids (closed geometric means) in %; "
+                       "total variance of the centred log-ratios.")
+            groups_df = group_table(data_key, group, df_result)
+            st.dataframe(groups_df)
+            st.download_button(f"📥 Download Group Summary ({table_format.upper()})",
+                               table_file(content_key('qfl_groups', data_key, group), table_format, groups_df.reset_index()),
+                               f"QFL_groups{table_suffix}", table_mime)
+
+    elif stream_result is not None:
+        st.subheader("📊 Computed QFL Table")
+        st.caption(f"Streamed {stream_result.rows:,} rows in chunks; showing a uniform sample of {len(stream_result.sample):,}.")
+        st.dataframe(stream_result.sample)
+        st.download_button(f"📥 Download {table_format.upper()}", lambda: streamed_table(data, name, table_format),
+                           f"QFL_data{table_suffix}", table_mime)
+
+        st.subheader("🧭 Provenance Summary")
+        st.dataframe(provenance_summary(counts=stream_result.field_counts), hide_index=True)
+
+    if df_result is not None or stream_result is not None:
+        # Statistics need every row, so streamed uploads (a sample only) get none
+        # The streamed figures are drawn from the density grid, not the rows,
+        # so they are cached apart from the in-memory ones of the same upload
+        if stream_result is not None:
+            df_plot, counts, rows = stream_result.sample, stream_result.density, stream_result.rows
+            plot_key = content_key(data_key, 'stream')
+            stats = {}
+        else:
+            df_plot, counts, rows = df_result, None, None
+            plot_key = data_key
+            stats = {'group': group, 'regions': regions if group or overall else None, 'level': level}
+
+        if renderer == RENDERERS[0]:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Ternary Diagram")
+                png1 = run_job('qfl_basic', content_key(plot_key, 'basic', density_threshold, repr(stats)), heavy,
+                               plot_png, 'basic', plot_key, df_plot, density_threshold, counts, rows, **stats)
+                if png1 is not None:
+                    st.image(png1)
+                st.download_button(f"📥 Download Plot ({export_format.upper()})",
+                                   lambda: plot_png('basic', plot_key, df_plot, density_threshold, counts, rows, **stats,
+                                                    fmt=export_format, dpi=export_dpi),
+                                   f"RAWplot.{export_format}", EXPORT_FORMATS[export_format])
+
+            with col2:
+                st.subheader("Provenance Fields")
+                png2 = run_job('qfl_provenance', content_key(plot_key, 'provenance', density_threshold, repr(stats)), heavy,
+                               plot_png, 'provenance', plot_key, df_plot, density_threshold, counts, rows, **stats)
+                if png2 is not None:
+                    st.image(png2)
+                st.download_button(f"📥 Download Plot ({export_format.upper()})",
+                                   lambda: plot_png('provenance', plot_key, df_plot, density_threshold, counts, rows, **stats,
+                                                    fmt=export_format, dpi=export_dpi),
+                                   f"Prov_plot.{export_format}", EXPORT_FORMATS[export_format])
+        else:
+            st.subheader("Provenance Fields (interactive)")
+            if stream_result is not None:
+                st.caption("Streamed upload: the view holds the uniform sample shown above.")
+            interactive_chart('qfl', lambda box: qfl_figure(plot_key, box, df_plot))
+
 
 # --- Page: CIA Analysis ---
 elif st.session_state.page == "cia":
@@ -200,156 +488,334 @@ elif st.session_state.page == "cia":
     st.markdown("Upload oxide data to compute the CIA index and generate alteration plots.")
 
     import pandas as pd
-    import math
-    import matplotlib.pyplot as plt
     import io
-    
-    def ternary_to_xy(a, cn, k):
-        total = a + cn + k
-        a /= total
-        cn /= total
-        k /= total
-        x = 0.5 * (2 * k + a)
-        y = (1) * a
-        return x, y
-
-    # --- Plotting function ---
-    def plot_ternary(data, marker="o", marker_color="black", show_labels=True):
-        fig, ax = plt.subplots(figsize=(8, 7))
-        ax.set_xlim(-0.1, 1.1)
-        ax.set_ylim(-0.1, 1 + 0.1)
-        ax.axis('off')
-
-        # Draw triangle
-        triangle = [(0, 0), (1, 0), (0.5, 1), (0, 0)]
-        x_tri, y_tri = zip(*triangle)
-        ax.plot(x_tri, y_tri, 'k-', lw=2)
-
-        # Draw line
-        line = [(-0.1, 0), (-0.1, 1), (-0.1, 0)]
-        x_li, y_li = zip(*line)
-        ax.plot(x_li, y_li, 'k-', lw=2)
-
-        # Mark Lavel and grid
-        for i in range(11):
-            fcn = i/10
-            x_m,y_m = zip((-0.1,1-fcn ), (-0.1, 1))
-            ax.plot(x_m, y_m, marker='x', color='black',lw=0)
-
-            for j in range(11):
-              ax.text(-0.15,j/10, f"{int(j * 10)}", ha='left', fontsize=8)
-            # strong weathering
-        lines = [(-0.1, 0.85), (0.57, 0.85)]
-        x_li, y_li = zip(*lines)
-        ax.plot(x_li, y_li, linestyle='--', color='gray')
-        ax.text(-0.001, 0.87, 'Strong\nweathering', ha='center', fontsize=7,color = "gray")
-        ax.text(0.6, 1, 'Kaolinite', ha='center', fontsize=7,color = "gray")
-
-             # Intermediate weathering
-        lines = [(-0.1, 0.65), (0.68, 0.65)]
-        x_li, y_li = zip(*lines)
-        ax.plot(x_li, y_li, linestyle='--', color='gray')
-        ax.text(-0.001, 0.67, 'Intermediate\nweathering', ha='center', fontsize=7,color = "gray")
-        ax.text(0.3, 0.77, 'Smectite', ha='center', fontsize=7,color = "gray")
-        ax.text(0.63, 0.77, 'Illite\n \n  Muscovite', ha='left', fontsize=7,color = "gray")
-
-         # Weak weathering
-        lines = [(-0.1, 0.5), (0.75, 0.5)]
-        x_li, y_li = zip(*lines)
-        ax.plot(x_li, y_li, linestyle='--', color='gray')
-        ax.text(-0.001, 0.52, 'Weak\nweathering', ha='center', fontsize=7,color = "gray")
-        ax.text(0.51, 0.52, 'Average granite', ha='center', fontsize=7,color = "gray")
-        ax.text(0.2, 0.52, 'Plahioclase', ha='center', fontsize=7,color = "gray")
-        ax.text(0.8, 0.52, 'K-feldspar', ha='center', fontsize=7,color = "gray")
-        ax.text(0.35, 0.46, 'Average gabbro', ha='center', fontsize=7,color = "gray")
-
-          # Arrows & Lines
-        plt.arrow(0.28, 0.52, 0.145, 0.3, head_width=0.01, head_length=0.01, fc='red', ec='red')
-        plt.arrow(0.48, 0.54, 0.115, 0.23, head_width=0.01, head_length=0.01, fc='red', ec='red')
-
-        lineAR = [(0.5375, 0.655), (0.2, 0.62),(0.3525,0.67)]
-        x_li, y_li = zip(*lineAR)
-        ax.plot(x_li, y_li, linestyle='-', color='gray',lw=1)
-        ax.text(0.16, 0.58, 'Weathring\ntrend', ha='center', fontsize=6,color = "gray",fontstyle='italic')
-
-        # Axis labels
-        ax.text(0.5, 1 + 0.05, 'A (Al₂O₃)', ha='center', fontsize=14)
-        ax.text(-0.05, -0.05, 'CN (CaO + Na₂O)', ha='right', fontsize=14)
-        ax.text(1.05, -0.05, 'K (K₂O)', ha='left', fontsize=14)
-
-        # Plot points
-        for label, cn, a, k in data:
-            x, y = ternary_to_xy(cn, a, k)
-            ax.plot(x, y, marker=marker, color=marker_color, markersize=5)
-            if show_labels:
-                ax.text(x + 0.01, y + 0.01, label, fontsize=10)
-        
-
-        return fig
+    from lithora.cia import OPTIONAL_OXIDES, REQUIRED_OXIDES, compute_cia
+    from lithora.formats import OUTPUT_FORMATS, UPLOAD_TYPES, read_table, table_columns
+    from lithora.plots import plot_ternary
+    from lithora.compositional import CONFIDENCE, REGIONS, GroupSummary
+    from lithora.parsing import describe_problems, parse_columns
+    from lithora.density import DENSITY_THRESHOLD
+    from lithora.cache import content_key
+    from lithora.export import EXPORT_DPI, EXPORT_FORMATS, figure_to_bytes, figure_to_png
 
     # --- UI ---
     st.title("🧪 CIA Ternary Plot Tool")
 
-    with st.form("cia_form"):
-        a_input = st.text_area("A (Al₂O₃)", placeholder="e.g., 60, 50, 50")
-        cn_input = st.text_area("CN (CaO + Na₂O)", placeholder="e.g., 30, 20, 10")
-        k_input = st.text_area("K (K₂O)", placeholder="e.g., 10, 30, 40")
-       
+    mode = st.sidebar.radio("Select Input Mode", ["📝 Manual Entry (A, CN, K)", "📁 Upload Oxide Table"])
+
+    marker = st.sidebar.selectbox("Select Marker Type", ["o", "s", "^","H",], index=0)
+    color = st.sidebar.color_picker("Pick Marker Color", "#000000")
+    color_by_cia = st.sidebar.checkbox("Colour points by CIA")
+    density_threshold = st.sidebar.number_input("Density plot above (rows)", min_value=0, value=DENSITY_THRESHOLD, step=1000)
+    table_format = st.sidebar.selectbox("Table download format", list(OUTPUT_FORMATS), format_func=str.upper)
+    table_suffix, table_mime = OUTPUT_FORMATS[table_format]
+    export_format = st.sidebar.selectbox("Figure download format", list(EXPORT_FORMATS), format_func=str.upper)
+    export_dpi = st.sidebar.number_input("Figure download DPI", min_value=72, max_value=1200, value=EXPORT_DPI, step=50)
+    with st.sidebar.expander("📐 Compositional statistics"):
+        regions = tuple(st.multiselect("Regions around centroids", REGIONS, default=['confidence']))
+        level = st.slider("Region level", 0.50, 0.99, CONFIDENCE, 0.01)
+        overall = st.checkbox("Without groups: centroid of all samples")
+
+    # --- Cached stages, keyed by the content hash of the input ---
+    # Arguments starting with "_" are not hashed by Streamlit; `key` stands in for them.
+    cached = stage_cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+    # Tables and encoded figures also go to the on-disk store
+    stored_stage = stage_cache(store=True, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+
+    @stored_stage
+    def load_cia_table(key, _data, name, group=None):
+        # Only the oxides used by the indices (Label and the grouping column) are parsed
+        df = read_table(io.BytesIO(_data), name, required=REQUIRED_OXIDES + ([group] if group else []),
+                        optional=OPTIONAL_OXIDES + ['Label'])
+        jobs.checkpoint(0.6, "Computing CIA")
+        return compute_cia(df)
+
+    @stored_stage
+    def group_table(key, group, _df):
+        groups = _df[group] if group else None
+        return GroupSummary(_df[['A', 'CN', 'K']].to_numpy(), groups, ['A', 'CN', 'K']).table()
+
+    # fmt None: the on-screen PNG on the raster template. Otherwise a download
+    # drawn on the vector diagram, only encoded when the button is clicked.
+    @stored_stage
+    def cia_png(key, _labels, _a, _cn, _k, _cia, marker, color, color_by_cia, density_threshold, group=None,
+                _groups=None, regions=None, level=CONFIDENCE, fmt=None, dpi=None):
+        if _labels is None:
+            _labels = [f"S{i+1}" for i in range(len(_a))]
+        plot_data = list(zip(_labels, _a, _cn, _k))
+        values = _cia if color_by_cia else None
+        fig = plot_ternary(plot_data, marker=marker, marker_color=color, values=values,
+                           density_threshold=density_threshold, vector=fmt is not None,
+                           groups=_groups, group_title=group, regions=regions, level=level)
+        return figure_to_png(fig) if fmt is None else figure_to_bytes(fig, fmt, dpi=dpi)
+
+    @cached
+    def cia_figure(key, box, _labels, _a, _cn, _k, _cia):
+        from lithora.interactive import cia_view
+        return cia_view(_labels, _a, _cn, _k, _cia).figure(box)
+
+    def show_plot(key, labels, a, cn, k, cia, group=None, groups=None, renderer=RENDERERS[0], heavy=False):
+        if renderer != RENDERERS[0]:
+            st.subheader("📈 CIA Ternary Plot (interactive)")
+            interactive_chart('cia', lambda box: cia_figure(key, box, labels, a, cn, k, cia))
+            return
+        style = (marker, color, color_by_cia, density_threshold, group, groups,
+                 regions if group or overall else None, level)
+        # `groups` is a column of the table behind `key`; the rest of the style is hashable
+        job_key = content_key(key, style[:5], style[6:])
+        buf = run_job('cia_plot', job_key, heavy, cia_png, key, labels, a, cn, k, cia, *style)
+        if buf is None:
+            return
+
+        st.markdown("<div style='margin-top:40px;'>", unsafe_allow_html=True)
+        st.subheader("📈 CIA Ternary Plot")
+        st.image(buf, caption="CIA Ternary Diagram")
+        st.markdown("</div>", unsafe_allow_html=True)
+        st.download_button(f"📥 Download Plot ({export_format.upper()})",
+                           lambda: cia_png(key, labels, a, cn, k, cia, *style, fmt=export_format, dpi=export_dpi),
+                           f"cia_plot.{export_format}", EXPORT_FORMATS[export_format])
+
+    if mode == "📝 Manual Entry (A, CN, K)":
+        decimal = st.sidebar.radio("Decimal separator", ["auto", ".", ","], horizontal=True)
+        with st.form("cia_form"):
+            a_input = st.text_area("A (Al₂O₃)", placeholder="e.g., 60, 50, 50")
+            cn_input = st.text_area("CN (CaO + Na₂O)", placeholder="e.g., 30, 20, 10")
+            k_input = st.text_area("K (K₂O)", placeholder="e.g., 10, 30, 40")
+
+            submit = st.form_submit_button("Generate Plot")
+
+        if submit:
+            try:
+                values, rows, problems = parse_columns([a_input, cn_input, k_input], ["A", "CN", "K"], decimal)
+                a_vals, cn_vals, k_vals = values.T
+                if problems:
+                    st.warning(describe_problems(problems))
+
+                if not len(values):
+                    if not problems:
+                        st.error("Enter at least one value in each box.")
+                else:
+                    # Labels keep the entry numbers, so skipped rows leave gaps
+                    label_list = [f"S{i}" for i in rows]
+
+                    # Data Table
+                    df = pd.DataFrame({
+                        "Label": label_list,
+                        "A (Al₂O₃)": a_vals,
+                        "CN (CaO+Na₂O)": cn_vals,
+                        "K (K₂O)": k_vals
+                    })
+                    df["CIA"] = (df["A (Al₂O₃)"] / (df["A (Al₂O₃)"] + df["CN (CaO+Na₂O)"] + df["K (K₂O)"]) * 100).round(2)
+
+                    data_key = content_key(a_input, cn_input, k_input, decimal)
+                    show_plot(data_key, label_list, a_vals, cn_vals, k_vals, df["CIA"])
+                    st.subheader("📄 Data Table")
+                    st.dataframe(df)
+
+                    # CSV download
+                    st.download_button(f"📥 Download Data ({table_format.upper()})",
+                                       table_file(content_key('cia', data_key), table_format, df), f"cia_data{table_suffix}", table_mime)
 
-        marker = st.selectbox("Select Marker Type", ["o", "s", "^","H",], index=0)
-        color = st.color_picker("Pick Marker Color", "#000000")
+            except Exception as e:
+                st.error(f"Error: {e}")
 
-        submit = st.form_submit_button("Generate Plot")
+    else:
+        st.subheader("Upload Oxide Table")
+        st.markdown("Columns in wt%: **Al2O3, CaO, Na2O, K2O** (optional **P2O5, CO2** for the CaO* correction). "
+                    "An optional **Label** column names the samples.")
+        uploaded_file = st.file_uploader("Upload oxide table (CSV, Parquet or Feather)", type=UPLOAD_TYPES)
+        renderer = st.sidebar.radio("Diagram renderer", RENDERERS, horizontal=True)
 
-    if submit:
-        try:
-            a_vals = [float(i.strip()) for i in a_input.split(",")]
-            cn_vals = [float(i.strip()) for i in cn_input.split(",")]
-            k_vals = [float(i.strip()) for i in k_input.split(",")]
-            
-
-            if not (len(cn_vals) == len(k_vals) == len(a_vals)):
-                st.error("All input lists must be the same length.")
-            else:
-                label_list = [f"S{i+1}" for i in range(len(cn_vals))]
-
-                plot_data = list(zip(label_list, a_vals, cn_vals, k_vals))
-
-                # Create figure
-                fig = plot_ternary(plot_data, marker=marker, marker_color=color)
-
-                # Save to BytesIO
-                buf = io.BytesIO()
-                fig.savefig(buf, format='png', bbox_inches='tight')
-                buf.seek(0)
-
-                st.markdown("<div style='margin-top:40px;'>", unsafe_allow_html=True)
-                st.subheader("📈 CIA Ternary Plot")
-                st.image(buf, caption="CIA Ternary Diagram")
-                st.markdown("</div>", unsafe_allow_html=True)
-                 # PNG download
-                st.download_button("📥 Download Plot (PNG)", buf, "cia_plot.png", "image/png")
-
-                # Data Table
-                df = pd.DataFrame({
-                    "Label": label_list,
-                    "A (Al₂O₃)": a_vals,
-                    "CN (CaO+Na₂O)": cn_vals,
-                    "K (K₂O)": k_vals
-                })
-                st.subheader("📄 Data Table")
-                st.dataframe(df)
-
-                # CSV download
-                csv = df.to_csv(index=False).encode()
-                st.download_button("📥 Download Data (CSV)", csv, "cia_data.csv", "text/csv")
-
-               
+        if uploaded_file:
+            try:
+                data, name = uploaded_file.getvalue(), uploaded_file.name
+                data_key = content_key(data, name)
+                # Any other column (e.g. Formation, Well) can split the samples into groups
+                extra = [col for col in table_columns(io.BytesIO(data), name)
+                         if col not in REQUIRED_OXIDES + OPTIONAL_OXIDES + ['Label']]
+                group = st.sidebar.selectbox("Group by column", [None] + extra,
+                                             format_func=lambda col: col or "(none)")
+                heavy = len(data) > jobs.BACKGROUND_ABOVE_MB * 2**20
+                df_cia = run_job('cia_table', content_key(data_key, group), heavy,
+                                 load_cia_table, data_key, data, name, group)
+                if df_cia is not None:
+                    st.subheader("📄 CIA Table")
+                    st.dataframe(df_cia)
+                    st.download_button(f"📥 Download CIA Table ({table_format.upper()})",
+                                       table_file(content_key('cia', data_key, group), table_format, df_cia), f"cia_results{table_suffix}", table_mime)
+
+                    if group or overall:
+                        st.subheader(f"🗂️ Groups by {group}" if group else "🗂️ Compositional Statistics")
+                        st.caption("Arithmetic means and compositional centroids (closed geometric means) of A-CN-K in %; "
+                                   "total variance of the centred log-ratios.")
+                        groups_df = group_table(data_key, group, df_cia)
+                        st.dataframe(groups_df)
+                        st.download_button(f"📥 Download Group Summary ({table_format.upper()})",
+                                           table_file(content_key('cia_groups', data_key, group), table_format, groups_df.reset_index()),
+                                           f"cia_groups{table_suffix}", table_mime)
+
+                    label_list = df_cia["Label"] if "Label" in df_cia.columns else None
+                    show_plot(data_key, label_list, df_cia["A"], df_cia["CN"], df_cia["K"], df_cia["CIA"],
+                              group, df_cia[group] if group else None, renderer, heavy)
 
-        except Exception as e:
-            st.error(f"Error: {e}")
+            except Exception as e:
+                st.error(f"Error reading {uploaded_file.name}: {e}")
+
+
+
+# --- Page: Ternary discrimination diagrams (Qm-F-Lt, Folk, A-CNK-FM, ...) ---
+elif st.session_state.page == "diagrams":
+    st.title("🔺 Ternary Discrimination Diagrams")
+    st.button("⬅️ Back to Home", on_click=go_home)
+
+    import io
+    from lithora.diagrams import DIAGRAMS, compute_diagram
+    from lithora.plots import plot_diagram
+    from lithora.parsing import describe_problems, parse_columns
+    from lithora.density import DENSITY_THRESHOLD
+    from lithora.formats import OUTPUT_FORMATS, UPLOAD_TYPES, read_table, table_columns
+    from lithora.cache import content_key
+    from lithora.compositional import CONFIDENCE, REGIONS, GroupSummary
+    from lithora.export import EXPORT_DPI, EXPORT_FORMATS, figure_to_bytes, figure_to_png
+
+    # --- Sidebar ---
+    diagram_name = st.sidebar.selectbox("Diagram", list(DIAGRAMS), format_func=lambda name: DIAGRAMS[name].title)
+    spec = DIAGRAMS[diagram_name]
+    mode = st.sidebar.radio("Select Input Mode", ["📝 Manual Entry", "📁 Upload File"])
+    density_threshold = st.sidebar.number_input("Density plot above (rows)", min_value=0, value=DENSITY_THRESHOLD, step=1000)
+    table_format = st.sidebar.selectbox("Table download format", list(OUTPUT_FORMATS), format_func=str.upper)
+    table_suffix, table_mime = OUTPUT_FORMATS[table_format]
+    export_format = st.sidebar.selectbox("Figure download format", list(EXPORT_FORMATS), format_func=str.upper)
+    export_dpi = st.sidebar.number_input("Figure download DPI", min_value=72, max_value=1200, value=EXPORT_DPI, step=50)
+    with st.sidebar.expander("📐 Compositional statistics"):
+        regions = tuple(st.multiselect("Regions around centroids", REGIONS, default=['confidence']))
+        level = st.slider("Region level", 0.50, 0.99, CONFIDENCE, 0.01)
+        overall = st.checkbox("Without groups: centroid of all samples")
+
+    st.markdown(f"**{spec.title}** – {spec.source}")
+
+    # --- Cached stages, keyed by diagram and the content hash of the input ---
+    cached = stage_cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+    stored_stage = stage_cache(store=True, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+
+    @stored_stage
+    def load_diagram_table(diagram, key, _data, name, group=None):
+        # Only the columns the diagram reads (and the grouping column) are parsed
+        spec = DIAGRAMS[diagram]
+        df = read_table(io.BytesIO(_data), name, required=spec.required + ([group] if group else []),
+                        optional=spec.optional)
+        jobs.checkpoint(0.6, "Computing and classifying")
+        df_result = compute_diagram(diagram, df)
+        if group:
+            df_result.insert(0, group, df[group].to_numpy())
+        return df_result
+
+    @cached
+    def manual_diagram(diagram, key, _t, _l, _r):
+        return DIAGRAMS[diagram].compute(_t, _l, _r)
+
+    @stored_stage
+    def group_table(diagram, key, group, _df):
+        names = [col.lstrip('%') for col in DIAGRAMS[diagram].percent]
+        return GroupSummary(_df[DIAGRAMS[diagram].percent].to_numpy(), _df[group] if group else None, names).table()
+
+    # fmt None: the on-screen PNG on the raster template; otherwise a download on the vector diagram
+    @stored_stage
+    def diagram_png(diagram, key, _df, density_threshold, group=None, regions=None, level=CONFIDENCE, fmt=None,
+                    dpi=None):
+        fig = plot_diagram(diagram, _df, density_threshold=density_threshold, vector=fmt is not None,
+                           groups=_df[group] if group else None, group_title=group, regions=regions, level=level)
+        jobs.checkpoint(0.8, "Encoding")
+        return figure_to_png(fig) if fmt is None else figure_to_bytes(fig, fmt, dpi=dpi)
+
+    @cached
+    def diagram_figure(diagram, key, box, _df):
+        from lithora.interactive import diagram_view
+        return diagram_view(diagram, _df).figure(box)
+
+    # --- Input Handling ---
+    df_result = None
+    data_key = None
+    group = None
+    renderer = RENDERERS[0]
+    heavy = False
+
+    if mode == "📝 Manual Entry":
+        st.subheader("Manual Input")
+        if spec.convert is not None:
+            st.caption(f"Enter the {', '.join(spec.columns)} values directly; uploads take "
+                       f"{', '.join(spec.required)} and convert them.")
+        decimal = st.sidebar.radio("Decimal separator", ["auto", ".", ","], horizontal=True)
+        inputs = [st.text_area(f"{col} Values (comma, tab or line separated)", key=f"{diagram_name}_{col}")
+                  for col in spec.columns]
+
+        if st.button("Generate Ternary Plot"):
+            try:
+                values, rows, problems = parse_columns(inputs, spec.columns, decimal)
+                if problems:
+                    st.warning(describe_problems(problems))
+                if len(values):
+                    data_key = content_key(*inputs, decimal)
+                    df_result = manual_diagram(diagram_name, data_key, values[:, 0], values[:, 1], values[:, 2])
+                elif not problems:
+                    st.error("Enter at least one value in each box.")
+            except ValueError as e:
+                st.error(f"Missing Data!! {e}")
+            except Exception as e:
+                st.error(f"Error parsing input: {e}")
+
+    else:
+        st.subheader("Upload Data File")
+        listed = ", ".join(spec.required) + (f" [, {', '.join(spec.optional)}]" if spec.optional else "")
+        uploaded_file = st.file_uploader(f"Upload CSV, Parquet or Feather with columns: {listed}", type=UPLOAD_TYPES)
+        renderer = st.sidebar.radio("Diagram renderer", RENDERERS, horizontal=True)
+
+        if uploaded_file:
+            try:
+                data, name = uploaded_file.getvalue(), uploaded_file.name
+                data_key = content_key(data, name)
+                heavy = len(data) > jobs.BACKGROUND_ABOVE_MB * 2**20
+                known = set(spec.required) | set(spec.optional)
+                extra = [col for col in table_columns(io.BytesIO(data), name) if col not in known]
+                group = st.sidebar.selectbox("Group by column", [None] + extra,
+                                             format_func=lambda col: col or "(none)")
+                df_result = run_job('diagram_table', content_key(data_key, diagram_name, group), heavy,
+                                    load_diagram_table, diagram_name, data_key, data, name, group)
+            except Exception as e:
+                st.error(f"Error reading {uploaded_file.name}: {e}")
+
+    # --- Output Results ---
+    if df_result is not None:
+        st.subheader("📊 Computed Table")
+        st.dataframe(df_result)
+        st.download_button(f"📥 Download {table_format.upper()}",
+                           table_file(content_key(diagram_name, data_key, group), table_format, df_result),
+                           f"{diagram_name}_data{table_suffix}", table_mime)
+
+        if spec.fields:
+            st.subheader("🧭 Field Summary")
+            st.dataframe(spec.summary(df_result[spec.field_column]), hide_index=True)
+
+        stats = {'group': group, 'regions': regions if group or overall else None, 'level': level}
+        if group or overall:
+            st.subheader(f"🗂️ Groups by {group}" if group else "🗂️ Compositional Statistics")
+            groups_df = group_table(diagram_name, data_key, group, df_result)
+            st.dataframe(groups_df)
+
+        if renderer == RENDERERS[0]:
+            st.subheader(spec.title)
+            png = run_job('diagram_plot', content_key(data_key, diagram_name, density_threshold, repr(stats)), heavy,
+                          diagram_png, diagram_name, data_key, df_result, density_threshold, **stats)
+            if png is not None:
+                st.image(png)
+            st.download_button(f"📥 Download Plot ({export_format.upper()})",
+                               lambda: diagram_png(diagram_name, data_key, df_result, density_threshold, **stats,
+                                                   fmt=export_format, dpi=export_dpi),
+                               f"{diagram_name}.{export_format}", EXPORT_FORMATS[export_format])
+        else:
+            st.subheader(f"{spec.title} (interactive)")
+            interactive_chart(f"diagram_{diagram_name}", lambda box: diagram_figure(diagram_name, data_key, box, df_result))
 
-    
 
 # --- Page: Rainfall Plot ---
 elif st.session_state.page == "rainfall":
@@ -357,5 +823,128 @@ elif st.session_state.page == "rainfall":
     st.button("⬅️ Back to Home", on_click=go_home)
 
     st.markdown("Upload rainfall data to plot intensity and trend over time.")
-    st.info("🔧Comming Soon..")
 
+    import io
+    from pathlib import Path
+    from lithora.rainfall import stream_rainfall
+    from lithora.idf import DISTRIBUTIONS, fit_annual_max, idf_table
+    from lithora.plots import plot_idf, plot_rainfall
+    from lithora.cache import content_key
+    from lithora.export import figure_to_png
+
+    # --- Sidebar options ---
+    time_format = st.sidebar.text_input("Timestamp format (optional)", placeholder="%Y-%m-%d %H:%M",
+                                        help="strftime pattern; inferred from the first rows when empty")
+    totals_step = st.sidebar.radio("Totals table", ["Hourly", "Daily", "Monthly"], index=1)
+    distribution = st.sidebar.selectbox("IDF distribution", DISTRIBUTIONS, format_func=str.upper)
+
+    # --- Cached stages, keyed by the content hash of the input ---
+    # Arguments starting with "_" are not hashed by Streamlit; `key` stands in for them.
+    cached = stage_cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+    # Tables and encoded figures also go to the on-disk store
+    stored_stage = stage_cache(store=True, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+
+    @cached
+    def load_rainfall(key, _data, time_format):
+        return stream_rainfall(io.BytesIO(_data), time_format=time_format or None)
+
+    @cached
+    def totals_csv(key, step, _series):
+        return _series.rename_axis('Timestamp').to_csv().encode()
+
+    @stored_stage
+    def rainfall_png(key, _hourly, _monthly, title):
+        return figure_to_png(plot_rainfall(_hourly, _monthly, title))
+
+    # Fits start from the cached accumulator's annual maxima, so switching
+    # the distribution never rereads the upload.
+    @cached
+    def idf_fit(key, _annual, distribution):
+        return idf_table(fit_annual_max(_annual, distribution))
+
+    @stored_stage
+    def idf_png(key, distribution, _table, title):
+        return figure_to_png(plot_idf(_table, title))
+
+    # --- Input Handling ---
+    st.subheader("Upload Gauge Records")
+    uploaded_files = st.file_uploader("Upload CSV with a timestamp column and a rainfall depth (mm) column",
+                                      type="csv", accept_multiple_files=True)
+
+    # --- Output Results: one section per station file ---
+    # Widgets and job slots are named by upload position: two stations may
+    # share a file name (a/st1.csv, b/st1.csv) or even identical content
+    for n, uploaded_file in enumerate(uploaded_files or []):
+        station = Path(uploaded_file.name).stem
+        st.subheader(f"📍 {station}")
+        try:
+            data = uploaded_file.getvalue()
+            data_key = content_key(data, time_format)
+            heavy = len(data) > jobs.BACKGROUND_ABOVE_MB * 2**20
+            acc = run_job(f"rainfall_{n}", data_key, heavy, load_rainfall, data_key, data, time_format)
+        except Exception as e:
+            st.error(f"Error reading {uploaded_file.name}: {e}")
+            continue
+        if acc is None:
+            continue
+        if not acc.rows:
+            st.warning("No valid records found.")
+            continue
+
+        hourly, monthly = acc.hourly, acc.monthly
+        st.caption(f"{acc.rows:,} records, {hourly.index[0]:%Y-%m-%d} to {hourly.index[-1]:%Y-%m-%d}, "
+                   f"total {acc.total:,.1f} mm")
+        st.image(rainfall_png(data_key, hourly, monthly, station))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Maximum intensities**")
+            st.dataframe(acc.intensities, hide_index=True)
+        with col2:
+            totals = {'Hourly': hourly, 'Daily': acc.daily, 'Monthly': monthly}[totals_step]
+            st.markdown(f"**{totals_step} totals (mm)**")
+            st.dataframe(totals, height=388)
+            st.download_button(f"📥 Download {totals_step} Totals", totals_csv(data_key, totals_step, totals),
+                               f"{station}_{totals_step.lower()}.csv", "text/csv", key=f"dl_{n}")
+
+        # --- IDF curves ---
+        st.markdown(f"**IDF curves ({distribution.upper()})**")
+        annual = acc.annual_max
+        if len(annual) < 3:
+            st.info(f"IDF fitting needs at least 3 years of records; this file covers {len(annual)}.")
+            continue
+        table = idf_fit(data_key, annual, distribution)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.image(idf_png(data_key, distribution, table, f"{station} – {len(annual)} years"))
+        with col2:
+            st.caption("Intensity (mm/h) by duration and return period")
+            st.dataframe(table)
+            st.download_button("📥 Download IDF Table", table.to_csv().encode(), f"{station}_idf_{distribution}.csv",
+                               "text/csv", key=f"idf_{n}")
+
+
+# --- Cancel background jobs this run no longer asked for (page change, file removed) ---
+seen = st.session_state.pop("jobs_seen", set())
+for slot in [slot for slot in st.session_state.get("jobs", {}) if slot not in seen]:
+    drop_job(slot)
+
+# --- Debug panel: spans recorded during this run ---
+if records is not None:
+    instrument.stop()
+    import pandas as pd
+
+    with st.sidebar.expander("🐞 Timings of this run", expanded=True):
+        rss = instrument.rss_mb()
+        st.caption(f"Run: {(time.perf_counter() - run_start) * 1000:,.0f} ms"
+                   + (f" · RSS {rss:,.0f} MB" if rss is not None else ""))
+        if warmup.done.is_set():
+            st.caption("Warm-up: " + " · ".join(f"{k} {v * 1000:,.0f} ms" for k, v in warmup.timings.items()))
+        elif warmup.ENABLED:
+            st.caption("Warm-up still running")
+        if records:
+            spans = pd.DataFrame(records)
+            spans['span'] = ["· " * depth + name for depth, name in zip(spans.pop('depth'), spans['span'])]
+            st.dataframe(spans, hide_index=True)
+        else:
+            st.caption("No instrumented stages ran.")
@@ -0,0 +1,59 @@
+# Lithora core: numerical helpers shared by the Streamlit pages, the batch CLI
+# and notebooks. Nothing in this package imports Streamlit, and Matplotlib is
+# only loaded once a plotting function is first used:
+#
+#     from lithora import compute_qfl      # numpy + pandas only
+#     from lithora import plot_ternary     # pulls in matplotlib / mpltern
+import importlib
+
+_EXPORTS = {
+    # QFL point counts
+    'parse_input_list': 'lithora.qfl',
+    'compute_qfl': 'lithora.qfl',
+    'classify_provenance': 'lithora.qfl',
+    'provenance_summary': 'lithora.qfl',
+    'stream_qfl': 'lithora.ingest',
+    'QFLProject': 'lithora.project',
+    # Ternary diagrams declared as data (QFL, Qm-F-Lt, Folk, A-CNK-FM)
+    'Diagram': 'lithora.ternary',
+    'DIAGRAMS': 'lithora.diagrams',
+    'compute_diagram': 'lithora.diagrams',
+    # CIA (A-CN-K)
+    'compute_cia': 'lithora.cia',
+    'ternary_to_xy': 'lithora.cia',
+    # Compositional statistics
+    'closure': 'lithora.compositional',
+    'alr': 'lithora.compositional',
+    'clr': 'lithora.compositional',
+    'ilr': 'lithora.compositional',
+    'center': 'lithora.compositional',
+    'GroupSummary': 'lithora.compositional',
+    # Rain-gauge records
+    'stream_rainfall': 'lithora.rainfall',
+    # Figures
+    'plot_basic_ternary': 'lithora.plots',
+    'plot_provenance_ternary': 'lithora.plots',
+    'plot_ternary': 'lithora.plots',
+    'plot_rainfall': 'lithora.plots',
+    'plot_diagram': 'lithora.plots',
+    'qfl_view': 'lithora.interactive',
+    'cia_view': 'lithora.interactive',
+    'diagram_view': 'lithora.interactive',
+    'figure_to_png': 'lithora.export',
+    'figure_to_file': 'lithora.export',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'lithora' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
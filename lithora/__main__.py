@@ -0,0 +1,5 @@
+import sys
+
+from lithora.cli import main
+
+sys.exit(main())
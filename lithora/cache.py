@@ -0,0 +1,21 @@
+import hashlib
+import os
+
+# Bounds for the Streamlit result caches. Each cached function keeps at most
+# CACHE_MAX_ENTRIES results (least recently used go first), and any result
+# older than CACHE_TTL seconds is dropped, so a long-lived server stays flat.
+CACHE_MAX_ENTRIES = int(os.environ.get("LITHORA_CACHE_ENTRIES", 32))
+CACHE_TTL = int(os.environ.get("LITHORA_CACHE_TTL", 60 * 60))
+
+
+# --- Content hash used as the cache key for a dataset ---
+def content_key(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        elif not isinstance(part, (bytes, bytearray, memoryview)):
+            part = repr(part).encode('utf-8')
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.hexdigest()
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from lithora.instrument import traced
+
+# --- Molecular weights (g/mol) ---
+MOLAR_MASS = {
+    'Al2O3': 101.96,
+    'CaO': 56.08,
+    'Na2O': 61.98,
+    'K2O': 94.20,
+    'P2O5': 141.94,
+    'CO2': 44.01,
+    'FeO': 71.84,
+    'Fe2O3': 159.69,
+    'MgO': 40.30,
+}
+REQUIRED_OXIDES = ['Al2O3', 'CaO', 'Na2O', 'K2O']
+OPTIONAL_OXIDES = ['P2O5', 'CO2']
+# FM of the A-CNK-FM diagram: total iron (as FeO) + MgO, at least one given
+FM_OXIDES = ['Fe2O3', 'FeO', 'MgO']
+
+# --- Guides on the A-CN-K diagram, shared by every renderer ---
+# Weathering levels: (A on the height scale, end of the dashed line in x, label)
+WEATHERING_GUIDES = [
+    (0.85, 0.57, 'Strong weathering'),
+    (0.65, 0.68, 'Intermediate weathering'),
+    (0.5, 0.75, 'Weak weathering'),
+]
+# Reference minerals and rocks: (x, y, label, horizontal alignment)
+CIA_REFERENCES = [
+    (0.6, 1, 'Kaolinite', 'center'),
+    (0.3, 0.77, 'Smectite', 'center'),
+    (0.63, 0.77, 'Illite\n \n  Muscovite', 'left'),
+    (0.51, 0.52, 'Average granite', 'center'),
+    (0.2, 0.52, 'Plahioclase', 'center'),
+    (0.8, 0.52, 'K-feldspar', 'center'),
+    (0.35, 0.46, 'Average gabbro', 'center'),
+]
+
+
+# --- A-CN-K ternary -> cartesian (A apex at top, CN left, K right) ---
+def ternary_to_xy(a, cn, k):
+    a = np.asarray(a, dtype=float)
+    cn = np.asarray(cn, dtype=float)
+    k = np.asarray(k, dtype=float)
+    total = a + cn + k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = a / total
+        k = k / total
+    x = 0.5 * (2 * k + a)
+    y = a
+    return x, y
+
+
+# --- Molar oxide columns from wt% ---
+def to_molar(df, oxides=REQUIRED_OXIDES + OPTIONAL_OXIDES):
+    molar = {}
+    for oxide in oxides:
+        if oxide in df.columns:
+            wt = pd.to_numeric(df[oxide], errors='coerce').to_numpy(dtype=float)
+        else:
+            wt = np.zeros(len(df))
+        molar[oxide] = wt / MOLAR_MASS[oxide]
+    return molar
+
+
+# --- McLennan (1993) silicate CaO* ---
+def silicate_cao(cao, na2o, p2o5=0.0, co2=0.0):
+    # Remove Ca bound in apatite (10 CaO : 3 P2O5) and calcite (1 CaO : 1 CO2);
+    # if what is left exceeds Na2O, CaO* is taken as equal to Na2O.
+    corrected = np.clip(cao - 10.0 / 3.0 * p2o5 - co2, 0.0, None)
+    return np.minimum(corrected, na2o)
+
+
+# --- Weathering indices from molar proportions ---
+def weathering_indices(al2o3, cao_star, na2o, k2o):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cia = al2o3 / (al2o3 + cao_star + na2o + k2o) * 100
+        pia = (al2o3 - k2o) / (al2o3 + cao_star + na2o - k2o) * 100
+        ciw = al2o3 / (al2o3 + cao_star + na2o) * 100
+    return cia, pia, ciw
+
+
+# --- Full oxide wt% -> CIA table ---
+@traced('compute_cia')
+def compute_cia(df):
+    missing = [col for col in REQUIRED_OXIDES if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing oxide columns: {', '.join(missing)}")
+
+    m = to_molar(df)
+    cao_star = silicate_cao(m['CaO'], m['Na2O'], m['P2O5'], m['CO2'])
+    cia, pia, ciw = weathering_indices(m['Al2O3'], cao_star, m['Na2O'], m['K2O'])
+
+    a = m['Al2O3']
+    cn = cao_star + m['Na2O']
+    k = m['K2O']
+    total = a + cn + k
+    x, y = ternary_to_xy(a, cn, k)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = pd.DataFrame({
+            'CaO*': cao_star,
+            'A': a / total * 100,
+            'CN': cn / total * 100,
+            'K': k / total * 100,
+            'CIA': cia,
+            'PIA': pia,
+            'CIW': ciw,
+            'x': x,
+            'y': y,
+        }, index=df.index)
+    return pd.concat([df, out.round(4)], axis=1)
+
+
+# --- Nesbitt & Young (1989) A-CNK-FM molar proportions ---
+def acnkfm_components(df):
+    # -> (A, CNK, FM): Al2O3, CaO* + Na2O + K2O and FeO(total) + MgO, molar
+    missing = [col for col in REQUIRED_OXIDES if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing oxide columns: {', '.join(missing)}")
+    if not any(col in df.columns for col in FM_OXIDES):
+        raise ValueError(f"A-CNK-FM needs at least one of: {', '.join(FM_OXIDES)}")
+
+    m = to_molar(df, REQUIRED_OXIDES + OPTIONAL_OXIDES + FM_OXIDES)
+    cao_star = silicate_cao(m['CaO'], m['Na2O'], m['P2O5'], m['CO2'])
+    # One Fe2O3 is two FeO; missing oxides count as zero
+    fm = 2 * np.nan_to_num(m['Fe2O3']) + np.nan_to_num(m['FeO']) + np.nan_to_num(m['MgO'])
+    return m['Al2O3'], cao_star + m['Na2O'] + m['K2O'], fm
@@ -0,0 +1,319 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from lithora.cia import OPTIONAL_OXIDES, REQUIRED_OXIDES, compute_cia
+from lithora.compositional import CONFIDENCE, REGIONS, GroupSummary
+from lithora.density import DENSITY_THRESHOLD
+from lithora.diagrams import DIAGRAMS, compute_diagram, get_diagram
+from lithora.export import EXPORT_DPI, figure_to_file
+from lithora.formats import INPUT_FORMATS, OUTPUT_FORMATS, read_table, write_table
+from lithora.idf import DISTRIBUTIONS, annual_max_cached, fit_annual_max, idf_table
+from lithora.ingest import QFL_COLUMNS
+from lithora.qfl import compute_qfl
+from lithora.rainfall import stream_rainfall
+
+FORMATS = ['png', 'svg', 'pdf']
+# Gauge records are streamed with the CSV reader (compressed CSV included)
+CSV_SUFFIXES = [suffix for suffix, (kind, _) in INPUT_FORMATS.items() if kind == 'csv']
+
+
+# --- Input discovery: files, directories and glob patterns ---
+def collect_inputs(patterns, suffixes=None):
+    # `suffixes` restricts every match to those file types; directories
+    # are always listed for the readable ones only
+    found = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(str(p) for p in path.iterdir() if p.suffix.lower() in (suffixes or INPUT_FORMATS))
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True)) or ([pattern] if path.exists() else [])
+            if suffixes is not None:
+                matches = [m for m in matches if Path(m).suffix.lower() in suffixes]
+        found.extend(m for m in matches if m not in found)
+    return found
+
+
+def dataset_stem(path):
+    # "cores.csv.gz" -> "cores"
+    name = Path(path).name
+    for _ in range(2):
+        stem, suffix = os.path.splitext(name)
+        if suffix.lower() not in INPUT_FORMATS:
+            break
+        name = stem
+    return name
+
+
+def stem_clashes(inputs):
+    # Outputs are named by stem in one directory, so "a/well.csv" and
+    # "b/well.csv" would overwrite each other's results.
+    by_stem = {}
+    for path in inputs:
+        by_stem.setdefault(dataset_stem(path), []).append(path)
+    return {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+
+
+def is_vector(fmt, dpi):
+    # SVG/PDF, and PNGs at a requested resolution, are drawn as vector
+    # diagrams; default PNGs are composed on the cached raster template.
+    return fmt != 'png' or dpi is not None
+
+
+# --- One file per task; runs inside a worker process ---
+# Plotting (and with it Matplotlib) is imported by the workers on first use,
+# so `--help` and argument errors return without loading it.
+def write_groups(summary, out_dir, stem, table_format):
+    target = out_dir / f"{stem}_groups{OUTPUT_FORMATS[table_format][0]}"
+    write_table(summary.table().reset_index(), target, table_format)
+    return target
+
+
+def process_qfl(path, out_dir, formats, density_threshold, table_format='csv', dpi=None, group_by=None,
+                regions=None, level=CONFIDENCE):
+    from lithora.plots import plot_basic_ternary, plot_provenance_ternary
+
+    stem = dataset_stem(path)
+    df = read_table(path, required=QFL_COLUMNS + ([group_by] if group_by else []))
+    df_result = compute_qfl(df['Quartz'], df['Feldspar'], df['Lithics'])
+    groups = None
+    if group_by:
+        df_result.insert(0, group_by, df[group_by].to_numpy())
+        groups = df_result[group_by]
+
+    written = [out_dir / f"{stem}_qfl{OUTPUT_FORMATS[table_format][0]}"]
+    write_table(df_result, written[0], table_format)
+    if group_by or regions:
+        summary = GroupSummary(df_result[['%Q', '%F', '%L']].to_numpy(), groups, ['Q', 'F', 'L'])
+        written.append(write_groups(summary, out_dir, stem, table_format))
+    for name, plot in (('ternary', plot_basic_ternary), ('provenance', plot_provenance_ternary)):
+        for fmt in formats:
+            target = out_dir / f"{stem}_{name}.{fmt}"
+            vector = is_vector(fmt, dpi)
+            fig = plot(df_result, density_threshold=density_threshold, vector=vector, groups=groups,
+                       group_title=group_by, regions=regions, level=level)
+            figure_to_file(fig, target, dpi=dpi or (EXPORT_DPI if vector else None))
+            written.append(target)
+    return len(df_result), written
+
+
+def process_cia(path, out_dir, formats, density_threshold, table_format='csv', marker='o', color='black',
+                color_by_cia=False, dpi=None, group_by=None, regions=None, level=CONFIDENCE):
+    from lithora.plots import plot_ternary
+
+    stem = dataset_stem(path)
+    df_cia = compute_cia(read_table(path, required=REQUIRED_OXIDES + ([group_by] if group_by else []),
+                                    optional=OPTIONAL_OXIDES + ['Label']))
+    groups = df_cia[group_by] if group_by else None
+
+    written = [out_dir / f"{stem}_cia{OUTPUT_FORMATS[table_format][0]}"]
+    write_table(df_cia, written[0], table_format)
+    if group_by or regions:
+        summary = GroupSummary(df_cia[['A', 'CN', 'K']].to_numpy(), groups, ['A', 'CN', 'K'])
+        written.append(write_groups(summary, out_dir, stem, table_format))
+    labels = df_cia['Label'] if 'Label' in df_cia.columns else [f"S{i+1}" for i in range(len(df_cia))]
+    plot_data = list(zip(labels, df_cia['A'], df_cia['CN'], df_cia['K']))
+    for fmt in formats:
+        target = out_dir / f"{stem}_cia.{fmt}"
+        vector = is_vector(fmt, dpi)
+        fig = plot_ternary(plot_data, marker=marker, marker_color=color,
+                           values=df_cia['CIA'] if color_by_cia else None,
+                           density_threshold=density_threshold, vector=vector, groups=groups,
+                           group_title=group_by, regions=regions, level=level)
+        figure_to_file(fig, target, dpi=dpi or (EXPORT_DPI if vector else None))
+        written.append(target)
+    return len(df_cia), written
+
+
+def process_ternary(path, out_dir, formats, density_threshold, diagram, table_format='csv', dpi=None,
+                    group_by=None, regions=None, level=CONFIDENCE):
+    from lithora.plots import plot_diagram
+
+    stem = dataset_stem(path)
+    spec = get_diagram(diagram)
+    df = read_table(path, required=spec.required + ([group_by] if group_by else []), optional=spec.optional)
+    df_result = compute_diagram(diagram, df)
+    groups = None
+    if group_by:
+        df_result.insert(0, group_by, df[group_by].to_numpy())
+        groups = df_result[group_by]
+
+    written = [out_dir / f"{stem}_{diagram}{OUTPUT_FORMATS[table_format][0]}"]
+    write_table(df_result, written[0], table_format)
+    if group_by or regions:
+        summary = GroupSummary(df_result[spec.percent].to_numpy(), groups, [col.lstrip('%') for col in spec.percent])
+        written.append(write_groups(summary, out_dir, stem, table_format))
+    for fmt in formats:
+        target = out_dir / f"{stem}_{diagram}.{fmt}"
+        vector = is_vector(fmt, dpi)
+        fig = plot_diagram(diagram, df_result, density_threshold=density_threshold, vector=vector, groups=groups,
+                           group_title=group_by, regions=regions, level=level)
+        figure_to_file(fig, target, dpi=dpi or (EXPORT_DPI if vector else None))
+        written.append(target)
+    return len(df_result), written
+
+
+def process_idf(path, out_dir, formats, distribution='gumbel', time_format=None, cache_dir=None, dpi=None):
+    from lithora.plots import plot_idf
+
+    stem = dataset_stem(path)
+    annual = annual_max_cached(path, cache_dir or out_dir / '.annual_max', time_format)
+    params = fit_annual_max(annual, distribution)
+    table = idf_table(params)
+
+    written = [out_dir / f"{stem}_idf_{distribution}.csv", out_dir / f"{stem}_idf_{distribution}_params.csv"]
+    table.to_csv(written[0])
+    params.to_csv(written[1])
+    for fmt in formats:
+        target = out_dir / f"{stem}_idf_{distribution}.{fmt}"
+        figure_to_file(plot_idf(table, f"{stem} – IDF ({distribution.upper()}, {len(annual)} years)"), target, dpi=dpi)
+        written.append(target)
+    return len(annual), written
+
+
+def process_rainfall(path, out_dir, formats, time_format=None, dpi=None):
+    from lithora.plots import plot_rainfall
+
+    stem = dataset_stem(path)
+    acc = stream_rainfall(path, time_format=time_format)
+
+    written = []
+    for name, totals in (('hourly', acc.hourly), ('daily', acc.daily), ('monthly', acc.monthly)):
+        written.append(out_dir / f"{stem}_{name}.csv")
+        totals.rename_axis('Timestamp').to_csv(written[-1])
+    written.append(out_dir / f"{stem}_intensity.csv")
+    acc.intensities.to_csv(written[-1], index=False)
+    written.append(out_dir / f"{stem}_annual_max.csv")
+    acc.annual_max.to_csv(written[-1])
+    for fmt in formats:
+        target = out_dir / f"{stem}_rainfall.{fmt}"
+        figure_to_file(plot_rainfall(acc.hourly, acc.monthly, stem), target, dpi=dpi)
+        written.append(target)
+    return acc.rows, written
+
+
+# --- Command line ---
+def build_parser():
+    parser = argparse.ArgumentParser(prog='lithora', description="Batch QFL / CIA / ternary diagram processing without the web UI.")
+    sub = parser.add_subparsers(dest='module', required=True)
+
+    for name, help_text in (('qfl', "QFL point counts (Quartz, Feldspar, Lithics columns)"),
+                            ('cia', "Oxide wt%% tables (Al2O3, CaO, Na2O, K2O [, P2O5, CO2])"),
+                            ('ternary', "Any declared ternary diagram: " + ", ".join(DIAGRAMS)),
+                            ('rainfall', "Rain-gauge records (timestamp and depth in mm), one station per file"),
+                            ('idf', "IDF curves from rain-gauge records, one station per file")):
+        p = sub.add_parser(name, help=help_text)
+        if name == 'ternary':
+            p.add_argument('diagram', choices=list(DIAGRAMS),
+                           help="; ".join(f"{key}: {d.title} ({', '.join(d.required)})" for key, d in DIAGRAMS.items()))
+        p.add_argument('inputs', nargs='+',
+                       help="CSV files, directories or glob patterns" if name in ('rainfall', 'idf')
+                       else "CSV/Parquet/Feather files, directories or glob patterns")
+        p.add_argument('-o', '--out', default='lithora_out', help="output directory (default: %(default)s)")
+        p.add_argument('-f', '--format', dest='formats', nargs='+', choices=FORMATS, default=['png'],
+                       help="figure formats (default: png)")
+        p.add_argument('--dpi', type=int,
+                       help=f"resolution of PNGs and of rasterized point layers in SVG/PDF (default: {EXPORT_DPI})")
+        p.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                       help="worker processes (default: all cores)")
+        if name in ('rainfall', 'idf'):
+            p.add_argument('--time-format', help="strftime pattern of the timestamps (default: inferred)")
+        else:
+            p.add_argument('--density-threshold', type=int, default=DENSITY_THRESHOLD,
+                           help="switch to density cells above this many rows (default: %(default)s)")
+            p.add_argument('-t', '--table-format', choices=list(OUTPUT_FORMATS), default='csv',
+                           help="format of the computed table (default: %(default)s)")
+            p.add_argument('-g', '--group-by', metavar='COLUMN',
+                           help="split samples by this column (e.g. Formation); adds per-group centroids, "
+                                "confidence regions and a group summary table")
+            p.add_argument('--regions', nargs='*', choices=REGIONS,
+                           help="regions drawn around each centroid (default with -g: confidence); "
+                                "without -g, around the centroid of all samples")
+            p.add_argument('--level', type=float, default=CONFIDENCE,
+                           help="probability level of the regions (default: %(default)s)")
+        if name == 'idf':
+            p.add_argument('-d', '--distribution', choices=DISTRIBUTIONS, default='gumbel')
+            p.add_argument('--cache-dir', help="annual-max cache (default: OUT/.annual_max)")
+        if name == 'cia':
+            p.add_argument('--marker', default='o')
+            p.add_argument('--color', default='black')
+            p.add_argument('--color-by-cia', action='store_true')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    inputs = collect_inputs(args.inputs, CSV_SUFFIXES if args.module in ('rainfall', 'idf') else None)
+    if not inputs:
+        print("No input files found.", file=sys.stderr)
+        return 2
+    clashes = stem_clashes(inputs)
+    if clashes:
+        for stem, paths in clashes.items():
+            print(f"Inputs share the output name {stem!r}: {', '.join(paths)}", file=sys.stderr)
+        print("Rename them or process them into separate output directories.", file=sys.stderr)
+        return 2
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if args.module == 'qfl':
+        task, extra = process_qfl, {'density_threshold': args.density_threshold, 'table_format': args.table_format,
+                                    'group_by': args.group_by, 'regions': args.regions, 'level': args.level}
+    elif args.module == 'cia':
+        task, extra = process_cia, {'density_threshold': args.density_threshold, 'table_format': args.table_format,
+                                    'marker': args.marker, 'color': args.color, 'color_by_cia': args.color_by_cia,
+                                    'group_by': args.group_by, 'regions': args.regions, 'level': args.level}
+    elif args.module == 'ternary':
+        task, extra = process_ternary, {'density_threshold': args.density_threshold, 'diagram': args.diagram,
+                                        'table_format': args.table_format, 'group_by': args.group_by,
+                                        'regions': args.regions, 'level': args.level}
+    elif args.module == 'rainfall':
+        task, extra = process_rainfall, {'time_format': args.time_format}
+    else:
+        task, extra = process_idf, {'distribution': args.distribution, 'time_format': args.time_format,
+                                    'cache_dir': args.cache_dir}
+    extra['dpi'] = args.dpi
+
+    # Matplotlib renders on one thread per process, so files are spread over
+    # a process pool; each worker builds its diagram templates once.
+    jobs = max(1, min(args.jobs, len(inputs)))
+    start = time.perf_counter()
+    failures = 0
+
+    def report(path, result=None, error=None):
+        nonlocal failures
+        if error is None:
+            rows, written = result
+            unit = 'years' if args.module == 'idf' else 'rows'
+            print(f"ok    {path}: {rows} {unit} -> {len(written)} files")
+        else:
+            failures += 1
+            print(f"fail  {path}: {error}", file=sys.stderr)
+
+    if jobs == 1:
+        for path in inputs:
+            try:
+                report(path, task(path, out_dir, args.formats, **extra))
+            except Exception as e:
+                report(path, error=e)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(task, path, out_dir, args.formats, **extra): path
+                       for path in inputs}
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except Exception as e:
+                    report(futures[future], error=e)
+
+    print(f"{len(inputs) - failures}/{len(inputs)} files in {time.perf_counter() - start:.1f}s with {jobs} worker(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import numpy as np
+
+# Above this many rows the plots switch from markers to density cells.
+DENSITY_THRESHOLD = 20_000
+DENSITY_BINS = 40
+
+
+# --- Triangular binning ---
+def bin_counts(t, l, r, bins=DENSITY_BINS):
+    # The simplex is cut into bins**2 equal triangles. A point with scaled
+    # coordinates (t*n, l*n) falls in parallelogram (i, j); the fractional
+    # parts decide whether it is in the upward or the downward half.
+    # Returns the full count grid, so partial results can simply be added.
+    t = np.asarray(t, dtype=float)
+    l = np.asarray(l, dtype=float)
+    r = np.asarray(r, dtype=float)
+    total = t + l + r
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ts = t / total * bins
+        ls = l / total * bins
+    # An infinite part would otherwise land on a corner (x / inf == 0)
+    ok = np.isfinite(ts) & np.isfinite(ls) & np.isfinite(total)
+    ts = np.clip(ts[ok], 0, bins - 1e-9)
+    ls = np.clip(ls[ok], 0, bins - 1e-9)
+
+    i = np.floor(ts).astype(np.int64)
+    j = np.floor(ls).astype(np.int64)
+    down = ((ts - i) + (ls - j) >= 1) & (i + j <= bins - 2)
+    codes = (i * bins + j) * 2 + down
+    return np.bincount(codes, minlength=2 * bins * bins)
+
+
+def cells(counts, bins=DENSITY_BINS):
+    # Corner (t, l, r) of every non-empty cell, shape (cells, 3 corners, 3)
+    filled = np.flatnonzero(counts)
+    down = (filled % 2).astype(bool)
+    i, j = np.divmod(filled // 2, bins)
+    k = bins - i - j - 1 - down
+
+    up_corners = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    down_corners = np.array([[1, 1, 0], [1, 0, 1], [0, 1, 1]])
+    base = np.column_stack([i, j, k])[:, None, :]
+    offsets = np.where(down[:, None, None], down_corners, up_corners)
+    vertices = (base + offsets) / bins
+    return vertices, counts[filled]
+
+
+def ternary_bin(t, l, r, bins=DENSITY_BINS):
+    return cells(bin_counts(t, l, r, bins), bins)
+
+
+# --- Density layer on a composed template ---
+def draw_density(ax, project, t, l, r, bins=DENSITY_BINS, cmap='viridis', alpha=1.0):
+    return draw_counts(ax, project, bin_counts(t, l, r, bins), bins, cmap=cmap, alpha=alpha)
+
+
+def draw_counts(ax, project, counts, bins=DENSITY_BINS, cmap='viridis', alpha=1.0):
+    # `project` maps (t, l, r) arrays to the axes' x/y; only the non-empty
+    # cells are drawn, so the cost is bounded by bins**2, not by the row count.
+    # Matplotlib is imported here so the binning above stays usable without it.
+    from matplotlib.collections import PolyCollection
+    from matplotlib.colors import LogNorm
+
+    vertices, counts = cells(counts, bins)
+    flat = vertices.reshape(-1, 3)
+    px, py = project(flat[:, 0], flat[:, 1], flat[:, 2])
+    polys = np.stack([px, py], axis=-1).reshape(-1, 3, 2)
+
+    collection = PolyCollection(polys, array=counts, cmap=cmap, alpha=alpha,
+                                norm=LogNorm(vmin=1, vmax=max(counts.max(), 2)) if len(counts) else None,
+                                edgecolors='face', linewidths=0.2)
+    ax.add_collection(collection)
+    return collection
@@ -0,0 +1,85 @@
+from lithora.cia import FM_OXIDES, OPTIONAL_OXIDES, REQUIRED_OXIDES, WEATHERING_GUIDES, acnkfm_components
+from lithora.instrument import traced
+from lithora.qfl import QFL
+from lithora.ternary import Diagram
+
+# Ternary diagrams shipped as data (see lithora.ternary.Diagram). A new one
+# only needs an entry here: classification, tables, the raster template, the
+# vector export, the interactive view, the CLI and the app page pick it up.
+
+# --- Dickinson Qm-F-Lt provenance fields (Qm, F, Lt in %) ---
+# Monocrystalline quartz against feldspar and total lithics (incl. chert).
+# Boundaries are an approximate digitization after Dickinson (1985).
+QMFLT = Diagram(
+    'qmflt', "Qm-F-Lt provenance (Dickinson)", ("Qm", "F", "Lt"), ['Qm', 'F', 'Lt'],
+    fields={
+        'Craton Interior': [(100,0,0),(80,20,0),(74,13,13),(89,0,11)],
+        'Transitional Continental': [(80,20,0),(57,43,0),(53,31,16),(74,13,13)],
+        'Basement Uplift': [(57,43,0),(0,100,0),(0,77,23),(25,55,20),(53,31,16)],
+        'Quartzose Recycled': [(89,0,11),(74,13,13),(50,13,37),(50,0,50)],
+        'Transitional Recycled': [(50,0,50),(50,13,37),(25,13,62),(25,0,75)],
+        'Lithic Recycled': [(25,0,75),(25,13,62),(0,13,87),(0,0,100)],
+        'Mixed': [(74,13,13),(53,31,16),(25,55,20),(25,13,62)],
+        'Dissected Arc': [(25,55,20),(0,77,23),(0,55,45),(25,40,35)],
+        'Transitional Arc': [(25,40,35),(0,55,45),(0,33,67),(25,25,50)],
+        'Undissected Arc': [(25,25,50),(0,33,67),(0,13,87),(25,13,62)],
+    },
+    colors={
+        'Craton Interior': 'lightyellow', 'Transitional Continental': 'khaki', 'Basement Uplift': 'wheat',
+        'Quartzose Recycled': 'lightblue', 'Transitional Recycled': 'skyblue', 'Lithic Recycled': 'steelblue',
+        'Mixed': 'thistle', 'Dissected Arc': 'palegreen', 'Transitional Arc': 'lightgreen',
+        'Undissected Arc': 'cyan',
+    },
+    field_column='Provenance', source="Dickinson (1985), approximate field boundaries")
+
+# --- Folk (1980) sandstone classification (Q, F, R in %) ---
+# Q 95 and 75 %, and the F:R ratios 3:1, 1:1 and 1:3 (lines through the Q apex)
+FOLK = Diagram(
+    'folk', "Sandstone classification (Folk)", ("Q", "F", "R"), ['Q', 'F', 'R'],
+    fields={
+        'Quartzarenite': [(100,0,0),(95,5,0),(95,0,5)],
+        'Subarkose': [(95,5,0),(75,25,0),(75,12.5,12.5),(95,2.5,2.5)],
+        'Sublitharenite': [(95,2.5,2.5),(75,12.5,12.5),(75,0,25),(95,0,5)],
+        'Arkose': [(75,25,0),(0,100,0),(0,75,25),(75,18.75,6.25)],
+        'Lithic Arkose': [(75,18.75,6.25),(0,75,25),(0,50,50),(75,12.5,12.5)],
+        'Feldspathic Litharenite': [(75,12.5,12.5),(0,50,50),(0,25,75),(75,6.25,18.75)],
+        'Litharenite': [(75,6.25,18.75),(0,25,75),(0,0,100),(75,0,25)],
+    },
+    colors={
+        'Quartzarenite': 'lightyellow', 'Subarkose': 'wheat', 'Sublitharenite': 'lightblue',
+        'Arkose': 'lightsalmon', 'Lithic Arkose': 'lightpink', 'Feldspathic Litharenite': 'thistle',
+        'Litharenite': 'skyblue',
+    },
+    field_column='Classification', source="Folk (1980)")
+
+# --- Nesbitt & Young (1989) A-CNK-FM (molar) ---
+# Lines through the FM apex keep A / (A + CNK), i.e. the CIA without the
+# mafic component; mineral positions follow from their ideal formulas
+# (kaolinite and gibbsite sit on the A apex).
+ACNKFM = Diagram(
+    'acnkfm', "A-CNK-FM weathering (Nesbitt & Young)", ("A (Al₂O₃)", "CNK (CaO* + Na₂O + K₂O)", "FM (FeOᵗ + MgO)"),
+    ['A', 'CNK', 'FM'],
+    guides=[([(level * 100, (1 - level) * 100, 0), (0, 0, 100)], f"CIA {level * 100:.0f}")
+            for level, _, _ in WEATHERING_GUIDES],
+    labels=[
+        (80, 20, 0, 'Illite'), (75, 25, 0, 'Muscovite'), (50, 50, 0, 'Feldspars'),
+        (63, 12, 25, 'Smectite'), (17, 0, 83, 'Chlorite'), (12.5, 12.5, 75, 'Biotite'),
+        (14, 29, 57, 'Hornblende'), (0, 50, 50, 'Clinopyroxene'),
+    ],
+    decimals=4, convert=acnkfm_components, required=REQUIRED_OXIDES, optional=OPTIONAL_OXIDES + FM_OXIDES,
+    source="Nesbitt & Young (1989); oxide wt% in, molar proportions plotted")
+
+DIAGRAMS = {diagram.name: diagram for diagram in (QFL, QMFLT, FOLK, ACNKFM)}
+
+
+def get_diagram(name):
+    try:
+        return DIAGRAMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown diagram {name!r}; choose from {', '.join(DIAGRAMS)}") from None
+
+
+@traced('compute_diagram')
+def compute_diagram(name, df):
+    # Input table -> closed % (and field) table of diagram `name`
+    return get_diagram(name).from_table(df)
@@ -0,0 +1,79 @@
+import io
+import os
+import threading
+
+from lithora.instrument import count_artists, enabled, span
+
+# Download formats: format -> MIME type. SVG and PDF keep the diagram as
+# vector art; rasterized point layers inside them use EXPORT_DPI.
+EXPORT_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf'}
+EXPORT_DPI = 300
+
+# One scratch buffer per thread, rewound for every encode instead of
+# allocating a fresh BytesIO per figure.
+_local = threading.local()
+
+
+def _scratch():
+    buf = getattr(_local, 'buf', None)
+    if buf is None:
+        buf = _local.buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate()
+    return buf
+
+
+# --- Release a figure deterministically ---
+def release(fig):
+    # Figures built through matplotlib.figure.Figure are not tracked by pyplot,
+    # but their artists form reference cycles; clearing breaks them so the
+    # memory goes back as soon as the caller drops the figure, not at the next
+    # cyclic GC pass.
+    fig.clear()
+    fig.canvas.figure = None
+
+
+# --- Encode a figure exactly once, then release it ---
+def figure_to_bytes(fig, fmt='png', **savefig_kwargs):
+    savefig_kwargs.setdefault('bbox_inches', 'tight')
+    buf = _scratch()
+    with span('encode', fmt=fmt) as s:
+        if enabled():
+            s.set(artists=count_artists(fig))
+        try:
+            fig.savefig(buf, format=fmt, **savefig_kwargs)
+            data = buf.getvalue()
+        finally:
+            release(fig)
+        s.set(bytes=len(data))
+    return data
+
+
+# --- Encode what an Agg canvas already holds, without redrawing the figure ---
+def canvas_to_png(canvas):
+    from PIL import Image
+    buf = _scratch()
+    with span('encode', fmt='png') as s:
+        width, height = canvas.get_width_height(physical=True)
+        Image.frombuffer('RGBA', (width, height), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1).save(buf, format='png')
+        data = buf.getvalue()
+        s.set(bytes=len(data))
+    return data
+
+
+def figure_to_png(fig, **savefig_kwargs):
+    return figure_to_bytes(fig, 'png', **savefig_kwargs)
+
+
+# --- Write a figure to disk (format from the suffix), then release it ---
+def figure_to_file(fig, path, **savefig_kwargs):
+    savefig_kwargs.setdefault('bbox_inches', 'tight')
+    with span('encode', path=str(path)) as s:
+        if enabled():
+            s.set(artists=count_artists(fig))
+        try:
+            fig.savefig(path, **savefig_kwargs)
+        finally:
+            release(fig)
+        if enabled():
+            s.set(bytes=os.path.getsize(path))
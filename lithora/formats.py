@@ -0,0 +1,202 @@
+import gzip
+import io
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from lithora.instrument import traced
+
+# Suffix -> (reader, CSV compression)
+INPUT_FORMATS = {
+    '.csv': ('csv', None),
+    '.gz': ('csv', 'gzip'),
+    '.bz2': ('csv', 'bz2'),
+    '.zip': ('csv', 'zip'),
+    '.xz': ('csv', 'xz'),
+    '.zst': ('csv', 'zstd'),
+    '.parquet': ('parquet', None),
+    '.pq': ('parquet', None),
+    '.feather': ('arrow', None),
+    '.arrow': ('arrow', None),
+    '.ipc': ('arrow', None),
+}
+# Extensions for st.file_uploader(type=...)
+UPLOAD_TYPES = [suffix[1:] for suffix in INPUT_FORMATS]
+
+# Derived tables: format -> (file suffix, MIME type)
+OUTPUT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'feather': ('.feather', 'application/vnd.apache.arrow.file'),
+}
+
+
+def detect_format(name):
+    # Nameless buffers are read as plain CSV, as before
+    if name is None:
+        return INPUT_FORMATS['.csv']
+    suffix = Path(str(name)).suffix.lower()
+    if suffix not in INPUT_FORMATS:
+        raise ValueError(f"Unsupported file type {suffix or str(name)!r}; "
+                         f"expected one of: {', '.join(UPLOAD_TYPES)}")
+    return INPUT_FORMATS[suffix]
+
+
+def source_format(source, name=None):
+    if name is None and isinstance(source, (str, os.PathLike)):
+        name = source
+    return detect_format(name)
+
+
+# --- Column projection ---
+def _arrow_file(source):
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        source = pa.memory_map(str(source))
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def table_columns(source, name=None):
+    # Column names from the header or schema, without reading any rows
+    kind, compression = source_format(source, name)
+    pos = source.tell() if hasattr(source, 'seek') else None
+    if kind == 'csv':
+        columns = list(pd.read_csv(source, nrows=0, compression=compression).columns)
+    elif kind == 'parquet':
+        import pyarrow.parquet as pq
+        columns = pq.read_schema(source).names
+    else:
+        columns = _arrow_file(source).schema.names
+    if pos is not None:
+        source.seek(pos)
+    return columns
+
+
+def select_columns(available, required=(), optional=()):
+    # No projection asked for: keep every column
+    if not required and not optional:
+        return list(available)
+    missing = [col for col in required if col not in available]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    return list(required) + [col for col in optional if col in available and col not in required]
+
+
+# --- Whole-table and chunked reads, loading only `columns` ---
+@traced('read_table')
+def read_table(source, name=None, required=(), optional=(), dtype=None):
+    kind, compression = source_format(source, name)
+    columns = select_columns(table_columns(source, name), required, optional)
+    if kind == 'csv':
+        return pd.read_csv(source, usecols=columns, dtype=dtype, compression=compression)[columns]
+    if kind == 'parquet':
+        df = pd.read_parquet(source, columns=columns)
+    else:
+        df = _arrow_file(source).read_all().select(columns).to_pandas()
+    return df.astype(dtype) if dtype else df
+
+
+def iter_table(source, rows, name=None, required=(), optional=(), dtype=None, **read_csv_kwargs):
+    # DataFrames of at most `rows` rows; Parquet is read row group by row
+    # group and Arrow files batch by batch, so memory follows `rows`.
+    kind, compression = source_format(source, name)
+    columns = select_columns(table_columns(source, name), required, optional)
+    if kind == 'csv':
+        reader = pd.read_csv(source, usecols=columns, dtype=dtype, compression=compression,
+                             chunksize=rows, **read_csv_kwargs)
+        with reader:
+            for chunk in reader:
+                yield chunk[columns]
+        return
+
+    if kind == 'parquet':
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(source).iter_batches(batch_size=rows, columns=columns)
+    else:
+        import pyarrow as pa
+        reader = _arrow_file(source)
+        if isinstance(reader, pa.ipc.RecordBatchFileReader):
+            batches = (reader.get_batch(i).select(columns) for i in range(reader.num_record_batches))
+        else:
+            # IPC stream: no batch index, read front to back
+            batches = (batch.select(columns) for batch in reader)
+    start = 0
+    for batch in batches:
+        for offset in range(0, batch.num_rows, rows):
+            df = batch.slice(offset, rows).to_pandas()
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield df.astype(dtype) if dtype else df
+
+
+# --- Derived tables in the input formats ---
+class TableWriter:
+    # Appends DataFrame chunks to a single output table, so streamed results
+    # can be exported without ever holding the whole table. `target` is a
+    # path or a binary file object (left open).
+    def __init__(self, target, fmt='csv'):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}; expected one of: {', '.join(OUTPUT_FORMATS)}")
+        self.fmt = fmt
+        self._own = isinstance(target, (str, os.PathLike))
+        self._file = open(target, 'wb') if self._own else target
+        self._gzip = None
+        self._text = None
+        self._writer = None
+
+    def write(self, df):
+        if self.fmt.startswith('csv'):
+            header = self._text is None
+            if header:
+                raw = self._file
+                if self.fmt == 'csv.gz':
+                    raw = self._gzip = gzip.GzipFile(fileobj=self._file, mode='wb', mtime=0)
+                self._text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            df.to_csv(self._text, index=False, header=header)
+            return
+
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            if self.fmt == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self._file, table.schema)
+            else:
+                options = pa.ipc.IpcWriteOptions(compression='zstd')
+                self._writer = pa.ipc.new_file(self._file, table.schema, options=options)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._text is not None:
+            self._text.flush()
+            self._text.detach()
+        if self._gzip is not None:
+            self._gzip.close()
+        if self._writer is not None:
+            self._writer.close()
+        if self._own:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(df, target, fmt='csv'):
+    with TableWriter(target, fmt) as writer:
+        writer.write(df)
+
+
+def table_bytes(df, fmt='csv'):
+    buf = io.BytesIO()
+    write_table(df, buf, fmt)
+    return buf.getvalue()
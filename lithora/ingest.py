@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from lithora.density import DENSITY_BINS, bin_counts
+from lithora.formats import iter_table
+from lithora.instrument import traced
+from lithora.jobs import checkpoint, read_fraction
+from lithora.qfl import FIELD_LABELS, classify_provenance
+
+QFL_COLUMNS = ['Quartz', 'Feldspar', 'Lithics']
+QFL_DTYPES = {col: 'float32' for col in QFL_COLUMNS}
+
+# Rough peak bytes per row while a chunk is in flight: the three float32
+# inputs, four float32 derived columns, the int8 field code and pandas/CSV
+# parser overhead.
+BYTES_PER_ROW = 96
+DEFAULT_BUDGET_MB = 64
+SAMPLE_SIZE = 20_000
+# Uploads larger than this are always streamed by the QFL page.
+STREAM_ABOVE_MB = 50
+
+
+def chunk_rows(budget_mb=DEFAULT_BUDGET_MB):
+    return max(1_000, int(budget_mb * 2**20 // BYTES_PER_ROW))
+
+
+# --- Per-chunk QFL table (same columns as compute_qfl, float32) ---
+def compute_qfl_chunk(chunk):
+    q = chunk['Quartz'].to_numpy(dtype=np.float32)
+    f = chunk['Feldspar'].to_numpy(dtype=np.float32)
+    l = chunk['Lithics'].to_numpy(dtype=np.float32)
+    total = q + f + l
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df = pd.DataFrame({
+            'Quartz': q,
+            'Feldspar': f,
+            'Lithics': l,
+            'Total': total,
+            '%Q': np.round(q / total * 100, 2),
+            '%F': np.round(f / total * 100, 2),
+            '%L': np.round(l / total * 100, 2),
+        }, index=chunk.index)
+    df['Provenance'] = classify_provenance(q, f, l)
+    return df
+
+
+# --- Running aggregates over all chunks ---
+class QFLAccumulator:
+    # Everything kept here is O(1) in the row count: field counts, the density
+    # grid, column sums and a fixed-size uniform sample of rows for markers.
+    def __init__(self, bins=DENSITY_BINS, sample_size=SAMPLE_SIZE, seed=0):
+        self.bins = bins
+        self.sample_size = sample_size
+        self.rows = 0
+        self.field_counts = np.zeros(len(FIELD_LABELS), dtype=np.int64)
+        self.density = np.zeros(2 * bins * bins, dtype=np.int64)
+        self.sums = np.zeros(3)
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+        self._keys = np.empty(0)
+
+    def update(self, df):
+        self.rows += len(df)
+        codes = df['Provenance'].cat.codes.to_numpy()
+        self.field_counts += np.bincount(codes, minlength=len(FIELD_LABELS))
+        pct = df[['%Q', '%F', '%L']].to_numpy(dtype=float)
+        self.density += bin_counts(pct[:, 0], pct[:, 1], pct[:, 2], self.bins)
+        self.sums += np.nansum(pct, axis=0)
+
+        # Bottom-k sampling: every row draws a random key and the rows with
+        # the smallest keys seen so far make up a uniform sample.
+        keys = np.concatenate([self._keys, self._rng.random(len(df))])
+        rows = df if self._sample is None else pd.concat([self._sample, df], ignore_index=True)
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, rows = keys[keep], rows.iloc[keep].reset_index(drop=True)
+        self._keys, self._sample = keys, rows
+
+    @property
+    def sample(self):
+        if self._sample is None:
+            return pd.DataFrame(columns=QFL_COLUMNS + ['Total', '%Q', '%F', '%L', 'Provenance'])
+        return self._sample
+
+    @property
+    def mean_composition(self):
+        return self.sums / self.rows if self.rows else np.full(3, np.nan)
+
+
+# --- Streaming ingestion ---
+def iter_qfl_chunks(source, budget_mb=DEFAULT_BUDGET_MB, name=None, **read_csv_kwargs):
+    # `name` gives the file type of an in-memory upload (CSV, compressed CSV,
+    # Parquet or Arrow); only the three count columns are read.
+    for chunk in iter_table(source, chunk_rows(budget_mb), name, required=QFL_COLUMNS, dtype=QFL_DTYPES,
+                            **read_csv_kwargs):
+        yield compute_qfl_chunk(chunk)
+
+
+@traced('stream_qfl')
+def stream_qfl(source, out=None, budget_mb=DEFAULT_BUDGET_MB, accumulator=None, name=None, **read_csv_kwargs):
+    # Reads `source` chunk by chunk, optionally appending the computed table
+    # to `out` (a formats.TableWriter), and returns the filled accumulator.
+    acc = accumulator or QFLAccumulator()
+    for df in iter_qfl_chunks(source, budget_mb, name, **read_csv_kwargs):
+        checkpoint(read_fraction(source), "Streaming chunks")
+        acc.update(df)
+        if out is not None:
+            out.write(df)
+    return acc
@@ -0,0 +1,180 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# Hot-path instrumentation. Spans are off unless a recorder is active for the
+# current context (the app's debug panel) or LITHORA_METRICS is set (JSON log
+# lines on the "lithora.metrics" logger, plus totals for the metrics
+# endpoint). When off, `span()` hands back one shared no-op object, so the
+# cost in the hot paths is a context-variable lookup.
+log = logging.getLogger('lithora.metrics')
+LOG_ALL = os.environ.get('LITHORA_METRICS', '').lower() not in ('', '0', 'false', 'no')
+
+_recorder = contextvars.ContextVar('lithora_recorder', default=None)
+_depth = contextvars.ContextVar('lithora_span_depth', default=0)
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+def enabled():
+    return LOG_ALL or _recorder.get() is not None
+
+
+# --- Resource probes (only called while enabled) ---
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def count_artists(fig):
+    return len(fig.findobj())
+
+
+# --- Spans ---
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        # The record is placed on entry, so a recorder lists parents before children
+        self.record = {'span': self.name, 'depth': _depth.get()}
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.append(self.record)
+        self._token = _depth.set(self.record['depth'] + 1)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        _depth.reset(self._token)
+        self.record['ms'] = round(seconds * 1000, 2)
+        rss = rss_mb()
+        if rss is not None:
+            self.record['rss_mb'] = round(rss, 1)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        self.record.update(self.fields)
+        if LOG_ALL:
+            log_record(self.record, seconds)
+        return False
+
+
+def span(name, **fields):
+    if not enabled():
+        return _NO_SPAN
+    return Span(name, fields)
+
+
+def traced(name):
+    # Decorator form of `span` for whole library functions
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not enabled():
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def log_record(record, seconds):
+    log.info(json.dumps(record, default=str))
+    with _totals_lock:
+        count, total = _totals.get(record['span'], (0, 0.0))
+        _totals[record['span']] = (count + 1, total + seconds)
+
+
+# --- Per-request recording (the app's debug panel) ---
+def start():
+    # Records every span of the current context until `stop`; returns the list
+    records = []
+    _recorder.set(records)
+    return records
+
+
+def stop():
+    _recorder.set(None)
+    return None
+
+
+# --- Scrapeable totals ---
+def prometheus_text():
+    lines = ['# TYPE lithora_span_seconds summary']
+    with _totals_lock:
+        totals = dict(_totals)
+    for name, (count, total) in sorted(totals.items()):
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'lithora_span_seconds_count{{span="{label}"}} {count}')
+        lines.append(f'lithora_span_seconds_sum{{span="{label}"}} {total:.6f}')
+    rss = rss_mb()
+    if rss is not None:
+        lines += ['# TYPE lithora_rss_bytes gauge', f'lithora_rss_bytes {int(rss * 2**20)}']
+    return '\n'.join(lines) + '\n'
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port):
+    # Prometheus text format on http://0.0.0.0:port/metrics, once per process
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = _start_server(int(port))
+    return _server
+
+
+def _start_server(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name='lithora-metrics').start()
+    return server
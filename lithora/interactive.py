@@ -0,0 +1,174 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from lithora.cia import CIA_REFERENCES, WEATHERING_GUIDES, ternary_to_xy
+from lithora.diagrams import get_diagram
+from lithora.qfl import QFL
+
+# Interactive ternary views, drawn with WebGL (Scattergl) in cartesian
+# coordinates of the triangle. Large sets never go to the browser in full:
+# `PointIndex.view` sends at most LOD_POINTS samples of the current viewport,
+# one per occupied grid cell, and zooming in (a box selection) asks the
+# server again for the smaller box, so every sample comes back once the box
+# holds fewer than LOD_POINTS.
+LOD_POINTS = 20_000
+QFL_HEIGHT = np.sqrt(3) / 2
+
+
+# --- Level-of-detail index ---
+class PointIndex:
+    # Points are stored in one random order fixed at build time, so the
+    # representative of a grid cell is a uniform pick that stays the same
+    # from one view to the next.
+    def __init__(self, x, y, seed=0):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        rows = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        self.rows = np.random.default_rng(seed).permutation(rows)
+        self.x = x[self.rows]
+        self.y = y[self.rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def view(self, box=None, budget=LOD_POINTS):
+        # -> (input row indices, samples each one stands for) inside `box`
+        # (x0, x1, y0, y1); all of them when they fit in `budget`
+        x, y = self.x, self.y
+        if box is None:
+            inside = np.arange(len(x))
+            if len(x):
+                box = (x.min(), x.max(), y.min(), y.max())
+        else:
+            x0, x1, y0, y1 = box
+            inside = np.flatnonzero((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1))
+        if len(inside) <= budget:
+            return self.rows[inside], np.ones(len(inside), dtype=np.int64)
+        x0, x1, y0, y1 = box
+        side = int(np.sqrt(budget))
+        cx = np.clip(((x[inside] - x0) / max(x1 - x0, 1e-12) * side).astype(np.int64), 0, side - 1)
+        cy = np.clip(((y[inside] - y0) / max(y1 - y0, 1e-12) * side).astype(np.int64), 0, side - 1)
+        cell = cx * side + cy
+        counts = np.bincount(cell, minlength=side * side)
+        # First point of every cell in storage order: reversed writes, the last one wins
+        first = np.full(side * side, -1, dtype=np.int64)
+        first[cell[::-1]] = inside[::-1]
+        occupied = counts > 0
+        return self.rows[first[occupied]], counts[occupied]
+
+
+# --- Diagram frames: the same fields and guides as the static diagrams ---
+def _ternary_frame(diagram, fields):
+    # Any declared diagram (lithora.diagrams): fields, guides, reference points
+    fig = go.Figure()
+    if fields:
+        for label, scaled in diagram.scaled_fields.items():
+            x, y = qfl_xy(*np.array(scaled + scaled[:1]).T)
+            fig.add_trace(go.Scatter(x=x, y=y, fill='toself', fillcolor=diagram.colors[label], opacity=0.3,
+                                     mode='lines', line=dict(width=0.5, color='gray'), name=label,
+                                     hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=[0, 1, 0.5, 0], y=[0, 0, QFL_HEIGHT, 0], mode='lines',
+                             line=dict(color='black', width=1.5), hoverinfo='skip', showlegend=False))
+    for vertices, label in diagram.guides:
+        x, y = qfl_xy(*np.array(vertices, dtype=float).T)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines', line=dict(color='gray', dash='dash', width=1),
+                                 hoverinfo='skip', showlegend=False))
+        if label:
+            fig.add_annotation(x=x[:2].mean(), y=y[:2].mean(), text=label, showarrow=False,
+                               font=dict(size=10, color='gray'))
+    for t, l, r, label in diagram.labels:
+        x, y = qfl_xy(t, l, r)
+        fig.add_annotation(x=float(x), y=float(y), text=f"+ {label}", showarrow=False, xanchor='left',
+                           font=dict(size=10, color='gray'))
+    top, left, right = diagram.corners
+    for x, y, text, anchor in [(0.5, QFL_HEIGHT, top, 'bottom'), (0, 0, left, 'top'), (1, 0, right, 'top')]:
+        fig.add_annotation(x=x, y=y, text=text, showarrow=False, yanchor=anchor, font=dict(size=14))
+    return fig
+
+
+def _cia_frame():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[0, 1, 0.5, 0], y=[0, 0, 1, 0], mode='lines',
+                             line=dict(color='black', width=1.5), hoverinfo='skip', showlegend=False))
+    for level, end, label in WEATHERING_GUIDES:
+        fig.add_trace(go.Scatter(x=[-0.1, end], y=[level, level], mode='lines', hoverinfo='skip', showlegend=False,
+                                 line=dict(color='gray', dash='dash', width=1)))
+        fig.add_annotation(x=-0.1, y=level, text=label, showarrow=False, xanchor='right',
+                           font=dict(size=10, color='gray'))
+    for x, y, label, _ in CIA_REFERENCES:
+        fig.add_annotation(x=x, y=y, text=' '.join(label.split()), showarrow=False,
+                           font=dict(size=10, color='gray'))
+    for x, y, text, anchor in [(0.5, 1, "A (Al₂O₃)", 'bottom'), (0, 0, "CN (CaO + Na₂O)", 'top'),
+                               (1, 0, "K (K₂O)", 'top')]:
+        fig.add_annotation(x=x, y=y, text=text, showarrow=False, yanchor=anchor, font=dict(size=14))
+    return fig
+
+
+def qfl_xy(q, f, l):
+    # Equilateral triangle: Quartz at the top, Feldspar left, Lithics right
+    x, y = ternary_to_xy(q, f, l)
+    return x, y * QFL_HEIGHT
+
+
+# --- Views: frame + point index + per-sample hover data ---
+class TernaryView:
+    # `hover` holds one row of numbers per sample, shown through `hovertemplate`
+    # as %{customdata[i]}; `labels` (optional) as %{text}
+    def __init__(self, frame, x, y, hover, hovertemplate, values=None, value_label=None, labels=None):
+        self.frame = frame
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.index = PointIndex(self.x, self.y)
+        self.hover = hover
+        self.hovertemplate = hovertemplate
+        self.values = None if values is None else np.asarray(values, dtype=float)
+        self.value_label = value_label
+        self.labels = None if labels is None else np.asarray(labels, dtype=object)
+
+    def figure(self, box=None, budget=LOD_POINTS):
+        # -> (figure, points shown, samples in the box)
+        rows, weight = self.index.view(box, budget)
+        fig = self.frame()
+        marker = dict(size=5, color='black', opacity=0.8)
+        if self.values is not None:
+            marker.update(color=self.values[rows], colorscale='Viridis', colorbar=dict(title=self.value_label))
+        stands_for = f"%{{customdata[{self.hover.shape[1]}]}}"
+        fig.add_trace(go.Scattergl(
+            x=self.x[rows], y=self.y[rows], mode='markers', marker=marker, name="Data Points",
+            customdata=np.column_stack([self.hover[rows], weight]),
+            text=None if self.labels is None else self.labels[rows],
+            hovertemplate=f"{self.hovertemplate}<br>stands for {stands_for} sample(s)<extra></extra>"))
+        fig.update_layout(dragmode='select', plot_bgcolor='white', height=600,
+                          margin=dict(l=10, r=10, t=30, b=10), legend=dict(x=1, y=1, xanchor='right'))
+        fig.update_xaxes(visible=False, range=None if box is None else list(box[:2]))
+        fig.update_yaxes(visible=False, scaleanchor='x', range=None if box is None else list(box[2:]))
+        return fig, len(rows), int(weight.sum())
+
+
+def qfl_view(df, fields=True):
+    # df: a computed QFL table (%Q, %F, %L)
+    return _view(QFL, df, fields)
+
+
+def diagram_view(name, df):
+    # df: a table computed for diagram `name` (compute_diagram)
+    return _view(get_diagram(name), df, True)
+
+
+def _view(diagram, df, fields):
+    hover = df[diagram.percent].to_numpy(dtype=float)
+    x, y = qfl_xy(hover[:, 0], hover[:, 1], hover[:, 2])
+    template = "<br>".join(f"{col.lstrip('%')} %{{customdata[{i}]}}%" for i, col in enumerate(diagram.percent))
+    return TernaryView(lambda: _ternary_frame(diagram, fields), x, y, hover.round(2), template)
+
+
+def cia_view(labels, a, cn, k, cia):
+    a, cn, k = (np.asarray(v, dtype=float) for v in (a, cn, k))
+    x, y = ternary_to_xy(a, cn, k)
+    total = a + cn + k
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hover = np.column_stack([a / total * 100, cn / total * 100, k / total * 100, np.asarray(cia, dtype=float)])
+    template = "A %{customdata[0]}%<br>CN %{customdata[1]}%<br>K %{customdata[2]}%<br>CIA %{customdata[3]}"
+    if labels is not None:
+        template = "%{text}<br>" + template
+    return TernaryView(_cia_frame, x, y, hover.round(2), template, values=cia, value_label="CIA", labels=labels)
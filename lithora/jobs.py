@@ -0,0 +1,174 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded background work for the app. Heavy stages run on a small, process-
+# wide worker pool instead of the Streamlit script thread; callers hold a
+# Job handle, poll its progress and release it when they lose interest.
+# Jobs are keyed (by the content hash of their input), so sessions asking
+# for the same result share one job, and a job nobody holds any more is
+# cancelled at its next checkpoint. Admission is bounded: beyond
+# MAX_PENDING queued or running jobs, `submit` raises Busy.
+MAX_WORKERS = int(os.environ.get('LITHORA_WORKERS') or max(1, min(4, (os.cpu_count() or 1))))
+MAX_PENDING = int(os.environ.get('LITHORA_MAX_JOBS') or 4 * MAX_WORKERS)
+# Uploads above this size take the background path in the app; smaller
+# ones stay inline, where a pool round trip would only add latency
+BACKGROUND_ABOVE_MB = float(os.environ.get('LITHORA_BACKGROUND_MB') or 5)
+# Finished jobs nobody released are dropped after this long
+KEEP_SECONDS = 600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+_current = contextvars.ContextVar('lithora_job', default=None)
+
+
+class Busy(RuntimeError):
+    pass
+
+
+class Cancelled(Exception):
+    pass
+
+
+# --- Cooperative hooks for long-running library code ---
+def checkpoint(fraction=None, message=None):
+    # Reports progress of the job running this code and stops it (raises
+    # Cancelled) once it has been cancelled. Outside a job it does nothing.
+    job = _current.get()
+    if job is None:
+        return
+    if job._cancel.is_set():
+        raise Cancelled(job.key)
+    if fraction is not None:
+        job.progress = min(max(float(fraction), 0.0), 1.0)
+    if message is not None:
+        job.message = message
+
+
+def read_fraction(source):
+    # How far into an in-memory upload (BytesIO) the reader is, else None
+    try:
+        return source.tell() / source.getbuffer().nbytes
+    except (AttributeError, ValueError, ZeroDivisionError):
+        return None
+
+
+# --- Jobs ---
+class Job:
+    def __init__(self, key, fn, args, kwargs):
+        self.key = key
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a worker"
+        self.error = None
+        self.holders = 1
+        self.submitted = time.monotonic()
+        self.finished = None
+        self._fn, self._args, self._kwargs = fn, args, kwargs
+        self._result = None
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    def __repr__(self):
+        return f"Job({self.key!r}, {self.state}, {self.progress:.0%})"
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def result(self):
+        # The return value; re-raises the job's exception if it failed
+        if self.state == FAILED:
+            raise self.error
+        if self.state == CANCELLED:
+            raise Cancelled(self.key)
+        if not self.done():
+            raise RuntimeError(f"job {self.key!r} is still {self.state}")
+        return self._result
+
+    def _run(self):
+        if self._cancel.is_set():
+            self._finish(CANCELLED)
+            return
+        self.state, self.message = RUNNING, "Running"
+        token = _current.set(self)
+        try:
+            self._result = self._fn(*self._args, **self._kwargs)
+            self._finish(DONE)
+        except Cancelled:
+            self._finish(CANCELLED)
+        except Exception as e:
+            self.error = e
+            self._finish(FAILED)
+        finally:
+            _current.reset(token)
+            self._fn = self._args = self._kwargs = None
+
+    def _finish(self, state):
+        self.state = state
+        self.progress = 1.0 if state == DONE else self.progress
+        self.finished = time.monotonic()
+        self._done.set()
+
+
+class JobQueue:
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='lithora-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def pending(self):
+        return sum(not job.done() for job in self._jobs.values())
+
+    def submit(self, key, fn, *args, **kwargs):
+        # Returns the live job for `key` (one more holder), or queues a new
+        # one. Failed and cancelled jobs are replaced, finished ones reused.
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.state not in (FAILED, CANCELLED) and not job._cancel.is_set():
+                job.holders += 1
+                return job
+            if self.pending() >= self.max_pending:
+                raise Busy(f"{self.max_pending} jobs are already queued or running; try again shortly.")
+            job = self._jobs[key] = Job(key, fn, args, kwargs)
+        # Worker threads get a copy of the caller's context (recorders, spans)
+        self._pool.submit(contextvars.copy_context().run, job._run)
+        return job
+
+    def release(self, job):
+        # The caller no longer needs the job; the last holder cancels it (or,
+        # once finished, drops it and its result)
+        with self._lock:
+            job.holders = max(job.holders - 1, 0)
+            if job.holders:
+                return
+            if not job.done():
+                job._cancel.set()
+                job.message = "Cancelled"
+            elif self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [k for k, job in self._jobs.items() if job.done() and now - job.finished > KEEP_SECONDS]:
+            del self._jobs[key]
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    # One queue per process, shared by every session
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
@@ -0,0 +1,88 @@
+import re
+
+import numpy as np
+
+# Commas, semicolons, tabs and line breaks all separate values, so columns
+# pasted from a spreadsheet work as well as typed lists.
+_SEPARATORS = str.maketrans({',': ' ', ';': ' ', '\t': ' ', '\r': ' ', '\n': ' '})
+_SEPARATORS_KEEP_COMMA = str.maketrans({';': ' ', '\t': ' ', '\r': ' ', '\n': ' '})
+_LOOSE_COMMA = re.compile(r'(?<!\d),|,(?!\d)')
+_LIST_COMMA = re.compile(r'[^\s;]*,[^\s;]*,')
+
+
+def comma_is_decimal(text):
+    # "12,5\n13,1" is a decimal-comma column; "12, 13, 14", "12,13,14" and a
+    # lone "12,13" are lists
+    return ('.' not in text and ',' in text and re.search(r'[;\t\n]', text.strip()) is not None
+            and _LOOSE_COMMA.search(text) is None)
+
+
+def detect_decimal(texts):
+    # One separator for all boxes of a submission: a decimal comma needs a
+    # box that shows it and none that rules it out (a '.', a comma next to a
+    # space, or two commas in one entry)
+    if any('.' in text or _LOOSE_COMMA.search(text) or _LIST_COMMA.search(text) for text in texts):
+        return '.'
+    return ',' if any(comma_is_decimal(text) for text in texts) else '.'
+
+
+# --- Text -> float array ---
+def parse_values(text, decimal='auto'):
+    # Returns (values, errors). `values` has one entry per token, NaN where a
+    # token is not a finite number; `errors` lists those as (1-based position,
+    # token), so callers can report them instead of rejecting the whole input.
+    # Empty fields (trailing or doubled separators) are skipped.
+    if decimal == 'auto':
+        decimal = detect_decimal([text])
+    if decimal == ',':
+        tokens = text.translate(_SEPARATORS_KEEP_COMMA).replace(',', '.').split()
+    else:
+        tokens = text.translate(_SEPARATORS).split()
+    if not tokens:
+        return np.empty(0), []
+
+    tokens = np.array(tokens)
+    try:
+        values = tokens.astype(np.float64)
+    except ValueError:
+        # Slow path only for inputs that contain bad tokens
+        values = np.array([_to_float(token) for token in tokens])
+    bad = np.flatnonzero(~np.isfinite(values))
+    values[bad] = np.nan
+    if decimal == ',':
+        tokens = np.char.replace(tokens[bad], '.', ',') if len(bad) else tokens[bad]
+    else:
+        tokens = tokens[bad]
+    return values, [(int(i) + 1, str(token)) for i, token in zip(bad, tokens)]
+
+
+def _to_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        return np.nan
+
+
+# --- Several aligned text boxes -> rows ---
+def parse_columns(texts, names, decimal='auto'):
+    # One text box per column. Rows with a bad entry in any column are
+    # dropped; returns (values (rows, columns), kept 1-based row numbers,
+    # problems as "Name #row: 'token'" strings).
+    if decimal == 'auto':
+        decimal = detect_decimal(texts)
+    parsed = [parse_values(text, decimal) for text in texts]
+    lengths = [len(values) for values, _ in parsed]
+    if len(set(lengths)) > 1:
+        counts = ", ".join(f"{name}: {n}" for name, n in zip(names, lengths))
+        raise ValueError(f"All input lists must be the same length ({counts}).")
+
+    values = np.column_stack([values for values, _ in parsed]) if lengths[0] else np.empty((0, len(texts)))
+    keep = np.isfinite(values).all(axis=1)
+    problems = [f"{name} #{pos}: {token!r}" for name, (_, errors) in zip(names, parsed) for pos, token in errors]
+    return values[keep], np.flatnonzero(keep) + 1, problems
+
+
+def describe_problems(problems, limit=10):
+    shown = "; ".join(problems[:limit])
+    more = f" (and {len(problems) - limit} more)" if len(problems) > limit else ""
+    return f"Skipped {len(problems)} invalid value(s): {shown}{more}"
@@ -0,0 +1,292 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lithora.cia import ternary_to_xy
+from lithora.compositional import CONFIDENCE, GroupSummary
+from lithora.diagrams import get_diagram
+from lithora.density import DENSITY_THRESHOLD, bin_counts, draw_counts, draw_density
+from lithora.export import canvas_to_png, release
+from lithora.instrument import traced
+from lithora.rainfall import minmax_downsample
+from lithora.templates import get_template, label_mask, vector_figure
+
+# In vector output, point layers larger than this are embedded as one image
+# while axes, fields and labels stay vector.
+RASTERIZE_ABOVE = 2_000
+
+# Grouped data: ten colours per marker shape, so 80 groups stay distinct
+GROUP_MARKERS = ['o', 's', '^', 'D', 'v', 'P', 'X', '*']
+REGION_STYLES = {'confidence': '-', 'prediction': '--'}
+
+
+# Raster template for on-screen PNGs, native vector diagram for SVG/PDF
+def diagram(name, vector=False):
+    if vector:
+        return vector_figure(name)
+    template = get_template(name)
+    fig, ax = template.compose()
+    return fig, ax, template
+
+
+# --- Grouped data: one collection, centroid and region per group ---
+def group_style(i):
+    return f"C{i % 10}", GROUP_MARKERS[(i // 10) % len(GROUP_MARKERS)]
+
+
+def group_rows(codes, count):
+    # Row indices of every group from a single stable sort of the codes
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(count + 1))
+    return [order[bounds[i]:bounds[i + 1]] for i in range(count)]
+
+
+def plot_group_points(ax, px, py, summary, values=None, cmap='viridis', size=25):
+    # With `values`, points keep the colour map and groups differ by marker
+    rasterized = len(px) > RASTERIZE_ABOVE
+    norm = dict(vmin=np.nanmin(values), vmax=np.nanmax(values)) if values is not None else {}
+    points = None
+    for i, idx in enumerate(group_rows(summary.codes, len(summary.labels))):
+        color, marker = group_style(i)
+        if values is None:
+            ax.scatter(px[idx], py[idx], marker=marker, color=color, s=size, rasterized=rasterized)
+        else:
+            points = ax.scatter(px[idx], py[idx], marker=marker, c=np.asarray(values)[idx], cmap=cmap, s=size,
+                                edgecolors=color, linewidths=0.8, rasterized=rasterized, **norm)
+    return points
+
+
+def plot_group_summary(ax, project, summary, title=None, regions=('confidence',), level=CONFIDENCE,
+                       legend_x=1.0):
+    # `project` maps closed (t, l, r) fractions to the axes' pixels. The
+    # legend sits right of the diagram (and of a colour bar, via `legend_x`),
+    # one entry per group.
+    boundaries = {kind: summary.regions(kind, level) for kind in regions}
+    for i, label in enumerate(summary.labels):
+        color, marker = group_style(i)
+        for kind, rings in boundaries.items():
+            if np.isfinite(rings[i]).all():
+                ax.plot(*project(*rings[i].T), color=color, lw=1.2, linestyle=REGION_STYLES[kind])
+        ax.plot(*project(*summary.centroid[i, :, None]), linestyle='none', marker=marker, ms=9, mfc=color,
+                mec='black', mew=1.2, label=f"{label} (n={summary.n[i]})")
+    for kind in boundaries:
+        ax.plot([], [], color='gray', lw=1.2, linestyle=REGION_STYLES[kind],
+                label=f"{level:.0%} {kind} region" + (" of the centroid" if kind == 'confidence' else ""))
+    ax.legend(loc='center left', bbox_to_anchor=(legend_x, 0.5), fontsize='small', frameon=False, title=title,
+              ncol=1 + len(summary.labels) // 25)
+
+
+def summarize(parts, names, groups, regions):
+    # Grouped data always gets centroids (and confidence regions by default);
+    # ungrouped data only when `regions` asks for them, as one group.
+    if groups is None and not regions:
+        return None, ()
+    if regions is None:
+        regions = ('confidence',)
+    return GroupSummary(parts, groups, names), tuple(regions)
+
+
+# --- QFL data layer: markers, or density cells for large tables ---
+# Streamed uploads pass their accumulated density grid and row count;
+# `df` is then only a sample of the rows. `groups` (one label per row of
+# `df`) splits the markers and adds the per-group centroids and regions.
+# `columns` are the (top, left, right) % columns of the diagram.
+def plot_samples(template, fig, ax, df, alpha=1.0, counts=None, rows=None,
+                 density_threshold=DENSITY_THRESHOLD, groups=None, group_title=None, regions=None,
+                 level=CONFIDENCE, columns=('%Q', '%F', '%L')):
+    rows = len(df) if rows is None else rows
+    t, l, r = (df[col] for col in columns)
+    summary, regions = summarize(df[list(columns)].to_numpy(), [col.lstrip('%') for col in columns], groups,
+                                 regions)
+    if rows > density_threshold:
+        if counts is None:
+            counts = bin_counts(t, l, r)
+        cells = draw_counts(ax, template.project, counts, alpha=alpha)
+        fig.colorbar(cells, cax=ax.inset_axes([0.9, 0.3, 0.02, 0.3]), label="Samples per cell")
+    else:
+        px, py = template.project(t, l, r)
+        if groups is None:
+            ax.plot(px, py, 'ko', rasterized=len(px) > RASTERIZE_ABOVE)
+        else:
+            plot_group_points(ax, px, py, summary)
+    if summary is not None:
+        plot_group_summary(ax, template.project, summary, group_title, regions, level,
+                           legend_x=1.12 if rows > density_threshold else 1.0)
+
+
+# --- Ternary Plot: Basic ---
+@traced('plot_basic_ternary')
+def plot_basic_ternary(df, counts=None, rows=None, density_threshold=DENSITY_THRESHOLD, vector=False,
+                       groups=None, group_title=None, regions=None, level=CONFIDENCE):
+    fig, ax, template = diagram('qfl', vector)
+    plot_samples(template, fig, ax, df, counts=counts, rows=rows, density_threshold=density_threshold,
+                 groups=groups, group_title=group_title, regions=regions, level=level)
+    return fig
+
+
+# --- Ternary Plot: Provenance Fields ---
+@traced('plot_provenance_ternary')
+def plot_provenance_ternary(df, counts=None, rows=None, density_threshold=DENSITY_THRESHOLD, vector=False,
+                            groups=None, group_title=None, regions=None, level=CONFIDENCE):
+    fig, ax, template = diagram('qfl_provenance', vector)
+    plot_samples(template, fig, ax, df, alpha=0.6, counts=counts, rows=rows, density_threshold=density_threshold,
+                 groups=groups, group_title=group_title, regions=regions, level=level)
+    return fig
+
+
+# --- Any declared ternary diagram (lithora.diagrams), on its field template ---
+@traced('plot_diagram')
+def plot_diagram(name, df, counts=None, rows=None, density_threshold=DENSITY_THRESHOLD, vector=False, groups=None,
+                 group_title=None, regions=None, level=CONFIDENCE):
+    # df: a table computed for the diagram (compute_diagram)
+    spec = get_diagram(name)
+    fig, ax, template = diagram(spec.template, vector)
+    plot_samples(template, fig, ax, df, alpha=0.6 if spec.fields else 1.0, counts=counts, rows=rows,
+                 density_threshold=density_threshold, groups=groups, group_title=group_title, regions=regions,
+                 level=level, columns=spec.percent)
+    return fig
+
+
+# --- QFL figures that grow with appended samples ---
+class GrowingPlot:
+    # The diagram is drawn once; `add` draws only the new samples into the
+    # existing Agg buffer (template and earlier points are not redrawn) and
+    # `png` encodes that buffer. Past `density_threshold` samples the data
+    # layer is the density grid instead, redrawn from the running counts,
+    # so an append costs the same whatever the size of the project.
+    def __init__(self, name='qfl', alpha=1.0, density_threshold=DENSITY_THRESHOLD):
+        self.name = name
+        self.alpha = alpha
+        self.density_threshold = density_threshold
+        self._png = None
+        self._compose()
+
+    def _compose(self):
+        self.template = get_template(self.name)
+        self.fig, self.ax = self.template.compose()
+        self.canvas = FigureCanvasAgg(self.fig)
+        self._drawn = False
+
+    def add(self, new, stats):
+        # new: the appended rows; stats: the project's QFLAccumulator (all rows)
+        if stats.rows > self.density_threshold:
+            release(self.fig)
+            self._compose()
+            cells = draw_counts(self.ax, self.template.project, stats.density, alpha=self.alpha)
+            self.fig.colorbar(cells, cax=self.ax.inset_axes([0.9, 0.3, 0.02, 0.3]), label="Samples per cell")
+            self.canvas.draw()
+        else:
+            if not self._drawn:
+                self.canvas.draw()
+            px, py = self.template.project(new['%Q'], new['%F'], new['%L'])
+            line, = self.ax.plot(px, py, 'ko')
+            self.ax.draw_artist(line)
+        self._drawn = True
+        self._png = None
+
+    def png(self):
+        if self._png is None:
+            self._png = canvas_to_png(self.canvas)
+        return self._png
+
+
+# --- CIA (A-CN-K) ternary ---
+# `groups` (one label per sample) replaces the single marker style with one
+# style per group and overlays the group centroids and `regions`.
+@traced('plot_ternary')
+def plot_ternary(data, marker="o", marker_color="black", show_labels=True, values=None, cmap="viridis",
+                 density_threshold=DENSITY_THRESHOLD, vector=False, groups=None, group_title=None, regions=None,
+                 level=CONFIDENCE):
+    fig, ax, template = diagram('cia', vector)
+
+    labels, a_vals, cn_vals, k_vals = zip(*data) if data else ((), (), (), ())
+    project = lambda a, cn, k: template.project(*ternary_to_xy(a, cn, k))
+    summary, regions = summarize(np.column_stack([a_vals, cn_vals, k_vals]).reshape(-1, 3), ['A', 'CN', 'K'],
+                                 groups, regions)
+
+    # Density cells instead of markers for large datasets
+    if len(data) > density_threshold:
+        cells = draw_density(ax, project, a_vals, cn_vals, k_vals, cmap=cmap, alpha=0.8)
+        fig.colorbar(cells, cax=ax.inset_axes([0.9, 0.45, 0.015, 0.35]), label="Samples per cell")
+        if summary is not None:
+            plot_group_summary(ax, project, summary, group_title, regions, level)
+        return fig
+
+    # Plot points: one collection for every marker (or group)
+    xs, ys = ternary_to_xy(a_vals, cn_vals, k_vals)
+    px, py = template.project(xs, ys)
+    rasterized = len(px) > RASTERIZE_ABOVE
+    if groups is not None:
+        points = plot_group_points(ax, px, py, summary, values, cmap)
+    elif values is None:
+        points = ax.scatter(px, py, marker=marker, color=marker_color, s=25, rasterized=rasterized)
+    else:
+        points = ax.scatter(px, py, marker=marker, c=values, cmap=cmap, s=25, rasterized=rasterized)
+    if values is not None:
+        cax = ax.inset_axes([0.9, 0.45, 0.015, 0.35])
+        fig.colorbar(points, cax=cax, label="CIA")
+    if summary is not None:
+        plot_group_summary(ax, project, summary, group_title, regions, level)
+
+    # Labels only where the density allows
+    if show_labels:
+        lx, ly = template.project(xs + 0.01, ys + 0.01)
+        for i in np.flatnonzero(label_mask(px, py)):
+            ax.text(lx[i], ly[i], str(labels[i]), fontsize=10)
+
+    return fig
+
+
+# --- Rainfall: hourly intensity and monthly trend ---
+@traced('plot_rainfall')
+def plot_rainfall(hourly, monthly, title=None, buckets=1500):
+    # `hourly` can span decades; it is reduced to per-bucket min/max pairs so
+    # the line keeps every storm peak at a few thousand points.
+    fig = Figure(figsize=(10, 6), dpi=100)
+    ax_int, ax_month = fig.subplots(2, 1, gridspec_kw={'height_ratios': [3, 2], 'hspace': 0.35})
+
+    x, y = minmax_downsample(hourly.index.to_numpy(), hourly.to_numpy(), buckets)
+    ax_int.plot(x, y, color='tab:blue', lw=0.6)
+    ax_int.set_ylabel("Intensity (mm/h)")
+    ax_int.set_title(title or "Hourly rainfall intensity", fontsize=11)
+    ax_int.grid(True, linestyle='--', linewidth=0.5)
+
+    months = monthly.index.to_numpy()
+    ax_month.bar(months, monthly.to_numpy(), width=np.timedelta64(25, 'D'), color='tab:blue', alpha=0.5,
+                 label="Monthly total")
+    if len(monthly) >= 12:
+        ax_month.plot(months, monthly.rolling(12, center=True).mean().to_numpy(), color='tab:red', lw=1.2,
+                      label="12-month mean")
+    if len(monthly) >= 2:
+        years = (months - months[0]) / np.timedelta64(1, 'D') / 365.25
+        slope, offset = np.polyfit(years, monthly.to_numpy(), 1)
+        ax_month.plot(months, offset + slope * years, color='black', lw=1, linestyle='--',
+                      label=f"Trend {slope:+.2f} mm/month per year")
+    ax_month.set_ylabel("Monthly total (mm)")
+    ax_month.legend(fontsize='small', loc='upper left')
+    ax_month.grid(True, linestyle='--', linewidth=0.5)
+    return fig
+
+
+# --- Rainfall: IDF curves, one line per return period ---
+@traced('plot_idf')
+def plot_idf(table, title=None):
+    fig = Figure(figsize=(8, 5.5), dpi=100)
+    ax = fig.add_subplot()
+    minutes = table['Minutes'].to_numpy()
+    periods = [col for col in table.columns if col != 'Minutes']
+    colors = [f"C{i}" for i in range(len(periods))]
+    for period, color in zip(periods[::-1], colors[::-1]):
+        ax.plot(minutes, table[period].to_numpy(), marker='o', ms=4, color=color, label=f"T = {period[:-1]} yr")
+
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xticks(minutes)
+    ax.set_xticklabels(table.index, rotation=45)
+    ax.minorticks_off()
+    ax.set_xlabel("Duration")
+    ax.set_ylabel("Intensity (mm/h)")
+    ax.set_title(title or "Intensity-Duration-Frequency curves", fontsize=11)
+    ax.legend(fontsize='small')
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+    return fig
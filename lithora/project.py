@@ -0,0 +1,49 @@
+import pandas as pd
+
+from lithora.ingest import QFLAccumulator
+from lithora.qfl import compute_qfl
+
+
+# --- A QFL dataset that grows by appending samples ---
+class QFLProject:
+    # Field work adds a few samples at a time to projects that already hold
+    # thousands. Each append computes percentages and provenance for the new
+    # rows only and folds them into the running provenance counts and density
+    # grid (`stats`); the full table is concatenated lazily, when asked for.
+    def __init__(self):
+        self.stats = QFLAccumulator()
+        self.version = 0
+        self._table = None
+        self._parts = []
+        self._sources = set()
+
+    @property
+    def rows(self):
+        return self.stats.rows
+
+    def __contains__(self, source):
+        # Whether `source` was already appended (lets callers skip parsing it)
+        return source in self._sources
+
+    def append(self, quartz, feldspar, lithics, source=None):
+        # Returns the computed new rows. A `source` (e.g. the content hash of
+        # an upload) is appended only once; repeats return None. It is only
+        # recorded once its rows are in, so a failed append can be retried.
+        if source is not None and source in self._sources:
+            return None
+        new = compute_qfl(quartz, feldspar, lithics)
+        new.index = pd.RangeIndex(self.rows, self.rows + len(new))
+        self.stats.update(new)
+        self._parts.append(new)
+        if source is not None:
+            self._sources.add(source)
+        self.version += 1
+        return new
+
+    @property
+    def table(self):
+        if self._parts:
+            frames = self._parts if self._table is None else [self._table] + self._parts
+            self._table = pd.concat(frames) if len(frames) > 1 else frames[0]
+            self._parts = []
+        return compute_qfl([], [], []) if self._table is None else self._table
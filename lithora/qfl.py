@@ -0,0 +1,55 @@
+from lithora.instrument import traced
+from lithora.parsing import parse_values
+from lithora.ternary import UNCLASSIFIED, Diagram  # noqa: F401  (UNCLASSIFIED re-exported)
+
+# --- Dickinson QFL provenance fields (Q, F, L in %) ---
+FIELDS = {
+    'Basement Uplift': [(100,0,0),(0,100,0),(0,85,15),(96,0,4)],
+    'Recycled Orogen': [(25,0,75),(51,40,9),(96,0,4)],
+    'Undissected Arc': [(0,50,50),(25,0,75),(0,0,100)],
+    'Transitional Arc': [(0,50,50),(25,0,75),(33,12,55),(17,70,13),(0,85,15)],
+    'Dissected Arc': [(51,40,9),(17,70,13),(33,12,55)]
+}
+COLORS = {
+    'Basement Uplift': 'lightyellow',
+    'Recycled Orogen': 'skyblue',
+    'Undissected Arc': 'cyan',
+    'Transitional Arc': 'lightgreen',
+    'Dissected Arc': 'lightblue'
+}
+QFL = Diagram('qfl', "QFL provenance (Dickinson)", ("Quartz", "Feldspar", "Lithics"),
+              ['Quartz', 'Feldspar', 'Lithics'], FIELDS, COLORS, percent=['%Q', '%F', '%L'],
+              field_column='Provenance', template='qfl_provenance', source="Dickinson et al. (1983)")
+SCALED_FIELDS = QFL.scaled_fields
+FIELD_LABELS = QFL.field_labels
+
+
+# --- Batched point-in-polygon classification ---
+def classify_provenance(quartz, feldspar, lithics):
+    return QFL.classify(quartz, feldspar, lithics)
+
+
+# --- Per-field count summary ---
+def provenance_counts(provenance):
+    return QFL.counts(provenance)
+
+
+def provenance_summary(provenance=None, counts=None):
+    # Either the per-sample labels or already accumulated per-field counts
+    return QFL.summary(provenance, counts)
+
+
+# --- Pre-processing for comma-separated manual input ---
+def parse_input_list(data_str, decimal='auto'):
+    # Strict variant for callers that want all-or-nothing parsing
+    values, errors = parse_values(data_str, decimal)
+    if errors:
+        listed = ", ".join(f"#{pos} {token!r}" for pos, token in errors[:10])
+        raise ValueError(f"Invalid value(s) at {listed}" + (" ..." if len(errors) > 10 else ""))
+    return values.tolist()
+
+
+# --- Calculate and return QFL DataFrame ---
+@traced('compute_qfl')
+def compute_qfl(quartz, feldspar, lithics):
+    return QFL.compute(quartz, feldspar, lithics)
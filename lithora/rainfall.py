@@ -0,0 +1,227 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from lithora.instrument import traced
+from lithora.jobs import checkpoint, read_fraction
+
+# Header names recognised when the columns are not given explicitly
+TIME_COLUMNS = ['timestamp', 'datetime', 'date_time', 'time', 'date']
+RAIN_COLUMNS = ['rainfall', 'rain', 'precipitation', 'precip', 'depth', 'mm']
+
+# Standard durations for the rolling maximum intensities, in minutes
+DURATIONS = {
+    '5min': 5, '10min': 10, '15min': 15, '30min': 30,
+    '1h': 60, '2h': 120, '3h': 180, '6h': 360, '12h': 720, '24h': 1440,
+}
+
+# Peak bytes per row while a chunk is parsed: the timestamp strings dominate.
+BYTES_PER_ROW = 160
+DEFAULT_BUDGET_MB = 64
+
+
+def chunk_rows(budget_mb=DEFAULT_BUDGET_MB):
+    return max(1_000, int(budget_mb * 2**20 // BYTES_PER_ROW))
+
+
+def find_columns(columns, time_col=None, rain_col=None):
+    lower = {str(col).strip().lower(): col for col in columns}
+    if time_col is None:
+        time_col = next((lower[name] for name in TIME_COLUMNS if name in lower), None)
+    if rain_col is None:
+        # Whole words of the header only ("Rain (mm)", "rainfall_mm"), so
+        # e.g. "Drainage" or "Comment" are not taken for the rain series
+        rain_col = next((col for key, col in lower.items()
+                         if col != time_col and set(re.split(r'[^a-z0-9]+', key)) & set(RAIN_COLUMNS)), None)
+    missing = [name for name, col in (('timestamp', time_col), ('rainfall', rain_col))
+               if col is None or col not in columns]
+    if missing:
+        raise ValueError(f"Could not find the {' and '.join(missing)} column(s) in: {', '.join(map(str, columns))}")
+    return time_col, rain_col
+
+
+def to_minutes(timestamps):
+    # int64 minutes since the epoch; timezone-aware input is taken as UTC
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return np.asarray(timestamps, dtype='datetime64[m]').astype(np.int64)
+
+
+def minute_years(minutes):
+    return np.asarray(minutes).astype('datetime64[m]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+# --- Single-pass aggregates over a gauge record ---
+class RainfallAccumulator:
+    # Depths are binned onto a 1-minute grid. Only the last `max(durations)`
+    # minutes of that grid are carried between chunks, which is all a window
+    # ending in the next chunk can reach; hourly totals, the overall and the
+    # annual rolling maxima are kept as the chunks go by. The newest minute of
+    # each chunk is held back because the next chunk may still add to it.
+    def __init__(self, durations=DURATIONS):
+        self.durations = dict(durations)
+        self._widths = np.array(list(self.durations.values()), dtype=np.int64)
+        self.rows = 0
+        self.total = 0.0
+        self.max_depth = np.zeros(len(self._widths))
+        self.max_end = np.full(len(self._widths), -1, dtype=np.int64)
+        self._annual = {}
+        self._hourly = []
+        self._tail = np.zeros(0)
+        self._base = None
+        self._done = None
+
+    def update(self, minutes, depth):
+        minutes = np.asarray(minutes, dtype=np.int64)
+        depth = np.asarray(depth, dtype=float)
+        ok = np.isfinite(depth)
+        minutes, depth = minutes[ok], depth[ok]
+        if not len(minutes):
+            return self
+        lo, hi = minutes.min(), minutes.max() + 1
+        if self._base is None:
+            self._base = self._done = lo
+        elif lo < self._done:
+            raise ValueError("Rainfall records must be in ascending time order.")
+
+        end = max(hi, self._base + len(self._tail))
+        grid = np.bincount(minutes - self._base, weights=depth, minlength=end - self._base)
+        grid[:len(self._tail)] += self._tail
+        self._evaluate(grid, end - 1)
+
+        keep = max(self._base, self._done - self._widths.max() + 1)
+        self._tail = grid[keep - self._base:]
+        self._base = keep
+
+        hours = minutes // 60
+        first = hours.min()
+        self._hourly.append(pd.Series(np.bincount(hours - first, weights=depth),
+                                      index=np.arange(first, hours.max() + 1)))
+        if len(self._hourly) >= 16:
+            self._collapse_hourly()
+        self.rows += len(minutes)
+        self.total += depth.sum()
+        return self
+
+    def finish(self):
+        if self._base is not None:
+            self._evaluate(self._tail, self._base + len(self._tail))
+        return self
+
+    def _evaluate(self, grid, stop):
+        # Windows ending at minutes [done, stop) are final; prefix sums give
+        # every window total in one subtraction per duration.
+        if stop <= self._done:
+            return
+        cs = np.concatenate([[0.0], np.cumsum(grid)])
+        ends = np.arange(self._done, stop)
+        idx = ends - self._base + 1
+        years = minute_years(ends)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(years)) + 1])
+        annual = np.empty((len(starts), len(self._widths)))
+        for k, width in enumerate(self._widths):
+            sums = cs[idx] - cs[np.maximum(idx - width, 0)]
+            best = sums.argmax()
+            if sums[best] > self.max_depth[k]:
+                self.max_depth[k], self.max_end[k] = sums[best], ends[best]
+            annual[:, k] = np.maximum.reduceat(sums, starts)
+        for year, row in zip(years[starts], annual):
+            prev = self._annual.get(year)
+            self._annual[year] = row if prev is None else np.maximum(prev, row)
+        self._done = stop
+
+    def _collapse_hourly(self):
+        # Neighbouring chunks can share an hour, so partial totals are summed
+        if len(self._hourly) > 1:
+            self._hourly = [pd.concat(self._hourly).groupby(level=0).sum()]
+
+    # --- Results ---
+    @property
+    def hourly(self):
+        self._collapse_hourly()
+        if not self._hourly:
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([]), name='Rainfall (mm)')
+        hours = self._hourly[0]
+        index = pd.DatetimeIndex((hours.index.to_numpy() * 60).astype('datetime64[m]'))
+        return pd.Series(hours.to_numpy(), index=index, name='Rainfall (mm)')
+
+    @property
+    def daily(self):
+        return self.hourly.resample('D').sum()
+
+    @property
+    def monthly(self):
+        return self.hourly.resample('MS').sum()
+
+    @property
+    def intensities(self):
+        hours = self._widths / 60
+        ends = pd.to_datetime(np.where(self.max_end >= 0, self.max_end, 0).astype('datetime64[m]'))
+        return pd.DataFrame({
+            'Duration': list(self.durations),
+            'Minutes': self._widths,
+            'Max depth (mm)': self.max_depth.round(3),
+            'Max intensity (mm/h)': (self.max_depth / hours).round(3),
+            'Window end': ends.where(self.max_end >= 0),
+        })
+
+    @property
+    def annual_max(self):
+        # Annual maximum depth (mm) per duration, one row per calendar year
+        years = sorted(self._annual)
+        data = np.array([self._annual[y] for y in years]).reshape(len(years), len(self._widths))
+        return pd.DataFrame(data.round(3), index=pd.Index(years, name='Year'), columns=list(self.durations))
+
+
+# --- Streaming ingestion ---
+def read_columns(source, **read_csv_kwargs):
+    pos = source.tell() if hasattr(source, 'seek') else None
+    columns = list(pd.read_csv(source, nrows=0, **read_csv_kwargs).columns)
+    if pos is not None:
+        source.seek(pos)
+    return columns
+
+
+def iter_rainfall_chunks(source, budget_mb=DEFAULT_BUDGET_MB, time_col=None, rain_col=None,
+                         time_format=None, **read_csv_kwargs):
+    # Yields (minutes, depth) arrays, one pair per CSV chunk
+    time_col, rain_col = find_columns(read_columns(source, **read_csv_kwargs), time_col, rain_col)
+    reader = pd.read_csv(source, usecols=[time_col, rain_col], dtype={rain_col: 'float32'},
+                         chunksize=chunk_rows(budget_mb), **read_csv_kwargs)
+    with reader:
+        for chunk in reader:
+            stamps = pd.to_datetime(chunk[time_col], format=time_format, errors='coerce')
+            ok = stamps.notna().to_numpy()
+            yield to_minutes(stamps[ok]), chunk[rain_col].to_numpy()[ok]
+
+
+@traced('stream_rainfall')
+def stream_rainfall(source, budget_mb=DEFAULT_BUDGET_MB, time_col=None, rain_col=None, time_format=None,
+                    accumulator=None, **read_csv_kwargs):
+    acc = accumulator or RainfallAccumulator()
+    for minutes, depth in iter_rainfall_chunks(source, budget_mb, time_col, rain_col, time_format,
+                                               **read_csv_kwargs):
+        checkpoint(read_fraction(source), "Streaming chunks")
+        acc.update(minutes, depth)
+    return acc.finish()
+
+
+# --- Display decimation ---
+def minmax_downsample(x, y, buckets=1000):
+    # Keeps the lowest and highest point of every bucket, so storm peaks
+    # survive the reduction to a few thousand plotted points.
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    high = np.full(rows * size, -np.inf)
+    low = np.full(rows * size, np.inf)
+    high[:n] = low[:n] = y
+    offsets = np.arange(rows) * size
+    keep = np.union1d(offsets + high.reshape(rows, size).argmax(axis=1),
+                      offsets + low.reshape(rows, size).argmin(axis=1))
+    return x[keep], y[keep]
@@ -0,0 +1,261 @@
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from lithora.cache import content_key
+
+# Content-addressed results on disk, shared by every process (app replicas,
+# restarts) pointed at the same directory. Values are stored by type:
+#
+#     pandas.DataFrame -> Arrow IPC file, memory-mapped on load
+#     numpy.ndarray    -> .npy, loaded with mmap_mode='r' (read-only, zero-copy)
+#     bytes            -> raw file (encoded figures, table downloads)
+#
+# Writers go through a temporary file and an atomic rename, so readers only
+# ever see complete files and concurrent writers of the same key (identical
+# content by construction) simply overwrite each other. Reads refresh the
+# file's mtime; past `max_mb` the least recently used files are deleted by
+# whichever process holds the eviction lock. Deleting a file another process
+# has mapped is safe on POSIX: the mapping stays valid until it is dropped.
+log = logging.getLogger(__name__)
+STORE_DIR = os.environ.get('LITHORA_STORE')
+STORE_MB = float(os.environ.get('LITHORA_STORE_MB') or 2048)
+# Bump when stored results change layout or appearance for the same input
+STORE_VERSION = 1
+SUFFIXES = {'.arrow', '.npy', '.bin'}
+
+
+class ArtifactStore:
+    def __init__(self, root, max_mb=STORE_MB):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 2**20)
+        # Bytes written by this process since the last size check
+        self._written = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key, suffix):
+        key = hashlib.blake2b(f"{STORE_VERSION}:{key}".encode(), digest_size=16).hexdigest()
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    # --- Reads: None on a miss, including a file evicted mid-read ---
+    def get(self, key):
+        for suffix in ('.arrow', '.npy', '.bin'):
+            path = self._path(key, suffix)
+            try:
+                value = _LOADERS[suffix](path)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # Unreadable (e.g. written by an incompatible version): treat as a miss
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return value
+        return None
+
+    # --- Writes ---
+    def put(self, key, value):
+        suffix, write = _writer(value)
+        if write is None:
+            return False
+        path = self._path(key, suffix)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(value, f)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        size = path.stat().st_size
+        with self._lock:
+            self._written += size
+            check = self._written > self.max_bytes // 10
+            if check:
+                self._written = 0
+        if check:
+            self.evict()
+        return True
+
+    # --- Size-based eviction, least recently used first ---
+    def size(self):
+        return sum(f.stat().st_size for f in self._files())
+
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        with _exclusive(self.root / '.evict.lock') as locked:
+            if not locked:
+                return 0  # another process is already evicting
+            files = []
+            for f in self._files():
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, f))
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, f in sorted(files):
+                if total <= max_bytes:
+                    break
+                try:
+                    f.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            # Temporary files left behind by a crashed writer
+            for tmp in self.root.glob('*/.tmp-*'):
+                try:
+                    if time.time() - tmp.stat().st_mtime > 3600:
+                        tmp.unlink()
+                except FileNotFoundError:
+                    pass
+            return removed
+
+    def _files(self):
+        return (f for f in self.root.glob('*/*') if f.suffix in SUFFIXES and not f.name.startswith('.'))
+
+
+# --- Formats ---
+def _load_arrow(path):
+    import pyarrow as pa
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_arrow(df, f):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_file(f, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _load_npy(path):
+    import numpy as np
+    return np.load(path, mmap_mode='r', allow_pickle=False)
+
+
+def _write_npy(array, f):
+    import numpy as np
+    np.save(f, array, allow_pickle=False)
+
+
+def _load_bin(path):
+    return path.read_bytes()
+
+
+def _write_bin(data, f):
+    f.write(data)
+
+
+_LOADERS = {'.arrow': _load_arrow, '.npy': _load_npy, '.bin': _load_bin}
+
+
+def _writer(value):
+    # (suffix, writer) for the value's type; (None, None) if it is not storable
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '.bin', _write_bin
+    module = type(value).__module__.split('.')[0]
+    if module == 'pandas' and hasattr(value, 'columns'):
+        return '.arrow', _write_arrow
+    if module == 'numpy' and hasattr(value, 'dtype') and value.dtype != object:
+        return '.npy', _write_npy
+    return None, None
+
+
+class _exclusive:
+    # Non-blocking inter-process lock file; without fcntl (Windows) only
+    # threads of this process are excluded
+    _local = threading.Lock()
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.held = False
+
+    def __enter__(self):
+        if not self._local.acquire(blocking=False):
+            return False
+        self.held = True
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.__exit__()
+            return False
+        return True
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            os.close(self.fd)  # closing releases the flock
+            self.fd = None
+        if self.held:
+            self.held = False
+            self._local.release()
+        return False
+
+
+# --- Read-through wrapper for pure stage functions ---
+def stored(fn):
+    # Results of `fn` are looked up in, and written to, the store. As with
+    # st.cache_data, arguments whose names start with "_" are not part of the
+    # key (the caller passes a content hash that stands in for them); the
+    # function's source is, so editing a stage invalidates its results.
+    # The store is an optimisation: failing to write to it never fails the call.
+    sig = inspect.signature(fn)
+    try:
+        code = inspect.getsource(fn)
+    except (OSError, TypeError):
+        code = fn.__code__.co_code
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        store = get_store()
+        if store is None:
+            return fn(*args, **kwargs)
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = content_key(name, code, *[(k, v) for k, v in bound.arguments.items() if not k.startswith('_')])
+        value = store.get(key)
+        if value is None:
+            value = fn(*args, **kwargs)
+            try:
+                store.put(key, value)
+            except Exception as e:
+                log.warning("not storing %s: %s", name, e)
+        return value
+    return call
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    # The store named by LITHORA_STORE, or None when it is not set
+    global _store
+    if _store is None and STORE_DIR:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore(STORE_DIR)
+    return _store
@@ -0,0 +1,248 @@
+import io
+import threading
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imread
+import mpltern  # noqa: F401  (registers the 'ternary' projection)
+
+from lithora.cia import CIA_REFERENCES, WEATHERING_GUIDES
+from lithora.diagrams import DIAGRAMS
+from lithora.export import release
+from lithora.qfl import QFL
+
+# Backgrounds are rasterized at the same DPI st.pyplot uses, so the composited
+# figure is shown without resampling.
+TEMPLATE_DPI = 200
+PAD_INCHES = 0.1
+
+
+# --- Data -> pixel projection of a diagram ---
+class Projection:
+    # kind == 'ternary': project(t, l, r) via the three corner pixels
+    # kind == 'xy':      project(x, y) via an affine data -> pixel matrix
+    def __init__(self, kind, matrix):
+        self.kind = kind
+        self.matrix = matrix
+
+    def project(self, *coords):
+        cols = [np.asarray(c, dtype=float) for c in coords]
+        if self.kind == 'ternary':
+            pts = np.column_stack(cols)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pts = pts / pts.sum(axis=1, keepdims=True)
+        else:
+            pts = np.column_stack(cols + [np.ones_like(cols[0])])
+        px = pts @ self.matrix
+        return px[:, 0], px[:, 1]
+
+
+# --- Pre-rendered diagram background ---
+class Template(Projection):
+    def __init__(self, image, dpi, kind, matrix):
+        super().__init__(kind, matrix)
+        self.image = image
+        self.dpi = dpi
+        self.height, self.width = image.shape[:2]
+
+    def compose(self):
+        # Fresh figure the size of the template, with one pixel-unit axes
+        # holding the cached raster; callers draw only the data layer on it.
+        fig = Figure(figsize=(self.width / self.dpi, self.height / self.dpi), dpi=self.dpi)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.imshow(self.image, extent=(0, self.width, 0, self.height), interpolation='nearest')
+        ax.set_xlim(0, self.width)
+        ax.set_ylim(0, self.height)
+        ax.set_axis_off()
+        return fig, ax
+
+
+def _crop_box(fig):
+    # Tight bbox of the drawn diagram plus padding, in inches
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    return fig.get_tightbbox(canvas.get_renderer()).padded(PAD_INCHES)
+
+
+def _rasterize(fig):
+    # Crop to the tight bbox ourselves so the pixel offset of the crop is known.
+    bbox = _crop_box(fig)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=TEMPLATE_DPI, bbox_inches=bbox)
+    buf.seek(0)
+    image = (imread(buf) * 255).astype(np.uint8)
+    offset = np.array([bbox.x0, bbox.y0]) * TEMPLATE_DPI
+    return image, offset
+
+
+# --- Declared ternary diagrams (QFL, Qm-F-Lt, Folk, A-CNK-FM, ...) ---
+def _draw_ternary(diagram, with_fields=True):
+    fig = Figure(dpi=TEMPLATE_DPI)
+    ax = fig.add_subplot(projection='ternary')
+
+    top, left, right = diagram.corners
+    ax.set_tlabel(top)
+    ax.set_llabel(left)
+    ax.set_rlabel(right)
+
+    ticks, tick_vals = np.linspace(0, 1, 6), [0, 20, 40, 60, 80, 100]
+    ax.taxis.set_ticks(ticks, labels=tick_vals)
+    ax.laxis.set_ticks(ticks, labels=tick_vals)
+    ax.raxis.set_ticks(ticks, labels=tick_vals)
+
+    with_fields = with_fields and bool(diagram.fields)
+    if with_fields:
+        for label, scaled in diagram.scaled_fields.items():
+            ax.fill(*zip(*scaled), label=label, alpha=0.3, color=diagram.colors[label])
+    for vertices, label in diagram.guides:
+        t, l, r = (np.asarray(v, dtype=float) / 100 for v in zip(*vertices))
+        ax.plot(t, l, r, linestyle='--', color='gray', lw=1)
+        if label:
+            ax.text((t[0] + t[1]) / 2, (l[0] + l[1]) / 2, (r[0] + r[1]) / 2, label, fontsize=6, color='gray',
+                    ha='center', va='bottom')
+    for t, l, r, label in diagram.labels:
+        ax.plot(t / 100, l / 100, r / 100, marker='+', color='gray', linestyle='none', clip_on=False)
+        ax.text(t / 100, l / 100, r / 100, f"  {label}", fontsize=7, color='gray', va='center', clip_on=False)
+
+    # Empty stand-in so the legend already carries the data entry
+    ax.plot([], [], [], 'ko', label='Data Points')
+    if with_fields:
+        ax.legend(fontsize='small', loc='upper left', bbox_to_anchor=(0.8, 1))
+    else:
+        ax.legend(fontsize='small')
+    ax.grid(True, linestyle='--', linewidth=0.5)
+    return fig, ax
+
+
+def _ternary_matrix(ax, offset):
+    # Pixel position of the t, l and r corners, relative to `offset`
+    return ax.transTernaryAxes.transform([[1, 0, 0], [0, 1, 0], [0, 0, 1]]) - offset
+
+
+# --- CIA (A-CN-K) diagram ---
+def _draw_cia():
+    fig = Figure(figsize=(8, 7), dpi=TEMPLATE_DPI)
+    ax = fig.add_subplot()
+    ax.set_xlim(-0.1, 1.1)
+    ax.set_ylim(-0.1, 1 + 0.1)
+    ax.axis('off')
+
+    # Draw triangle
+    triangle = [(0, 0), (1, 0), (0.5, 1), (0, 0)]
+    x_tri, y_tri = zip(*triangle)
+    ax.plot(x_tri, y_tri, 'k-', lw=2)
+
+    # Draw line
+    line = [(-0.1, 0), (-0.1, 1), (-0.1, 0)]
+    x_li, y_li = zip(*line)
+    ax.plot(x_li, y_li, 'k-', lw=2)
+
+    # Mark Lavel and grid
+    for i in range(11):
+        fcn = i/10
+        x_m,y_m = zip((-0.1,1-fcn ), (-0.1, 1))
+        ax.plot(x_m, y_m, marker='x', color='black',lw=0)
+
+        for j in range(11):
+          ax.text(-0.15,j/10, f"{int(j * 10)}", ha='left', fontsize=8)
+    # Weathering levels and reference minerals
+    for level, end, label in WEATHERING_GUIDES:
+        ax.plot([-0.1, end], [level, level], linestyle='--', color='gray')
+        ax.text(-0.001, level + 0.02, label.replace(' ', '\n'), ha='center', fontsize=7, color="gray")
+    for x, y, label, ha in CIA_REFERENCES:
+        ax.text(x, y, label, ha=ha, fontsize=7, color="gray")
+
+      # Arrows & Lines
+    ax.arrow(0.28, 0.52, 0.145, 0.3, head_width=0.01, head_length=0.01, fc='red', ec='red')
+    ax.arrow(0.48, 0.54, 0.115, 0.23, head_width=0.01, head_length=0.01, fc='red', ec='red')
+
+    lineAR = [(0.5375, 0.655), (0.2, 0.62),(0.3525,0.67)]
+    x_li, y_li = zip(*lineAR)
+    ax.plot(x_li, y_li, linestyle='-', color='gray',lw=1)
+    ax.text(0.16, 0.58, 'Weathring\ntrend', ha='center', fontsize=6,color = "gray",fontstyle='italic')
+
+    # Axis labels
+    ax.text(0.5, 1 + 0.05, 'A (Al₂O₃)', ha='center', fontsize=14)
+    ax.text(-0.05, -0.05, 'CN (CaO + Na₂O)', ha='right', fontsize=14)
+    ax.text(1.05, -0.05, 'K (K₂O)', ha='left', fontsize=14)
+    return fig, ax
+
+
+def _xy_matrix(ax, offset):
+    # Rows: d(pixel)/dx, d(pixel)/dy, pixel of the data origin
+    origin, ex, ey = ax.transData.transform([[0, 0], [1, 0], [0, 1]])
+    return np.vstack([ex - origin, ey - origin, origin - offset])
+
+
+# name -> (draw the diagram, projection kind, data -> pixel matrix)
+_DIAGRAMS = {
+    'qfl': (lambda: _draw_ternary(QFL, with_fields=False), 'ternary', _ternary_matrix),
+    'cia': (_draw_cia, 'xy', _xy_matrix),
+}
+# Every declared diagram under its template name ('qfl_provenance' for QFL)
+for _diagram in DIAGRAMS.values():
+    _DIAGRAMS[_diagram.template] = (lambda d=_diagram: _draw_ternary(d), 'ternary', _ternary_matrix)
+TEMPLATE_NAMES = list(_DIAGRAMS)
+
+
+def _build(name):
+    draw, kind, matrix = _DIAGRAMS[name]
+    fig, ax = draw()
+    image, offset = _rasterize(fig)
+    template = Template(image, TEMPLATE_DPI, kind, matrix(ax, offset))
+    release(fig)
+    return template
+
+
+# --- Process-wide cache ---
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_template(name):
+    template = _cache.get(name)
+    if template is None:
+        with _lock:
+            template = _cache.get(name)
+            if template is None:
+                template = _cache[name] = _build(name)
+    return template
+
+
+# --- Native (vector) diagram for SVG/PDF export ---
+def vector_figure(name):
+    # Same drawing code as the templates, kept as vector artists. The data
+    # layer goes on a transparent pixel-unit axes covering the template's
+    # crop box, so plots draw through the same projection and inset
+    # positions as on a composed template.
+    draw, kind, matrix = _DIAGRAMS[name]
+    fig, ax = draw()
+    bbox = _crop_box(fig)
+    width, height = fig.get_size_inches()
+    overlay = fig.add_axes([bbox.x0 / width, bbox.y0 / height, bbox.width / width, bbox.height / height])
+    overlay.set_xlim(0, bbox.width * fig.dpi)
+    overlay.set_ylim(0, bbox.height * fig.dpi)
+    overlay.set_axis_off()
+    overlay.patch.set_visible(False)
+    offset = np.array([bbox.x0, bbox.y0]) * fig.dpi
+    return fig, overlay, Projection(kind, matrix(ax, offset))
+
+
+# --- Label decimation for the data layer ---
+def label_mask(px, py, cell=(120, 40), limit=200, always=50):
+    # Small sets are labelled in full. Above that, only points that are alone
+    # in their label-sized pixel cell get a label (at most `limit`), so the
+    # text layer stays bounded and never piles up over dense clusters.
+    px = np.asarray(px, dtype=float)
+    py = np.asarray(py, dtype=float)
+    finite = np.isfinite(px) & np.isfinite(py)
+    if len(px) <= always:
+        return finite
+    mask = np.zeros(len(px), dtype=bool)
+    idx = np.flatnonzero(finite)
+    cells = np.floor(px[idx] / cell[0]).astype(np.int64) * 1_000_003 + np.floor(py[idx] / cell[1]).astype(np.int64)
+    _, first, counts = np.unique(cells, return_index=True, return_counts=True)
+    lonely = np.sort(first[counts == 1])
+    mask[idx[lonely[:limit]]] = True
+    return mask
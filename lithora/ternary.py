@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+UNCLASSIFIED = 'Unclassified'
+
+# Points sitting on a shared field boundary are given to the first field
+# in definition order; the tolerance absorbs rounding in the vertex tables.
+_EDGE_TOL = 1e-6
+# Fallback field colours, in definition order
+PALETTE = ['lightyellow', 'skyblue', 'cyan', 'lightgreen', 'lightblue', 'wheat', 'thistle', 'lightpink',
+           'palegreen', 'lightsalmon']
+
+
+# --- Field geometry, prepared once per diagram ---
+def triangulate(fields):
+    # Fan-triangulate each (convex) polygon in (l, r) fraction space and keep
+    # the inverse 2x2 basis of every triangle, so barycentric coordinates for
+    # a whole batch of points are just one affine transform per triangle.
+    origins, inverses, owners = [], [], []
+    for idx, vertices in enumerate(fields.values()):
+        pts = np.asarray(vertices, dtype=float) / 100.0
+        pts = pts[:, 1:]
+        for i in range(1, len(pts) - 1):
+            basis = np.column_stack([pts[i] - pts[0], pts[i + 1] - pts[0]])
+            if abs(np.linalg.det(basis)) < 1e-12:
+                continue
+            origins.append(pts[0])
+            inverses.append(np.linalg.inv(basis))
+            owners.append(idx)
+    return np.array(origins).reshape(-1, 2), np.array(inverses).reshape(-1, 2, 2), np.array(owners, dtype=int)
+
+
+# --- A ternary diagram as data ---
+class Diagram:
+    # Everything is ordered (top, left, right), the t, l, r of mpltern:
+    #
+    #   corners   axis titles
+    #   columns   input columns; `percent` names their closed (%) versions
+    #   fields    label -> convex polygon, vertices in % (t, l, r)
+    #   guides    (polyline in %, label or None), drawn dashed
+    #   labels    (t, l, r in %, text), reference points drawn as a marker and text
+    #   convert   optional table -> (t, l, r) for inputs that are not the corner
+    #             values themselves (e.g. oxide wt%), reading `required` / `optional`
+    #   template  name of the pre-rendered background (lithora.templates)
+    #
+    # Classification, computed tables, templates, vector figures and the
+    # interactive view are all derived from this one definition.
+    def __init__(self, name, title, corners, columns, fields=None, colors=None, guides=(), labels=(),
+                 percent=None, field_column='Field', decimals=2, convert=None, required=None, optional=(),
+                 template=None, source=None):
+        self.name = name
+        self.title = title
+        self.corners = tuple(corners)
+        self.columns = list(columns)
+        self.percent = list(percent or [f"%{col}" for col in columns])
+        self.fields = dict(fields or {})
+        self.colors = {label: (colors or {}).get(label, PALETTE[i % len(PALETTE)])
+                       for i, label in enumerate(self.fields)}
+        self.guides = list(guides)
+        self.labels = list(labels)
+        self.field_column = field_column
+        self.decimals = decimals
+        self.convert = convert
+        self.required = list(required or columns)
+        self.optional = list(optional)
+        self.template = template or name
+        self.source = source
+        self.field_labels = list(self.fields) + [UNCLASSIFIED]
+        self.scaled_fields = {label: [tuple(v / 100 for v in vertex) for vertex in vertices]
+                              for label, vertices in self.fields.items()}
+        self._origin, self._inverse, self._owner = triangulate(self.fields)
+
+    def __repr__(self):
+        return f"Diagram({self.name!r}, {len(self.fields)} fields)"
+
+    # --- Batched point-in-polygon classification ---
+    def classify(self, t, l, r):
+        t = np.asarray(t, dtype=float)
+        l = np.asarray(l, dtype=float)
+        r = np.asarray(r, dtype=float)
+        total = t + l + r
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = np.column_stack([l / total, r / total])
+
+        # Walk triangles in reverse so the earliest field wins on shared edges.
+        codes = np.full(len(p), len(self.fields), dtype=np.int8)
+        for origin, inv, owner in zip(self._origin[::-1], self._inverse[::-1], self._owner[::-1]):
+            lam = (p - origin) @ inv.T
+            inside = (lam[:, 0] >= -_EDGE_TOL) & (lam[:, 1] >= -_EDGE_TOL) & (lam.sum(axis=1) <= 1 + _EDGE_TOL)
+            codes[inside] = owner
+
+        return pd.Categorical.from_codes(codes, categories=self.field_labels)
+
+    # --- Per-field counts ---
+    def counts(self, labels):
+        codes = pd.Categorical(labels, categories=self.field_labels).codes
+        return np.bincount(codes[codes >= 0], minlength=len(self.field_labels))
+
+    def summary(self, labels=None, counts=None):
+        # Either the per-sample labels or already accumulated per-field counts
+        if counts is None:
+            counts = self.counts(labels)
+        total = counts.sum()
+        summary = pd.DataFrame({'Field': self.field_labels, 'Count': counts})
+        summary['%'] = (summary['Count'] / total * 100).round(2) if total else 0.0
+        return summary
+
+    # --- Corner values -> closed %, classified ---
+    def compute(self, t, l, r):
+        a, b, c = self.columns
+        df = pd.DataFrame({a: t, b: l, c: r})
+        df['Total'] = df[a] + df[b] + df[c]
+        for col, pct in zip(self.columns, self.percent):
+            df[pct] = df[col] / df['Total'] * 100
+        df = df.round(self.decimals)
+        if self.fields:
+            df[self.field_column] = self.classify(df[a], df[b], df[c])
+        return df
+
+    def from_table(self, df):
+        # An input table (the corner columns, or whatever `convert` reads)
+        if self.convert is None:
+            return self.compute(*(df[col] for col in self.columns))
+        return self.compute(*(pd.Series(values, index=df.index) for values in self.convert(df)))
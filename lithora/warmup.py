@@ -0,0 +1,73 @@
+import importlib
+import logging
+import os
+import threading
+import time
+
+# Cold-start warm-up. The first figure in a fresh process pays for importing
+# pandas / matplotlib / mpltern, loading the font cache, registering the
+# ternary projection and rasterizing the diagram templates. `start()` does
+# all of that once per process in a background thread, so it overlaps with the
+# user reading the home page instead of landing on their first request.
+# This module only imports the standard library; the app can call it from
+# the import-light home page.
+#
+#     python -m lithora.warmup      # run it in the foreground and print timings
+log = logging.getLogger('lithora.warmup')
+ENABLED = os.environ.get('LITHORA_WARMUP', '1').lower() not in ('', '0', 'false', 'no')
+
+MODULES = ['numpy', 'pandas', 'matplotlib.figure', 'mpltern', 'lithora.plots', 'lithora.export',
+           'lithora.formats', 'lithora.compositional']
+
+# stage -> seconds, filled in as the warm-up runs
+timings = {}
+done = threading.Event()
+_thread = None
+_lock = threading.Lock()
+
+
+def warm_up():
+    total = time.perf_counter()
+    try:
+        _stage('imports', lambda: [importlib.import_module(m) for m in MODULES])
+        from lithora.export import figure_to_png
+        from lithora.templates import TEMPLATE_NAMES, get_template
+        # Every registered template, so newly declared diagrams are warm too
+        for name in TEMPLATE_NAMES:
+            _stage(f"template {name}", lambda: get_template(name))
+        # One full compose + encode, so the PNG path is hot as well
+        _stage('first encode', lambda: figure_to_png(get_template('qfl').compose()[0]))
+    except Exception:
+        log.exception("warm-up failed; the first request will build what is missing")
+    finally:
+        timings['total'] = time.perf_counter() - total
+        done.set()
+        log.info("warm-up finished in %.2f s (%s)", timings['total'],
+                 ", ".join(f"{k} {v:.2f} s" for k, v in timings.items() if k != 'total'))
+    return timings
+
+
+def _stage(name, fn):
+    start = time.perf_counter()
+    fn()
+    timings[name] = time.perf_counter() - start
+
+
+def start():
+    # Once per process; later calls (every Streamlit rerun) return immediately
+    global _thread
+    if not ENABLED or _thread is not None:
+        return _thread
+    with _lock:
+        if _thread is None:
+            # Explicitly not a daemon (it would inherit that from the script
+            # thread): a process exiting mid warm-up waits for it instead of
+            # finalizing the interpreter under Matplotlib's C++ code
+            _thread = threading.Thread(target=warm_up, daemon=False, name='lithora-warmup')
+            _thread.start()
+    return _thread
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    warm_up()
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import mpltern
-import io
+
+from lithora.export import figure_to_png
+from lithora.plots import plot_basic_ternary, plot_provenance_ternary
+from lithora.qfl import compute_qfl, parse_input_list
 
 st.set_page_config(page_title="Lithora – QFL Ternary Analysis", layout="wide")
 
@@ -13,79 +14,6 @@ st.markdown("Upload or enter **Quartz, Feldspar, Lithics** data to generate tern
 # --- Sidebar for input mode ---
 mode = st.sidebar.radio("Select Input Mode", ["📝 Manual Entry", "📁 Upload CSV"])
 
-# --- Helper to clean data ---
-def parse_input_list(data_str):
-    return [float(i.strip()) for i in data_str.split(",") if i.strip() != ""]
-
-# --- Compute and return QFL DataFrame ---
-def compute_qfl(quartz, feldspar, lithics):
-    df = pd.DataFrame({'Quartz': quartz, 'Feldspar': feldspar, 'Lithics': lithics})
-    df['Total'] = df['Quartz'] + df['Feldspar'] + df['Lithics']
-    df['%Q'] = df['Quartz'] / df['Total'] * 100
-    df['%F'] = df['Feldspar'] / df['Total'] * 100
-    df['%L'] = df['Lithics'] / df['Total'] * 100
-    df = df.round(2)
-    return df
-
-# --- Ternary Plot: Basic ---
-def plot_basic_ternary(df):
-    fig = plt.figure()
-    ax = fig.add_subplot(projection='ternary')
-
-    ax.set_tlabel("Quartz")
-    ax.set_llabel("Feldspar")
-    ax.set_rlabel("Lithics")
-
-    tick_vals = [0, 20, 40, 60, 80, 100]
-    ax.taxis.set_ticklabels(tick_vals)
-    ax.laxis.set_ticklabels(tick_vals)
-    ax.raxis.set_ticklabels(tick_vals)
-
-    ax.plot(df['%Q'], df['%F'], df['%L'], 'ko', label='Data Points')
-    ax.legend(fontsize='small')
-    ax.grid(True, linestyle='--', linewidth=0.5)
-
-    return fig
-
-# --- Ternary Plot: Provenance Fields ---
-def plot_provenance_ternary(df):
-    fig = plt.figure()
-    ax = fig.add_subplot(projection='ternary')
-
-    ax.set_tlabel("Quartz")
-    ax.set_llabel("Feldspar")
-    ax.set_rlabel("Lithics")
-
-    tick_vals = [0, 20, 40, 60, 80, 100]
-    ax.taxis.set_ticklabels(tick_vals)
-    ax.laxis.set_ticklabels(tick_vals)
-    ax.raxis.set_ticklabels(tick_vals)
-
-    fields = {
-        'Basement Uplift': [(100,0,0),(0,100,0),(0,85,15),(96,0,4)],
-        'Recycled Orogen': [(25,0,75),(51,40,9),(96,0,4)],
-        'Undissected Arc': [(0,50,50),(25,0,75),(0,0,100)],
-        'Transitional Arc': [(0,50,50),(25,0,75),(33,12,55),(17,70,13),(0,85,15)],
-        'Dissected Arc': [(51,40,9),(17,70,13),(33,12,55)]
-    }
-    colors = {
-        'Basement Uplift': 'lightyellow',
-        'Recycled Orogen': 'skyblue',
-        'Undissected Arc': 'cyan',
-        'Transitional Arc': 'lightgreen',
-        'Dissected Arc': 'lightblue'
-    }
-
-    for label, vertices in fields.items():
-        scaled = [(q/100, f/100, l/100) for q, f, l in vertices]
-        ax.fill(*zip(*scaled), label=label, alpha=0.3, color=colors[label])
-
-    ax.plot(df['%Q'], df['%F'], df['%L'], 'ko', label='Data Points')
-    ax.legend(fontsize='small', loc='upper left', bbox_to_anchor=(0.8, 1))
-    ax.grid(True, linestyle='--', linewidth=0.5)
-
-    return fig
-
 # --- CSV Download helper ---
 def to_csv(df):
     return df.to_csv(index=False).encode('utf-8')
@@ -134,12 +62,10 @@ if df_result is not None:
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("Ternary Diagram")
-        fig = plot_basic_ternary(df_result)
-        st.pyplot(fig)
+        st.image(figure_to_png(plot_basic_ternary(df_result)))
 
     with col2:
         st.subheader("With Provenance Fields")
-        fig2 = plot_provenance_ternary(df_result)
-        st.pyplot(fig2)
+        st.image(figure_to_png(plot_provenance_ternary(df_result)))
 
     st.download_button("📥 Download CSV", to_csv(df_result), "QFL_data.csv", "text/csv")
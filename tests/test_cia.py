@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lithora.cia import MOLAR_MASS, compute_cia, silicate_cao
+
+
+@pytest.mark.parametrize('cao, na2o, p2o5, co2, expected', [
+    (0.30, 0.40, 0.00, 0.00, 0.30),   # no correction needed
+    (0.30, 0.40, 0.03, 0.05, 0.15),   # apatite (10/3 P2O5) and calcite (CO2) removed
+    (0.50, 0.30, 0.03, 0.05, 0.30),   # corrected CaO above Na2O: CaO* = Na2O
+    (0.05, 0.30, 0.03, 0.05, 0.00),   # over-correction clipped at zero
+])
+def test_silicate_cao(cao, na2o, p2o5, co2, expected):
+    assert silicate_cao(np.array([cao]), np.array([na2o]), p2o5, co2)[0] == pytest.approx(expected)
+
+
+def test_fresh_feldspars_and_kaolinite():
+    # Albite and K-feldspar (A = CN or K, molar) sit at CIA 50, kaolinite at 100
+    df = pd.DataFrame({'Al2O3': [19.44, 18.32, 39.50], 'CaO': [0.0, 0.0, 0.0],
+                       'Na2O': [11.82, 0.0, 0.0], 'K2O': [0.0, 16.92, 0.0]})
+    out = compute_cia(df)
+    assert out['CIA'].tolist() == pytest.approx([50, 50, 100], abs=0.05)
+    assert out['CIW'].tolist() == pytest.approx([50, 100, 100], abs=0.05)
+
+
+def test_cia_of_a_granite():
+    df = pd.DataFrame({'Al2O3': [14.0], 'CaO': [1.5], 'Na2O': [3.5], 'K2O': [4.5], 'P2O5': [0.1], 'CO2': [0.0]})
+    out = compute_cia(df).iloc[0]
+
+    al, ca, na, k, p = (v / MOLAR_MASS[o] for o, v in
+                        (('Al2O3', 14.0), ('CaO', 1.5), ('Na2O', 3.5), ('K2O', 4.5), ('P2O5', 0.1)))
+    cao_star = ca - 10 / 3 * p
+    assert out['CaO*'] == pytest.approx(cao_star, abs=1e-4)
+    assert out['CIA'] == pytest.approx(al / (al + cao_star + na + k) * 100, abs=1e-4)
+    assert out['CIA'] == pytest.approx(51.63, abs=0.01)
+    assert out['PIA'] == pytest.approx((al - k) / (al + cao_star + na - k) * 100, abs=1e-4)
+    assert out['A'] + out['CN'] + out['K'] == pytest.approx(100, abs=1e-3)
+    assert (out['x'], out['y']) == pytest.approx((0.5 * (2 * out['K'] + out['A']) / 100, out['A'] / 100), abs=1e-4)
+
+
+def test_input_columns_and_index_are_kept():
+    df = pd.DataFrame({'Label': ['s1'], 'Al2O3': [15.0], 'CaO': [2.0], 'Na2O': [3.0], 'K2O': [3.0]},
+                      index=[7])
+    out = compute_cia(df)
+    assert list(out.index) == [7]
+    assert list(out.columns[:5]) == list(df.columns)
+
+
+def test_missing_oxides_are_named():
+    with pytest.raises(ValueError, match="Na2O, K2O"):
+        compute_cia(pd.DataFrame({'Al2O3': [15.0], 'CaO': [2.0]}))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from matplotlib.path import Path
+
+from lithora.qfl import FIELD_LABELS, FIELDS, UNCLASSIFIED, classify_provenance, compute_qfl, provenance_summary
+
+
+def first_containing_field(q, f, l):
+    # Reference: Matplotlib's point-in-polygon test, first field in definition order
+    paths = [(label, Path(np.asarray(vertices, dtype=float)[:, 1:])) for label, vertices in FIELDS.items()]
+    total = q + f + l
+    points = np.column_stack([f / total, l / total]) * 100
+    labels = np.full(len(points), UNCLASSIFIED, dtype=object)
+    for label, path in reversed(paths):
+        labels[path.contains_points(points)] = label
+    return labels
+
+
+@pytest.mark.parametrize('q, f, l, field', [
+    (10, 10, 80, 'Undissected Arc'),
+    (10, 60, 30, 'Transitional Arc'),
+    (33, 33, 34, 'Dissected Arc'),
+    (40, 20, 40, 'Recycled Orogen'),
+    (50, 40, 9, 'Basement Uplift'),
+    (100, 0, 0, 'Basement Uplift'),
+    # Counts need not be closed
+    (200, 200, 1600, 'Undissected Arc'),
+])
+def test_field_interiors_and_apices(q, f, l, field):
+    assert list(classify_provenance([q], [f], [l])) == [field]
+
+
+@pytest.mark.parametrize('q, f, l, field', [
+    # The digitized polygons overlap on ~0.23 % of the triangle; such points,
+    # like points on shared edges, go to the field defined first
+    (82.87, 11.65, 5.49, 'Basement Uplift'),     # also in Recycled Orogen
+    (46.58, 33.13, 20.29, 'Recycled Orogen'),    # also in Dissected Arc
+    (31.21, 9.45, 59.34, 'Recycled Orogen'),     # also in Transitional Arc
+    (0, 50, 50, 'Undissected Arc'),              # vertex shared with Transitional Arc
+])
+def test_overlaps_and_boundaries_go_to_the_first_field(q, f, l, field):
+    assert list(classify_provenance([q], [f], [l])) == [field]
+
+
+def test_zero_total_is_unclassified():
+    assert list(classify_provenance([0, 30], [0, 50], [0, 20])) == [UNCLASSIFIED, 'Dissected Arc']
+
+
+def test_matches_point_in_polygon_reference():
+    q, f, l = np.random.default_rng(1).dirichlet([1, 1, 1], 20_000).T * 100
+    labels = classify_provenance(q, f, l)
+    assert list(labels.categories) == FIELD_LABELS
+    assert (np.asarray(labels, dtype=object) == first_containing_field(q, f, l)).all()
+
+
+def test_compute_qfl_closes_and_summarises():
+    df = compute_qfl([30, 6, 0], [50, 2, 0], [20, 2, 0])
+    assert df[['%Q', '%F', '%L']].iloc[1].tolist() == [60, 20, 20]
+    assert df['Total'].tolist() == [100, 10, 0]
+    assert df['Provenance'].tolist() == ['Dissected Arc', 'Recycled Orogen', UNCLASSIFIED]
+
+    summary = provenance_summary(df['Provenance'])
+    assert summary['Field'].tolist() == FIELD_LABELS
+    assert summary['Count'].sum() == 3
+    assert summary.set_index('Field').loc['Recycled Orogen', '%'] == pytest.approx(33.33)
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from lithora.cli import main
+
+
+def write_counts(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({'Quartz': [60, 30, 10][:rows], 'Feldspar': [20, 50, 10][:rows],
+                  'Lithics': [20, 20, 80][:rows]}).to_csv(path, index=False)
+
+
+def test_same_named_inputs_are_refused(tmp_path, capsys):
+    write_counts(tmp_path / 'in' / 'a' / 'well.csv', 3)
+    write_counts(tmp_path / 'in' / 'b' / 'well.csv', 2)
+    out = tmp_path / 'out'
+
+    assert main(['qfl', str(tmp_path / 'in' / '**' / '*.csv'), '-o', str(out), '-j', '1']) == 2
+    err = capsys.readouterr().err
+    assert "'well'" in err and 'a/well.csv' in err and 'b/well.csv' in err
+    assert not out.exists()
+
+
+def test_distinct_inputs_each_get_their_outputs(tmp_path):
+    write_counts(tmp_path / 'a' / 'north.csv', 3)
+    write_counts(tmp_path / 'b' / 'south.csv', 2)
+    out = tmp_path / 'out'
+
+    assert main(['qfl', str(tmp_path / 'a' / 'north.csv'), str(tmp_path / 'b' / 'south.csv'),
+                 '-o', str(out), '-j', '1']) == 0
+    assert len(pd.read_csv(out / 'north_qfl.csv')) == 3
+    assert len(pd.read_csv(out / 'south_qfl.csv')) == 2
+    assert (out / 'north_provenance.png').exists()
+
+
+def test_gauge_records_are_collected_from_csv_only(tmp_path):
+    gauges = tmp_path / 'gauges'
+    gauges.mkdir()
+    record = pd.DataFrame({'Timestamp': ['2020-01-01 00:00', '2020-01-01 00:01'], 'Rain (mm)': [0.2, 0.4]})
+    record.to_csv(gauges / 'st1.csv', index=False)
+    record.to_parquet(gauges / 'st2.parquet')
+    out = tmp_path / 'out'
+
+    assert main(['rainfall', str(gauges), str(gauges / '*.parquet'), '-o', str(out), '-j', '1']) == 0
+    assert (out / 'st1_hourly.csv').exists()
+    assert not list(out.glob('st2_*'))
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from matplotlib.path import Path
+
+from lithora.compositional import (GroupSummary, alr, alr_inverse, center, closure, clr, clr_inverse, f2_quantile,
+                                   ilr, ilr_basis, ilr_inverse)
+
+
+def compositions(n=200, d=3, seed=0):
+    return np.random.default_rng(seed).dirichlet(np.arange(2, d + 2), n) * 100
+
+
+@pytest.mark.parametrize('d', [3, 5])
+def test_log_ratio_round_trips(d):
+    x = compositions(d=d)
+    assert np.allclose(ilr_inverse(ilr(x)), closure(x))
+    assert np.allclose(clr_inverse(clr(x)), closure(x))
+    assert np.allclose(alr_inverse(alr(x)), closure(x))
+    assert np.allclose(clr(x).sum(axis=1), 0)
+
+
+def test_ilr_basis_is_orthonormal_in_the_clr_plane():
+    basis = ilr_basis(4)
+    assert np.allclose(basis @ basis.T, np.eye(3))
+    assert np.allclose(basis.sum(axis=1), 0)
+
+
+def test_center_is_the_closed_geometric_mean():
+    assert np.allclose(center([[1, 1, 2], [4, 4, 2]]), [1 / 3, 1 / 3, 1 / 3])
+    # Geometric means 2, 2 and sqrt(28), closed
+    expected = np.array([2, 2, np.sqrt(28)]) / (4 + np.sqrt(28))
+    assert np.allclose(center([[1, 2, 7], [4, 2, 4]]), expected)
+    # Scale of each row does not matter
+    assert np.allclose(center([[10, 20, 70], [0.4, 0.2, 0.4]]), expected)
+
+
+def test_f2_quantile_matches_scipy():
+    stats = pytest.importorskip('scipy.stats')
+    for level in (0.5, 0.9, 0.95, 0.99):
+        for dof in (1, 3, 10, 250):
+            assert f2_quantile(level, dof) == pytest.approx(stats.f.ppf(level, 2, dof))
+
+
+def test_group_summary_matches_per_group_statistics():
+    x = compositions(300)
+    groups = np.repeat(['A', 'B', 'C'], [150, 148, 2])
+    summary = GroupSummary(x, groups, ['Q', 'F', 'L'])
+
+    assert summary.n.tolist() == [150, 148, 2] and summary.n.sum() == len(x)
+    for g, label in enumerate(summary.labels):
+        rows = x[groups == label]
+        assert np.allclose(summary.mean[g], closure(rows).mean(axis=0))
+        assert np.allclose(summary.centroid[g], center(rows))
+        if len(rows) > 2:
+            assert np.allclose(summary.cov[g], np.cov(alr(rows), rowvar=False))
+    regions = summary.confidence_regions()
+    assert np.isfinite(regions[:2]).all() and np.isnan(regions[2]).all()
+    table = summary.table()
+    assert list(table.index) == ['A', 'B', 'C'] and table['n'].tolist() == [150, 148, 2]
+
+
+def test_group_counts_sum_to_the_usable_rows():
+    rng = np.random.default_rng(3)
+    x = compositions(1000, seed=3)
+    groups = rng.choice(['A', 'B', 'C', 'D', None], len(x)).astype(object)
+    x[::97, 1] = np.nan
+    x[::89, 2] = -1
+    summary = GroupSummary(x, groups)
+
+    usable = np.isfinite(x).all(axis=1) & (x >= 0).all(axis=1) & (groups != None)  # noqa: E711
+    assert summary.n.sum() == summary.table()['n'].sum() == usable.sum()
+    assert (summary.codes >= 0).sum() == usable.sum()
+    for g, label in enumerate(summary.labels):
+        assert summary.n[g] == (usable & (groups == label)).sum()
+
+    assert GroupSummary(x).n.tolist() == [(np.isfinite(x).all(axis=1) & (x >= 0).all(axis=1)).sum()]
+
+
+@pytest.mark.parametrize('kind, level', [('confidence', 0.95), ('confidence', 0.8), ('prediction', 0.9)])
+def test_region_coverage(kind, level):
+    # 2,000 groups of 10 samples from one logistic-normal population: the
+    # drawn confidence regions should hold its centre, and the prediction
+    # regions one new sample, at the requested rate
+    rng = np.random.default_rng(1)
+    groups, size = 2000, 10
+    mu, cov = np.array([0.4, -0.2]), np.array([[0.3, 0.1], [0.1, 0.2]])
+    y = rng.multivariate_normal(mu, cov, groups * size)
+    summary = GroupSummary(alr_inverse(y), np.repeat(np.arange(groups), size))
+    targets = np.tile(mu, (groups, 1)) if kind == 'confidence' else rng.multivariate_normal(mu, cov, groups)
+
+    rings = alr(summary.regions(kind, level, points=360).reshape(-1, 3)).reshape(groups, 360, 2)
+    covered = np.mean([Path(ring).contains_point(target) for ring, target in zip(rings, targets)])
+    assert covered == pytest.approx(level, abs=0.02)
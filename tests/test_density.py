@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from lithora.density import bin_counts, cells
+
+
+def grid_points(bins):
+    # Every node of the bin grid plus the midpoints of all cell edges:
+    # the points binning could drop or count twice
+    steps = np.arange(2 * bins + 1) / (2 * bins)
+    t, l = np.meshgrid(steps, steps)
+    t, l = t.ravel(), l.ravel()
+    keep = t + l <= 1 + 1e-12
+    t, l = t[keep], l[keep]
+    return t, l, np.clip(1 - t - l, 0, None)
+
+
+def contains(vertices, point, tol=1e-9):
+    # Barycentric test on the (t, l) plane
+    (t0, l0, _), (t1, l1, _), (t2, l2, _) = vertices
+    m = np.array([[t1 - t0, t2 - t0], [l1 - l0, l2 - l0]])
+    a, b = np.linalg.solve(m, [point[0] - t0, point[1] - l0])
+    return a >= -tol and b >= -tol and a + b <= 1 + tol
+
+
+@pytest.mark.parametrize('bins', [1, 4, 40])
+def test_every_point_is_binned_once(bins):
+    rng = np.random.default_rng(bins)
+    t, l, r = (np.concatenate(parts) for parts in zip(grid_points(bins), rng.dirichlet([1, 1, 1], 2000).T))
+    counts = bin_counts(t * 100, l * 100, r * 100, bins)
+    assert counts.shape == (2 * bins * bins,) and counts.sum() == len(t)
+
+    for point in zip(t, l, r):
+        vertices, hits = cells(bin_counts(*([v] for v in point), bins), bins)
+        assert hits.tolist() == [1] and contains(vertices[0], point)
+
+
+def test_partial_counts_add_up():
+    t, l, r = np.random.default_rng(0).dirichlet([2, 3, 4], 5000).T
+    whole = bin_counts(t, l, r)
+    parts = sum(bin_counts(t[i:i + 700], l[i:i + 700], r[i:i + 700]) for i in range(0, len(t), 700))
+    assert (whole == parts).all()
+
+
+def test_unusable_rows_are_skipped():
+    counts = bin_counts([0, np.nan, 30, 1], [0, 1, 40, 1], [0, 1, 30, np.inf])
+    assert counts.sum() == 1
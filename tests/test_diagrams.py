@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.path import Path
+
+from lithora.cia import acnkfm_components
+from lithora.diagrams import DIAGRAMS, compute_diagram, get_diagram
+from lithora.ternary import UNCLASSIFIED
+
+
+@pytest.mark.parametrize('name, point, field', [
+    ('qmflt', (86, 8, 6), 'Craton Interior'),
+    ('qmflt', (66, 27, 7), 'Transitional Continental'),
+    ('qmflt', (27, 61, 12), 'Basement Uplift'),
+    ('qmflt', (66, 6, 28), 'Quartzose Recycled'),
+    ('qmflt', (38, 6, 56), 'Transitional Recycled'),
+    ('qmflt', (12, 6, 82), 'Lithic Recycled'),
+    ('qmflt', (44, 28, 28), 'Mixed'),
+    ('qmflt', (12, 57, 31), 'Dissected Arc'),
+    ('qmflt', (12, 38, 50), 'Transitional Arc'),
+    ('qmflt', (12, 21, 67), 'Undissected Arc'),
+    ('folk', (97, 2, 1), 'Quartzarenite'),
+    ('folk', (85, 11, 4), 'Subarkose'),
+    ('folk', (85, 4, 11), 'Sublitharenite'),
+    ('folk', (38, 55, 7), 'Arkose'),              # F:R above 3:1
+    ('folk', (38, 39, 23), 'Lithic Arkose'),      # F:R between 1:1 and 3:1
+    ('folk', (38, 23, 39), 'Feldspathic Litharenite'),
+    ('folk', (38, 8, 54), 'Litharenite'),
+    ('folk', (95, 2.5, 2.5), 'Quartzarenite'),   # on the Q 95 % line: first field
+])
+def test_known_points(name, point, field):
+    assert list(get_diagram(name).classify(*([v] for v in point))) == [field]
+
+
+@pytest.mark.parametrize('name', ['qmflt', 'folk'])
+def test_fields_tile_the_triangle(name):
+    diagram = get_diagram(name)
+    t, l, r = np.random.default_rng(2).dirichlet([1, 1, 1], 20_000).T * 100
+    labels = np.asarray(diagram.classify(t, l, r), dtype=object)
+    assert UNCLASSIFIED not in labels
+
+    reference = np.full(len(t), UNCLASSIFIED, dtype=object)
+    for label, vertices in reversed(diagram.fields.items()):
+        reference[Path(np.asarray(vertices, dtype=float)[:, 1:]).contains_points(np.column_stack([l, r]))] = label
+    assert (labels == reference).all()
+
+
+def test_declared_diagrams():
+    assert list(DIAGRAMS) == ['qfl', 'qmflt', 'folk', 'acnkfm']
+    with pytest.raises(ValueError, match="Unknown diagram 'nope'"):
+        get_diagram('nope')
+
+
+def oxides(**wt):
+    return pd.DataFrame({oxide: [value] for oxide, value in wt.items()})
+
+
+def test_acnkfm_molar_components():
+    # One mole of each oxide: A 1, CNK = CaO* 1 + Na2O 1 + K2O 1, FM = 2 FeO (from Fe2O3) + FeO + MgO
+    df = oxides(Al2O3=101.96, CaO=56.08, Na2O=61.98, K2O=94.20, FeO=71.84, Fe2O3=159.69, MgO=40.30)
+    a, cnk, fm = acnkfm_components(df)
+    assert (a[0], cnk[0], fm[0]) == pytest.approx((1, 3, 4))
+
+    out = compute_diagram('acnkfm', df)
+    assert out[['%A', '%CNK', '%FM']].iloc[0].tolist() == pytest.approx([12.5, 37.5, 50])
+
+
+def test_acnkfm_missing_oxides():
+    # CaO* is corrected for apatite; absent FM oxides count as zero
+    a, cnk, fm = acnkfm_components(oxides(Al2O3=101.96, CaO=112.16, Na2O=123.96, K2O=0, P2O5=14.194, MgO=40.30))
+    assert (a[0], cnk[0], fm[0]) == pytest.approx((1, 2 - 1 / 3 + 2, 1))
+    with pytest.raises(ValueError, match="at least one of"):
+        acnkfm_components(oxides(Al2O3=15, CaO=2, Na2O=3, K2O=3))
+    with pytest.raises(ValueError, match="K2O"):
+        acnkfm_components(oxides(Al2O3=15, CaO=2, Na2O=3, FeO=5))
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from lithora.cia import ternary_to_xy
+from lithora.export import figure_to_png
+from lithora.templates import get_template
+
+RENDERS = 1000
+WARMUP = 50
+# Allocator noise only; a leaked figure holds several MB of Agg buffers, so a
+# leak over ~1000 renders overshoots this by orders of magnitude.
+MAX_GROWTH_MB = 25
+
+
+def rss_mb():
+    # None where the process RSS cannot be read
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return None
+
+
+def render(i, rng):
+    q, f, l = rng.dirichlet([4, 3, 2], 200).T * 100
+    if i % 2:
+        template = get_template('qfl_provenance')
+        fig, ax = template.compose()
+        ax.plot(*template.project(q, f, l), 'ko')
+    else:
+        template = get_template('cia')
+        fig, ax = template.compose()
+        ax.scatter(*template.project(*ternary_to_xy(q, f, l)), s=25)
+    return figure_to_png(fig, dpi=50)
+
+
+def rss_growth_mb():
+    rng = np.random.default_rng(0)
+    for i in range(WARMUP):
+        assert render(i, rng)[:4] == b'\x89PNG'
+    baseline = rss_mb()
+    if baseline is None:
+        return None
+
+    for i in range(RENDERS - WARMUP):
+        render(i, rng)
+
+    return rss_mb() - baseline
+
+
+def test_rss_flat_over_1000_renders():
+    # Measured in a fresh interpreter: how earlier tests left the allocator's
+    # heap (e.g. a raised mmap threshold) shows up in this process's RSS too.
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        growth = pool.submit(rss_growth_mb).result()
+    if growth is None:
+        pytest.skip("no way to read process RSS on this platform")
+    assert growth < MAX_GROWTH_MB
@@ -0,0 +1,70 @@
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from lithora.formats import OUTPUT_FORMATS, TableWriter, iter_table, read_table
+
+FRAME = pd.DataFrame({'Quartz': [float(i) for i in range(10)], 'Feldspar': range(10, 20),
+                      'Lithics': [i / 4 for i in range(10)], 'Note': list('abcdefghij')})
+
+
+def write_stream(df, target, rows=4):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(target, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=rows):
+            writer.write_batch(batch)
+
+
+def write_chunks(df, target, fmt, rows=4):
+    # Several writes per table, as the streamed exports do
+    if fmt == 'stream':
+        write_stream(df, target, rows)
+        return
+    with TableWriter(target, fmt) as writer:
+        for start in range(0, len(df), rows):
+            writer.write(df.iloc[start:start + rows])
+
+
+FORMATS = [(fmt, f'table{suffix}') for fmt, (suffix, _) in OUTPUT_FORMATS.items()] + [('stream', 'table.arrow')]
+
+
+@pytest.mark.parametrize('fmt, name', FORMATS)
+def test_round_trip_with_projection(tmp_path, fmt, name):
+    path = tmp_path / name
+    write_chunks(FRAME, path, fmt)
+
+    expected = FRAME[['Lithics', 'Quartz', 'Feldspar']]
+    df = read_table(path, required=['Lithics', 'Quartz'], optional=['Feldspar', 'Absent'])
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+    buf = io.BytesIO(path.read_bytes())
+    chunks = list(iter_table(buf, 3, name, required=['Lithics', 'Quartz'], optional=['Feldspar']))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_dtype=False)
+
+    with pytest.raises(ValueError, match="missing columns: Mica"):
+        read_table(path, required=['Quartz', 'Mica'])
+
+
+@pytest.mark.parametrize('fmt, name', FORMATS)
+def test_round_trip_of_every_column(tmp_path, fmt, name):
+    path = tmp_path / name
+    write_chunks(FRAME, path, fmt)
+    pd.testing.assert_frame_equal(read_table(path), FRAME, check_dtype=False)
+
+
+def test_arrow_ipc_stream_is_read_in_chunks():
+    buf = io.BytesIO()
+    write_stream(FRAME, buf)
+    buf.seek(0)
+
+    chunks = list(iter_table(buf, 3, 'upload.arrow', required=['Quartz', 'Lithics']))
+    assert [len(chunk) for chunk in chunks] == [3, 1, 3, 1, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), FRAME[['Quartz', 'Lithics']])
+
+
+def test_unknown_output_format():
+    with pytest.raises(ValueError, match="Unknown output format"):
+        TableWriter(io.BytesIO(), 'xlsx')
@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lithora.idf import fit_annual_max, idf_table, l_moments, quantiles
+
+
+def gev_sample(loc, scale, shape, n=20_000, seed=0):
+    # Inverse CDF in Hosking's parametrisation (shape > 0: bounded above)
+    u = np.random.default_rng(seed).random(n)
+    y = -np.log(u)
+    x = loc - scale * np.log(y) if shape == 0 else loc + scale / shape * (1 - y ** shape)
+    return pd.DataFrame({'1h': x, '24h': 3 * x})
+
+
+def test_l_moments_of_a_small_sample():
+    l1, l2, l3 = l_moments([[4.0], [1.0], [3.0], [2.0]])
+    assert (l1[0], l2[0], l3[0]) == pytest.approx((2.5, 5 / 6, 0))
+
+
+def test_gumbel_fit_recovers_parameters():
+    params = fit_annual_max(gev_sample(20, 5, 0), 'gumbel')
+    assert list(params.index) == ['1h', '24h']
+    assert params.loc['1h'].tolist() == pytest.approx([20, 5, 0], abs=0.15)
+    assert params.loc['24h'].tolist() == pytest.approx([60, 15, 0], abs=0.45)
+
+
+@pytest.mark.parametrize('shape', [-0.15, 0.1, 0.25])
+def test_gev_fit_recovers_parameters(shape):
+    params = fit_annual_max(gev_sample(20, 5, shape), 'gev')
+    assert params.loc['1h'].tolist() == pytest.approx([20, 5, shape], abs=0.15)
+    assert params.loc['1h', 'Shape'] == pytest.approx(shape, abs=0.03)
+
+
+def test_quantiles_and_intensities():
+    params = pd.DataFrame({'Location': [20.0, 60.0], 'Scale': [5.0, 15.0], 'Shape': [0.0, 0.1]},
+                          index=pd.Index(['30min', '24h'], name='Duration'))
+    depth = quantiles(params, [2, 100])
+    y = -math.log(1 - 1 / 100)
+    assert depth.loc['30min', '2y'] == pytest.approx(20 - 5 * math.log(math.log(2)))
+    assert depth.loc['24h', '100y'] == pytest.approx(60 + 15 / 0.1 * (1 - y ** 0.1))
+
+    table = idf_table(params, [2, 100])
+    assert table['Minutes'].tolist() == [30, 1440]
+    assert table.loc['30min', '2y'] == pytest.approx(depth.loc['30min', '2y'] * 2, abs=1e-3)
+    assert table.loc['24h', '100y'] == pytest.approx(depth.loc['24h', '100y'] / 24, abs=1e-3)
+
+
+def test_short_records_and_unknown_distributions_are_refused():
+    with pytest.raises(ValueError, match="3 years"):
+        fit_annual_max(pd.DataFrame({'1h': [10.0, 12.0]}))
+    with pytest.raises(ValueError, match="Unknown distribution"):
+        fit_annual_max(gev_sample(20, 5, 0), 'weibull')
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lithora.formats import write_table
+from lithora.ingest import QFL_COLUMNS, QFLAccumulator, compute_qfl_chunk, stream_qfl
+from lithora.qfl import compute_qfl, provenance_counts
+
+ROWS = 5_000
+# chunk_rows never goes below 1000 rows, so this budget gives five chunks
+TINY_BUDGET_MB = 0.001
+
+
+@pytest.fixture(scope='module')
+def counts():
+    rng = np.random.default_rng(8)
+    df = pd.DataFrame(rng.integers(0, 200, (ROWS, 3)), columns=QFL_COLUMNS)
+    df.iloc[::250] = 0  # empty rows: no percentages, Unclassified
+    return df
+
+
+@pytest.mark.parametrize('name', ['counts.csv', 'counts.parquet', 'counts.feather'])
+def test_streamed_summaries_match_compute_qfl(tmp_path, counts, name):
+    path = tmp_path / name
+    write_table(counts, path, name.split('.')[1])
+    acc = stream_qfl(path, budget_mb=TINY_BUDGET_MB)
+    expected = compute_qfl(*(counts[col] for col in QFL_COLUMNS))
+
+    assert acc.rows == ROWS
+    assert acc.field_counts.tolist() == provenance_counts(expected['Provenance']).tolist()
+    assert acc.field_counts.sum() == ROWS
+    pct = expected[['%Q', '%F', '%L']]
+    assert acc.sums == pytest.approx(pct.sum().to_numpy(), rel=1e-6)
+    assert acc.mean_composition == pytest.approx((pct.sum() / ROWS).to_numpy(), rel=1e-6)
+    assert acc.density.sum() == pct.notna().all(axis=1).sum()
+
+
+def test_sample_is_bounded_and_deterministic(counts):
+    table = compute_qfl_chunk(counts)
+
+    def sample(chunk, seed=0, size=300):
+        acc = QFLAccumulator(sample_size=size, seed=seed)
+        for start in range(0, ROWS, chunk):
+            acc.update(table.iloc[start:start + chunk])
+        return acc.sample
+
+    first = sample(1000)
+    assert len(first) == 300
+    pd.testing.assert_frame_equal(first, sample(1000))
+    # Keys are drawn row by row, so the chunking does not change which rows are kept
+    key = lambda df: sorted(map(tuple, df[QFL_COLUMNS].to_numpy()))  # noqa: E731
+    assert key(first) == key(sample(700)) == key(sample(ROWS))
+    assert key(first) != key(sample(1000, seed=1))
+    # Sampled rows are rows of the table
+    assert set(key(first)) <= set(map(tuple, table[QFL_COLUMNS].to_numpy()))
+
+    # Fewer rows than the sample size: all of them are kept
+    assert len(sample(1000, size=ROWS * 2)) == ROWS
+    assert len(QFLAccumulator().sample) == 0
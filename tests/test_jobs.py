@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from lithora.jobs import CANCELLED, DONE, RUNNING, Busy, Cancelled, JobQueue, checkpoint
+
+
+def blocking(started, gate, result=None):
+    started.set()
+    while not gate.wait(0.01):
+        checkpoint()
+    return result
+
+
+def test_identical_submissions_share_one_job():
+    queue = JobQueue(max_workers=1)
+    started, gate = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        return blocking(started, gate, 42)
+
+    first = queue.submit('key', work)
+    second = queue.submit('key', work)
+    assert second is first and first.holders == 2
+
+    gate.set()
+    assert first.wait(5) and first.result() == 42 and calls == [1]
+    # A finished job is reused until its last holder releases it
+    assert queue.submit('key', work) is first
+
+
+def test_cancellation_stops_a_running_job():
+    queue = JobQueue(max_workers=1)
+    started, gate = threading.Event(), threading.Event()
+    job = queue.submit('key', blocking, started, gate)
+    assert started.wait(5) and job.state == RUNNING
+
+    queue.release(job)
+    assert job.wait(5) and job.state == CANCELLED
+    with pytest.raises(Cancelled):
+        job.result()
+    # The next submission starts afresh instead of reusing the cancelled job
+    gate.set()
+    again = queue.submit('key', lambda: 'fresh')
+    assert again is not job and again.wait(5) and again.result() == 'fresh'
+
+
+def test_one_of_two_holders_releasing_keeps_the_job():
+    queue = JobQueue(max_workers=1)
+    started, gate = threading.Event(), threading.Event()
+    job = queue.submit('key', blocking, started, gate, 'kept')
+    queue.submit('key', blocking, started, gate)
+    queue.release(job)
+    gate.set()
+    assert job.wait(5) and job.state == DONE and job.result() == 'kept'
+
+
+def test_busy_limit():
+    queue = JobQueue(max_workers=1, max_pending=2)
+    started, gate = threading.Event(), threading.Event()
+    jobs = [queue.submit(f'key{i}', blocking, started, gate) for i in range(2)]
+    with pytest.raises(Busy):
+        queue.submit('key2', blocking, started, gate)
+    # Joining a live job is not new work and stays admitted
+    assert queue.submit('key0', blocking, started, gate) is jobs[0]
+
+    gate.set()
+    assert all(job.wait(5) for job in jobs)
+    assert queue.submit('key2', lambda: 'admitted').wait(5)
+
+
+def test_checkpoint_outside_a_job_is_a_no_op():
+    checkpoint(0.5, "ignored")
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from lithora.parsing import describe_problems, parse_columns, parse_values
+
+
+@pytest.mark.parametrize('text', ["30, 40, 35", "30,40,35", "30;40;35", "30\t40\t35", "30\n40\r\n35\n",
+                                  "30 40 35", "30,, 40,35,"])
+def test_separators(text):
+    values, errors = parse_values(text)
+    assert values.tolist() == [30, 40, 35]
+    assert errors == []
+
+
+def test_bad_tokens_are_reported_with_positions():
+    values, errors = parse_values("30, abc, 35, inf, 1e400, 40")
+    assert np.isnan(values[[1, 3, 4]]).all()
+    assert values[[0, 2, 5]].tolist() == [30, 35, 40]
+    assert errors == [(2, 'abc'), (4, 'inf'), (5, '1e400')]
+
+
+@pytest.mark.parametrize('text, decimal', [("12,5\n13,1", 'auto'), ("12,5;13,1", 'auto'), ("12,5 13,1", ',')])
+def test_decimal_comma(text, decimal):
+    values, errors = parse_values(text, decimal)
+    assert values.tolist() == [12.5, 13.1]
+    assert errors == []
+
+
+def test_decimal_comma_keeps_bad_tokens_as_entered():
+    assert parse_values("12,5\nx,1", ',')[1] == [(2, 'x,1')]
+
+
+def test_lone_comma_is_a_list():
+    assert parse_values("30,40")[0].tolist() == [30, 40]
+    assert parse_values("30,40", ',')[0].tolist() == [30.4]
+    values, rows, problems = parse_columns(["30,40", "50,40", "20,20"], ["Q", "F", "L"])
+    assert values.tolist() == [[30, 50, 20], [40, 40, 20]]
+    assert problems == []
+
+
+def test_entries_with_several_commas_are_lists():
+    assert parse_values("12,13,14\n15")[0].tolist() == [12, 13, 14, 15]
+
+
+def test_one_separator_for_all_columns():
+    # Only Quartz shows the decimal comma; the others are read the same way
+    values, _, problems = parse_columns(["12,5\n13,1", "60,7 70,2", "27,3\n16,9"],
+                                        ["Quartz", "Feldspar", "Lithics"])
+    assert values.tolist() == [[12.5, 60.7, 27.3], [13.1, 70.2, 16.9]]
+    assert problems == []
+    # A list comma in any column rules the decimal comma out for all of them
+    with pytest.raises(ValueError, match="Quartz: 4, Feldspar: 2"):
+        parse_columns(["12,5\n13,1", "60, 70", "27\n16"], ["Quartz", "Feldspar", "Lithics"])
+def test_columns_drop_rows_with_a_bad_entry():
+    values, rows, problems = parse_columns(["30, 40, 35", "50, x, 45", "20, 20, 20"], ["Q", "F", "L"])
+    assert values.tolist() == [[30, 50, 20], [35, 45, 20]]
+    assert rows.tolist() == [1, 3]
+    assert problems == ["F #2: 'x'"]
+    assert describe_problems(problems) == "Skipped 1 invalid value(s): F #2: 'x'"
+
+
+def test_columns_of_unequal_length():
+    with pytest.raises(ValueError, match="Q: 2, F: 1"):
+        parse_columns(["30, 40", "50", "20, 20"], ["Q", "F", "L"])
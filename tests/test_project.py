@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from lithora.project import QFLProject
+from lithora.qfl import compute_qfl
+
+
+def test_appends_match_one_computation():
+    project = QFLProject()
+    project.append([30, 60], [50, 20], [20, 20])
+    new = project.append([10], [10], [80])
+
+    assert list(new.index) == [2]
+    assert project.rows == 3 and project.version == 2
+    expected = compute_qfl([30, 60, 10], [50, 20, 10], [20, 20, 80])
+    assert project.table.reset_index(drop=True).equals(expected)
+    assert project.stats.field_counts.sum() == 3
+
+
+def test_same_source_is_appended_once():
+    project = QFLProject()
+    assert project.append([30], [50], [20], source='upload-1') is not None
+    assert 'upload-1' in project
+    assert project.append([30], [50], [20], source='upload-1') is None
+    assert project.rows == 1 and project.version == 1
+
+
+def test_failed_append_can_be_retried():
+    project = QFLProject()
+    with pytest.raises(ValueError):
+        project.append([30, 40], [50], [20], source='upload-1')
+
+    assert 'upload-1' not in project
+    assert project.rows == 0 and project.version == 0
+    new = project.append([30, 40], [50, 40], [20, 20], source='upload-1')
+    assert new is not None and len(new) == 2
+    assert np.allclose(project.table['%Q'], [30, 40])
@@ -0,0 +1,82 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lithora.rainfall import DURATIONS, RainfallAccumulator, find_columns, stream_rainfall, to_minutes
+
+
+def gauge_record(n=20_000, seed=1):
+    # Irregular, partly duplicated timestamps over two calendar years
+    rng = np.random.default_rng(seed)
+    stamps = pd.Timestamp('2019-12-20') + pd.to_timedelta(np.sort(rng.integers(0, 2 * 525_600, n)), unit='min')
+    depth = np.where(rng.random(n) < 0.2, rng.gamma(0.5, 0.4, n), 0).round(1)
+    return pd.Series(depth, index=stamps)
+
+
+def as_csv(record):
+    frame = pd.DataFrame({'Time': record.index.strftime('%Y-%m-%d %H:%M'), 'Rain (mm)': record.to_numpy()})
+    return io.BytesIO(frame.to_csv(index=False).encode())
+
+
+def in_memory(record):
+    return RainfallAccumulator().update(to_minutes(pd.Series(record.index)), record.to_numpy()).finish()
+
+
+def test_streamed_maxima_match_in_memory_and_pandas():
+    record = gauge_record()
+    # The smallest budget gives 1,000-row chunks, so windows span many chunk edges
+    streamed = stream_rainfall(as_csv(record), budget_mb=0)
+    whole = in_memory(record)
+    minutes = record.groupby(level=0).sum().resample('min').sum()
+
+    assert streamed.rows == whole.rows == len(record)
+    # Streamed depths are parsed as float32
+    assert np.allclose(streamed.max_depth, whole.max_depth, atol=1e-4)
+    pd.testing.assert_frame_equal(streamed.annual_max, whole.annual_max)
+    for k, (name, width) in enumerate(DURATIONS.items()):
+        windows = minutes.rolling(width, min_periods=1).sum()
+        assert streamed.max_depth[k] == pytest.approx(windows.max(), abs=1e-4), name
+        yearly = windows.groupby(windows.index.year).max()
+        assert np.allclose(streamed.annual_max[name], yearly, atol=1e-3), name
+
+
+def test_totals_match_pandas():
+    record = gauge_record(5_000, seed=2)
+    acc = stream_rainfall(as_csv(record), budget_mb=0)
+    hourly = record.resample('h').sum()
+    assert np.allclose(acc.hourly.reindex(hourly.index, fill_value=0), hourly)
+    assert np.allclose(acc.daily.reindex(record.resample('D').sum().index, fill_value=0),
+                       record.resample('D').sum())
+    assert acc.monthly.sum() == pytest.approx(record.sum())
+
+
+def test_storm_across_new_year_counts_in_both_years():
+    record = pd.Series([2.0, 3.0, 4.0], index=pd.to_datetime(['2020-12-31 23:58', '2020-12-31 23:59',
+                                                              '2021-01-01 00:00']))
+    acc = in_memory(record)
+    intensities = acc.intensities.set_index('Duration')
+    assert intensities.loc['5min', 'Max depth (mm)'] == 9
+    assert intensities.loc['5min', 'Max intensity (mm/h)'] == 108
+    assert intensities.loc['5min', 'Window end'] == pd.Timestamp('2021-01-01 00:00')
+    # A window ending in 2021 reaches back into 2020
+    assert acc.annual_max.loc[2020, '5min'] == 5 and acc.annual_max.loc[2021, '5min'] == 9
+
+
+def test_records_out_of_order_are_refused():
+    acc = RainfallAccumulator()
+    acc.update(np.array([100, 101]), np.array([1.0, 1.0]))
+    with pytest.raises(ValueError, match="ascending"):
+        acc.update(np.array([50]), np.array([1.0]))
+
+
+@pytest.mark.parametrize('header', ['Rain (mm)', 'rainfall_mm', 'Precipitation', 'depth mm'])
+def test_rain_column_is_found_by_whole_words(header):
+    columns = ['Station', 'Comment', 'Drainage', 'Timestamp', header]
+    assert find_columns(columns) == ('Timestamp', header)
+
+
+def test_decoy_columns_are_not_rain():
+    with pytest.raises(ValueError, match="rainfall"):
+        find_columns(['Timestamp', 'Comment', 'Drainage', 'Terrain'])
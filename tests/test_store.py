@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from lithora import store
+from lithora.qfl import compute_qfl
+from lithora.store import ArtifactStore, stored
+
+
+def test_round_trip_by_type(tmp_path):
+    s = ArtifactStore(tmp_path)
+    table = compute_qfl([30, 6], [50, 2], [20, 2])
+    array = np.arange(12, dtype=np.int64).reshape(3, 4)
+
+    assert s.put('table', table) and s.put('array', array) and s.put('png', b'\x89PNG data')
+    pd.testing.assert_frame_equal(s.get('table'), table)
+    assert s.get('table')['Provenance'].dtype == 'category'
+    loaded = s.get('array')
+    assert np.array_equal(loaded, array) and not loaded.flags.writeable
+    assert s.get('png') == b'\x89PNG data'
+
+
+def test_misses_and_unstorable_values(tmp_path):
+    s = ArtifactStore(tmp_path)
+    assert s.get('nothing') is None
+    assert s.put('object', {'a': 1}) is False
+    assert s.put('objects', np.array(['a', None], dtype=object)) is False
+    assert s.get('object') is None and s.size() == 0
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    s = ArtifactStore(tmp_path)
+    for age, key in enumerate(['new', 'middle', 'old']):
+        s.put(key, bytes(1000))
+        path = s._path(key, '.bin')
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime - 100 * (age + 1)))
+    s.get('old')  # a read makes it the most recently used
+
+    assert s.evict(max_bytes=2500) == 1
+    assert s.get('middle') is None
+    assert s.get('new') is not None and s.get('old') is not None
+    assert s.size() == 2000
+
+
+def test_writes_keep_the_store_bounded(tmp_path):
+    s = ArtifactStore(tmp_path, max_mb=0.05)
+    for i in range(40):
+        s.put(f"chunk{i}", bytes(4096))
+    assert s.size() <= s.max_bytes
+    assert s.get('chunk39') is not None
+
+
+def test_stored_keys_on_public_arguments(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, '_store', ArtifactStore(tmp_path))
+    calls = []
+
+    @stored
+    def stage(key, _data, scale=1):
+        calls.append(key)
+        return np.asarray(_data) * scale
+
+    assert stage('a', [1, 2]).tolist() == [1, 2]
+    # `_data` is not part of the key: the stored result for 'a' comes back
+    assert stage('a', [5, 6]).tolist() == [1, 2]
+    assert stage('a', [1, 2], scale=2).tolist() == [2, 4]
+    assert stage('b', [1, 2], 1).tolist() == [1, 2]
+    assert calls == ['a', 'a', 'b']
+
+
+def test_stored_without_a_store_calls_through(monkeypatch):
+    monkeypatch.setattr(store, '_store', None)
+    monkeypatch.setattr(store, 'STORE_DIR', None)
+    assert stored(lambda key: key * 2)(3) == 6